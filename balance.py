@@ -0,0 +1,381 @@
+import argparse
+import collections
+import concurrent.futures
+import csv
+import datetime
+import json
+import logging
+import math
+import os
+import random
+import numpy as np
+import items
+from game import GenerationContext
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = True
+
+stream_formatter = logging.Formatter('%(levelname)s:%(message)s')
+
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(stream_formatter)
+
+logger.addHandler(stream_handler)
+
+item_classifications = ('weapon', 'armour')
+report_percentiles = (1, 5, 25, 50, 75, 95, 99)
+samples_per_chunk = 50000
+
+
+class RunningStats:
+    """
+    Count, mean, variance, min and max of a stream of values, kept with Welford's method so no values are stored.
+    Merging two gives the same as if every value went into one
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        # sum of squared differences from the mean
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def add(self, values):
+        """Adds a numpy array of values"""
+        if not len(values):
+            return
+
+        values_stats = RunningStats()
+        values_stats.count = len(values)
+        values_stats.mean = float(values.mean())
+        values_stats.m2 = float(((values - values_stats.mean) ** 2).sum())
+        values_stats.min = float(values.min())
+        values_stats.max = float(values.max())
+        self.merge(values_stats)
+
+    def merge(self, other):
+        """Adds the values of another RunningStats, with Chan's formula for combining the variances"""
+        if not other.count:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+class QuantileSketch:
+    """
+    Approximate percentiles of a stream of values, counted in logarithmic buckets
+    so every percentile is within relative_accuracy of the real one.
+    Bucket counts add up, so the sketches of shards can be merged
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        # bucket k holds the values from gamma ** (k - 1) to gamma ** k, negative values are kept by their size
+        self.positive_buckets = collections.Counter()
+        self.negative_buckets = collections.Counter()
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, values):
+        """Adds a numpy array of values"""
+        self.count += len(values)
+        self.zero_count += int(np.count_nonzero(values == 0))
+
+        for buckets, bucket_values in ((self.positive_buckets, values[values > 0]),
+                                       (self.negative_buckets, -values[values < 0])):
+            if len(bucket_values):
+                bucket_keys, bucket_counts = np.unique(
+                    np.ceil(np.log(bucket_values) / self.log_gamma).astype(np.int64), return_counts=True)
+                buckets.update(dict(zip(bucket_keys.tolist(), bucket_counts.tolist())))
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise Exception('Only sketches with the same relative accuracy can be merged!')
+
+        self.positive_buckets.update(other.positive_buckets)
+        self.negative_buckets.update(other.negative_buckets)
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def get_bucket_value(self, bucket_key):
+        """The value in a bucket that is at most relative_accuracy away from every value in it"""
+        return 2 * self.gamma ** bucket_key / (self.gamma + 1)
+
+    def get_quantile(self, quantile):
+        """Returns the value that quantile (0 to 1) of the values are less than or equal to"""
+        if not self.count:
+            return None
+
+        rank = quantile * (self.count - 1)
+        counted = 0
+        for bucket_key in sorted(self.negative_buckets, reverse=True):
+            counted += self.negative_buckets[bucket_key]
+            if counted > rank:
+                return -self.get_bucket_value(bucket_key)
+
+        counted += self.zero_count
+        if counted > rank:
+            return 0.0
+
+        for bucket_key in sorted(self.positive_buckets):
+            counted += self.positive_buckets[bucket_key]
+            if counted > rank:
+                return self.get_bucket_value(bucket_key)
+
+        return self.get_bucket_value(max(self.positive_buckets))
+
+
+class BalanceReport:
+    """
+    RunningStats and a QuantileSketch of every stat of every item type, built from batches of generated items.
+    Only the aggregates are kept, so any number of samples fits in memory,
+    and reports of shards generated in other processes can be merged
+    """
+
+    def __init__(self, item_classification, relative_accuracy=0.01):
+        if item_classification not in item_classifications:
+            raise Exception(f'{item_classification} is not a valid type of item! try "weapon" or "armour"')
+
+        self.item_classification = item_classification
+        self.relative_accuracy = relative_accuracy
+        self.sample_count = 0
+        # item type -> stat -> (RunningStats, QuantileSketch)
+        self.item_types = {}
+
+    def add_stat(self, item_type, stat, values):
+        if item_type not in self.item_types:
+            self.item_types[item_type] = {}
+        if stat not in self.item_types[item_type]:
+            self.item_types[item_type][stat] = (RunningStats(), QuantileSketch(self.relative_accuracy))
+
+        running_stats, quantile_sketch = self.item_types[item_type][stat]
+        values = np.asarray(values, dtype=np.float64)
+        running_stats.add(values)
+        quantile_sketch.add(values)
+
+    def add_columns(self, type_names, type_indexes, stat_columns):
+        """
+        Adds a batch of items, with type_indexes the position of each item's type in type_names
+        and stat_columns a dict of stat name to a column with a value per item
+        """
+        # sorting by type once groups the items without going over them again for every type
+        item_order = np.argsort(type_indexes, kind='stable')
+        type_bounds = np.searchsorted(type_indexes[item_order], np.arange(len(type_names) + 1))
+
+        for type_index, type_name in enumerate(type_names):
+            type_items = item_order[type_bounds[type_index]:type_bounds[type_index + 1]]
+            if len(type_items):
+                for stat, stat_column in stat_columns.items():
+                    self.add_stat(type_name, stat, stat_column[type_items])
+
+        self.sample_count += len(type_indexes)
+
+    def add_weapon_batch(self, weapon_batch):
+        stat_columns = {
+            'rarity': weapon_batch.rarities,
+            'ap': weapon_batch.ap,
+            'range': weapon_batch.range,
+            'weight': weapon_batch.weight
+        }
+        for dmg_index, dmg_type in enumerate(items.Weapon.dmg_type_list):
+            stat_columns[dmg_type] = weapon_batch.dmg[:, dmg_index]
+        stat_columns['total_dmg'] = weapon_batch.total_dmg
+        stat_columns['dmg_per_ap'] = weapon_batch.dmg_per_ap
+        stat_columns['total_value'] = weapon_batch.total_value
+
+        self.add_columns(items.Weapon.get_weapon_value_arrays()['weapon_types'], weapon_batch.type_indexes, stat_columns)
+
+    def add_armour_batch(self, armour_batch):
+        # armour is compared by material, the same as Item.test_item_balance
+        stat_columns = {
+            'rarity': armour_batch.rarities,
+            'weight_modifier': armour_batch.weight_modifiers
+        }
+        for resistance_index, resistance_type in enumerate(items.Armour.armour_resistance_types):
+            stat_columns[resistance_type] = armour_batch.resistances[:, resistance_index]
+        for multiplier_index, multiplier_type in enumerate(items.Armour.armour_multiplier_types):
+            stat_columns[multiplier_type] = armour_batch.multipliers[:, multiplier_index]
+        stat_columns['total_protection'] = armour_batch.total_protection
+        stat_columns['total_multiplier'] = armour_batch.total_multiplier
+        stat_columns['total_value'] = armour_batch.total_value
+
+        self.add_columns(items.Armour.armour_materials, armour_batch.material_indexes, stat_columns)
+
+    def merge(self, other):
+        for item_type, item_stats in other.item_types.items():
+            for stat, (running_stats, quantile_sketch) in item_stats.items():
+                if item_type not in self.item_types:
+                    self.item_types[item_type] = {}
+                if stat not in self.item_types[item_type]:
+                    self.item_types[item_type][stat] = (RunningStats(), QuantileSketch(self.relative_accuracy))
+
+                self.item_types[item_type][stat][0].merge(running_stats)
+                self.item_types[item_type][stat][1].merge(quantile_sketch)
+
+        self.sample_count += other.sample_count
+
+    def get_stat_summary(self, item_type, stat, percentiles=report_percentiles):
+        running_stats, quantile_sketch = self.item_types[item_type][stat]
+        stat_summary = {
+            'count': running_stats.count,
+            'mean': running_stats.mean,
+            'std': running_stats.std,
+            'min': running_stats.min,
+            'max': running_stats.max
+        }
+        for percentile in percentiles:
+            # a bucket's value can be just past the smallest or largest value in it
+            percentile_value = quantile_sketch.get_quantile(percentile / 100)
+            stat_summary[f'p{percentile}'] = min(max(percentile_value, running_stats.min), running_stats.max)
+
+        return stat_summary
+
+    def json_readable(self, percentiles=report_percentiles):
+        return {
+            'item_classification': self.item_classification,
+            'samples': self.sample_count,
+            'relative_accuracy': self.relative_accuracy,
+            'item_types': {
+                item_type: {stat: self.get_stat_summary(item_type, stat, percentiles) for stat in item_stats}
+                for item_type, item_stats in self.item_types.items()
+            }
+        }
+
+    def write_json(self, file_path, extra_fields=None, percentiles=report_percentiles):
+        report = self.json_readable(percentiles)
+        if extra_fields:
+            report.update(extra_fields)
+
+        with open(file_path, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    def write_csv(self, file_path, percentiles=report_percentiles):
+        """Writes a row for every stat of every item type"""
+        field_names = ['item_type', 'stat', 'count', 'mean', 'std', 'min', 'max'] + [f'p{percentile}' for percentile in percentiles]
+
+        with open(file_path, 'w', newline='') as file:
+            csv_writer = csv.DictWriter(file, field_names)
+            csv_writer.writeheader()
+            for item_type, item_stats in self.item_types.items():
+                for stat in item_stats:
+                    csv_writer.writerow({'item_type': item_type, 'stat': stat,
+                                         **self.get_stat_summary(item_type, stat, percentiles)})
+
+
+def sample_shard(item_classification, sample_count, seed, shard_index, item_type=None, rarity=None,
+                 chunk_size=samples_per_chunk, relative_accuracy=0.01):
+    """
+    Generates sample_count items in chunks with the batch generators and returns their BalanceReport.
+    Each shard draws from its own stream of the seed, so the shards can be generated in any process
+    """
+    rng = GenerationContext(seed).derive('balance', item_classification, shard_index).rng
+    balance_report = BalanceReport(item_classification, relative_accuracy)
+
+    samples_left = sample_count
+    while samples_left > 0:
+        chunk_count = min(chunk_size, samples_left)
+        if item_classification == 'weapon':
+            balance_report.add_weapon_batch(items.Weapon.generate_batch(chunk_count, rarity, item_type, rng))
+        else:
+            balance_report.add_armour_batch(items.Armour.generate_batch(chunk_count, rarity, None, item_type, rng))
+        samples_left -= chunk_count
+
+    return balance_report
+
+
+def analyze_balance(item_classification, sample_count, item_type=None, rarity=None, seed=None,
+                    shard_count=None, max_workers=None, relative_accuracy=0.01):
+    """
+    Returns the BalanceReport of sample_count items, split into shard_count shards that are generated
+    in up to max_workers processes. The report only depends on the seed and shard count, not on the workers
+    """
+    if seed is None:
+        seed = random.getrandbits(64)
+    if not max_workers:
+        max_workers = os.cpu_count() or 1
+    if not shard_count:
+        shard_count = max_workers
+
+    shard_samples = [sample_count // shard_count + (shard_index < sample_count % shard_count)
+                     for shard_index in range(shard_count)]
+    shard_arguments = [(item_classification, shard_samples[shard_index], seed, shard_index, item_type, rarity,
+                        samples_per_chunk, relative_accuracy) for shard_index in range(shard_count)]
+
+    balance_report = BalanceReport(item_classification, relative_accuracy)
+    if max_workers == 1 or shard_count == 1:
+        for arguments in shard_arguments:
+            balance_report.merge(sample_shard(*arguments))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(min(max_workers, shard_count)) as executor:
+            shard_futures = [executor.submit(sample_shard, *arguments) for arguments in shard_arguments]
+            # merged in shard order so the floats add up the same every run
+            for shard_future in shard_futures:
+                balance_report.merge(shard_future.result())
+
+    return balance_report
+
+
+def run_balance_analysis(item_classification, sample_count, item_type=None, rarity=None, seed=None,
+                         shard_count=None, max_workers=None, export_file=None):
+    """Analyzes the balance of item_classification and writes the report as JSON and CSV"""
+    if seed is None:
+        seed = random.getrandbits(64)
+
+    start_time = datetime.datetime.now()
+    balance_report = analyze_balance(item_classification, sample_count, item_type, rarity, seed, shard_count, max_workers)
+    seconds = (datetime.datetime.now() - start_time).total_seconds()
+
+    if not export_file:
+        export_file = (f'{os.path.dirname(os.path.realpath(__file__))}/Balance/'
+                       f'{item_classification}_{start_time:%Y%m%d_%H%M%S}')
+    os.makedirs(os.path.dirname(export_file) or '.', exist_ok=True)
+
+    balance_report.write_json(f'{export_file}.json', {
+        'date': start_time.isoformat(),
+        'seed': seed,
+        'item_type': item_type,
+        'rarity': rarity,
+        'seconds': seconds
+    })
+    balance_report.write_csv(f'{export_file}.csv')
+    logger.info(f'Analyzed {sample_count} {item_classification} samples in {seconds:.2f}s '
+                f'({sample_count / max(seconds, 10 ** -9):.0f} per second), saved to {export_file}.json and .csv')
+
+    return balance_report
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description='Streams generated items through running stats to compare their balance')
+    argument_parser.add_argument('item_classification', choices=item_classifications)
+    argument_parser.add_argument('samples', type=int, nargs='?', default=1000000)
+    argument_parser.add_argument('--item-type', help='only sample this weapon type or armour material')
+    argument_parser.add_argument('--rarity', type=float, help='sample every item at this rarity instead of a random one')
+    argument_parser.add_argument('--seed', type=int)
+    argument_parser.add_argument('--shards', type=int, help='how many parts the samples are split into, the report only depends on this and the seed')
+    argument_parser.add_argument('--workers', type=int, help='how many processes generate the shards')
+    argument_parser.add_argument('--output', help='path of the report without the .json or .csv extension')
+    arguments = argument_parser.parse_args()
+
+    run_balance_analysis(arguments.item_classification, arguments.samples, arguments.item_type, arguments.rarity,
+                         arguments.seed, arguments.shards, arguments.workers, arguments.output)
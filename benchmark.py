@@ -0,0 +1,299 @@
+import asyncio
+import copy
+import datetime
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+import items
+import rooms
+from game import ProgressReporter
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = True
+
+stream_formatter = logging.Formatter('%(levelname)s:%(message)s')
+
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(stream_formatter)
+
+logger.addHandler(stream_handler)
+
+benchmark_sizes = (50, 500, 5000)
+generation_sizes = (10, 100, 1000, 10000)
+benchmark_seed = 1
+weapon_benchmark_count = 100000
+armour_benchmark_count = 20000
+
+
+def lay_out_map(map_size, seed=benchmark_seed):
+    """Returns a MapGenerator with a finished layout, so only population is timed"""
+    map_generator = rooms.MapGenerator(map_size, 0, 'dungeon', 1, seed=seed)
+    map_generator.finish_layout()
+    return map_generator
+
+
+def populate_serial(map_generator):
+    # the rooms are populated in place, so copies are used to leave the layout unpopulated for populate_parallel
+    populated_chunks = [rooms.populate_rooms(copy.deepcopy(room_chunk))
+                        for room_chunk in map_generator.get_population_chunks()]
+    return map_generator.finish_map(populated_chunks)
+
+
+def populate_parallel(map_generator, process_pool):
+    population_chunks = map_generator.get_population_chunks(
+        process_pool.get_chunk_size(len(map_generator.room_list)))
+    chunk_futures = [
+        process_pool.executor.submit(rooms.populate_rooms, room_chunk)
+        for room_chunk in population_chunks]
+    return map_generator.finish_map([chunk_future.result() for chunk_future in chunk_futures])
+
+
+def map_signature(game_map):
+    """Something that is the same for two maps populated from the same layout and seed"""
+    return [(room.level, len(room.items), len(room.enemies)) for room in game_map.room_list]
+
+
+def benchmark_population(map_size, process_pool):
+    map_generator = lay_out_map(map_size)
+    room_count = len(map_generator.room_list)
+
+    start_time = time.perf_counter()
+    serial_map = populate_serial(map_generator)
+    serial_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    parallel_map = populate_parallel(map_generator, process_pool)
+    parallel_time = time.perf_counter() - start_time
+
+    if map_signature(serial_map) != map_signature(parallel_map):
+        logger.warning(f'Serial and parallel population of {map_size} rooms gave different maps')
+
+    logger.info(f'{room_count} rooms: '
+                f'serial {serial_time:.2f}s ({room_count / serial_time:.1f} rooms/s), '
+                f'parallel {parallel_time:.2f}s ({room_count / parallel_time:.1f} rooms/s) '
+                f'on {process_pool.max_workers} workers, '
+                f'{serial_time / parallel_time:.2f}x')
+
+    return {'rooms': room_count, 'serial': serial_time, 'parallel': parallel_time}
+
+
+async def generate_map_phases(map_size, seed=benchmark_seed, placement_strategy='interval'):
+    """
+    Generates a map the way Map.generate_map does without a process pool, timing the layout, population and render.
+    The progress goes to a ProgressReporter with no client, which shows nothing
+    """
+    progress_reporter = ProgressReporter()
+    phase_times = {}
+
+    start_time = time.perf_counter()
+    map_generator = rooms.MapGenerator(**rooms.Map.get_generator_kwargs(
+        map_size, seed=seed, placement_strategy=placement_strategy))
+    while not map_generator.finished:
+        map_generator.place_next_room()
+        await progress_reporter.update(int(map_generator.progress * 50))
+    map_generator.finish_layout()
+    phase_times['layout'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    population_chunks = map_generator.get_population_chunks()
+    populated_chunks = []
+    for room_chunk in population_chunks:
+        populated_chunks.append(rooms.populate_rooms(room_chunk))
+        await progress_reporter.update(50 + int(len(populated_chunks) / len(population_chunks) * 50))
+    game_map = map_generator.finish_map(populated_chunks)
+    phase_times['population'] = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    game_map.render_map_image()
+    phase_times['render'] = time.perf_counter() - start_time
+    await progress_reporter.finish()
+
+    return {
+        'map_size': map_size,
+        'rooms': len(game_map.room_list),
+        'placement_attempts': map_generator.placement_attempts,
+        'rollbacks': map_generator.rollbacks,
+        'seconds': phase_times
+    }
+
+
+def benchmark_generation(map_size, seed=benchmark_seed, placement_strategy='interval', measure_memory=True):
+    """
+    Times the phases of generating a map of map_size. tracemalloc slows everything down,
+    so the peak memory is measured by generating the same map a second time
+    """
+    result = asyncio.run(generate_map_phases(map_size, seed, placement_strategy))
+
+    if measure_memory:
+        tracemalloc.start()
+        asyncio.run(generate_map_phases(map_size, seed, placement_strategy))
+        result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    phase_times = result['seconds']
+    logger.info(f'{map_size} rooms: layout {phase_times["layout"]:.2f}s, population {phase_times["population"]:.2f}s, '
+                f'render {phase_times["render"]:.2f}s, {result["placement_attempts"]} attempts, '
+                f'{result["rollbacks"]} rollbacks, peak {result.get("peak_memory_bytes", 0) / 1024 ** 2:.1f} MiB')
+
+    return result
+
+
+def run_generation_benchmarks(map_sizes=generation_sizes, placement_strategy='interval', export_file=None):
+    """Benchmarks every map size with the same seed and saves the results as JSON, so runs can be compared"""
+    quiet_generation_logs()
+
+    results = {
+        'date': datetime.datetime.now().isoformat(),
+        'seed': benchmark_seed,
+        'placement_strategy': placement_strategy,
+        'results': [benchmark_generation(map_size, placement_strategy=placement_strategy) for map_size in map_sizes]
+    }
+
+    if not export_file:
+        export_file = (f'{os.path.dirname(os.path.realpath(__file__))}/Benchmarks/'
+                       f'generation_{placement_strategy}_{datetime.datetime.now():%Y%m%d_%H%M%S}.json')
+    os.makedirs(os.path.dirname(export_file), exist_ok=True)
+
+    with open(export_file, 'w') as file:
+        json.dump(results, file, indent=2)
+    logger.info(f'Saved results to {export_file}')
+
+    return results
+
+
+def benchmark_room_table(map_size, seed=benchmark_seed):
+    """
+    Compares laying out map_size rooms with the 'interval' strategy as Rooms and straight into a RoomTable,
+    and rendering the map with both. Peak memory is measured in second runs, since tracemalloc slows them down
+    """
+    quiet_generation_logs()
+
+    def lay_out_rooms():
+        map_generator = rooms.MapGenerator(map_size, 0.5, 'dungeon', 1, seed=seed, placement_strategy='interval')
+        map_generator.finish_layout()
+        return map_generator.finish_map([map_generator.room_list])
+
+    def lay_out_table():
+        return rooms.RoomTable.generate(map_size, 0.5, 'dungeon', 1, seed=seed)
+
+    result = {'map_size': map_size}
+    for layout_name, lay_out in (('rooms', lay_out_rooms), ('table', lay_out_table)):
+        start_time = time.perf_counter()
+        laid_out_map = lay_out()
+        layout_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        laid_out_map.render_map_image()
+        render_time = time.perf_counter() - start_time
+        del laid_out_map
+
+        tracemalloc.start()
+        laid_out_map = lay_out()
+        kept_memory, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result[layout_name] = {'rooms': len(laid_out_map.room_list) if layout_name == 'rooms' else len(laid_out_map),
+                               'layout': layout_time, 'render': render_time,
+                               'kept_memory_bytes': kept_memory, 'peak_memory_bytes': peak_memory}
+        del laid_out_map
+
+    for layout_name in ('rooms', 'table'):
+        layout_result = result[layout_name]
+        logger.info(f'{map_size} rooms as {layout_name}: layout {layout_result["layout"]:.2f}s, '
+                    f'render {layout_result["render"]:.2f}s, '
+                    f'{layout_result["kept_memory_bytes"] / layout_result["rooms"]:.0f} bytes kept per room, '
+                    f'peak {layout_result["peak_memory_bytes"] / 1024 ** 2:.1f} MiB')
+
+    return result
+
+
+def benchmark_weapon_values(weapon_count=weapon_benchmark_count):
+    """Times Weapon.get_weapon_values, Weapon.get_random_weapon and Weapon.generate_batch per weapon, over every weapon type"""
+    quiet_generation_logs()
+    rng = random.Random(benchmark_seed)
+    weapon_types = items.Weapon.weapon_types
+
+    start_time = time.perf_counter()
+    for i in range(weapon_count):
+        items.Weapon.get_weapon_values(rng.uniform(0.1, 10), weapon_types[i % len(weapon_types)], rng)
+    values_time = (time.perf_counter() - start_time) / weapon_count
+
+    start_time = time.perf_counter()
+    for i in range(weapon_count):
+        items.Weapon.get_random_weapon(rng.uniform(0.1, 10), weapon_types[i % len(weapon_types)], rng)
+    weapon_time = (time.perf_counter() - start_time) / weapon_count
+
+    start_time = time.perf_counter()
+    items.Weapon.generate_batch(weapon_count, rng=rng)
+    batch_time = (time.perf_counter() - start_time) / weapon_count
+
+    logger.info(f'get_weapon_values {values_time * 10 ** 6:.2f}us per weapon, '
+                f'get_random_weapon {weapon_time * 10 ** 6:.2f}us per weapon, '
+                f'generate_batch {batch_time * 10 ** 6:.2f}us per weapon')
+
+    return {'get_weapon_values': values_time, 'get_random_weapon': weapon_time, 'generate_batch': batch_time}
+
+
+def benchmark_armour_sets(set_count=armour_benchmark_count):
+    """Times Armour.get_armour_set and Armour.generate_armour_sets per armour set"""
+    quiet_generation_logs()
+    rng = random.Random(benchmark_seed)
+
+    start_time = time.perf_counter()
+    for _ in range(set_count):
+        items.Armour.get_armour_set(rng.uniform(0.1, 10), None, None, 0.8, rng)
+    set_time = (time.perf_counter() - start_time) / set_count
+
+    start_time = time.perf_counter()
+    items.Armour.generate_armour_sets(set_count, consistency=0.8, rng=rng)
+    batch_time = (time.perf_counter() - start_time) / set_count
+
+    logger.info(f'get_armour_set {set_time * 10 ** 6:.2f}us per set, '
+                f'generate_armour_sets {batch_time * 10 ** 6:.2f}us per set')
+
+    return {'get_armour_set': set_time, 'generate_armour_sets': batch_time}
+
+
+def quiet_generation_logs():
+    # the per room generation logs would be most of what is timed
+    for module_name in ('rooms', 'items', 'creatures', 'game'):
+        logging.getLogger(module_name).setLevel(logging.WARNING)
+
+
+def run_benchmarks(map_sizes=benchmark_sizes, max_workers=None):
+    quiet_generation_logs()
+
+    process_pool = rooms.MapProcessPool(max_workers)
+    try:
+        return [benchmark_population(map_size, process_pool) for map_size in map_sizes]
+    finally:
+        process_pool.shutdown()
+
+
+if __name__ == '__main__':
+    # python benchmark.py [map sizes...] benchmarks serial and parallel population
+    # python benchmark.py generation [random|interval] [map sizes...] benchmarks every phase of generation
+    # python benchmark.py weapons [weapon count] benchmarks the cost of one weapon
+    # python benchmark.py armour [set count] benchmarks the cost of one armour set
+    # python benchmark.py table [map sizes...] compares laying out and rendering maps as Rooms and as a RoomTable
+    arguments = sys.argv[1:]
+    if arguments and arguments[0] == 'table':
+        for map_size in [int(argument) for argument in arguments[1:]] or generation_sizes[:3]:
+            benchmark_room_table(map_size)
+    elif arguments and arguments[0] == 'weapons':
+        benchmark_weapon_values(*[int(argument) for argument in arguments[1:2]])
+    elif arguments and arguments[0] == 'armour':
+        benchmark_armour_sets(*[int(argument) for argument in arguments[1:2]])
+    elif arguments and arguments[0] == 'generation':
+        map_sizes = [int(argument) for argument in arguments[1:] if argument.isdigit()] or generation_sizes
+        strategies = [argument for argument in arguments[1:] if not argument.isdigit()] or ['interval']
+        run_generation_benchmarks(map_sizes, strategies[0])
+    elif arguments:
+        run_benchmarks([int(map_size) for map_size in arguments])
+    else:
+        run_benchmarks()
@@ -24,8 +24,8 @@ logger.addHandler(file_handler)
 
 class Creature(GameObject):
     """Representation of a living entity"""
-    def __init__(self, stats, name, level, inventory, position=None):
-        super().__init__(position)
+    def __init__(self, stats, name, level, inventory, position=None, rng=None):
+        super().__init__(position, rng=rng)
         self.name = name
         self.level = level
         self.inventory = inventory
@@ -97,7 +97,7 @@ class Creature(GameObject):
             return False
 
     @classmethod
-    def generate_enemies(cls, level=None, total_enemies=None, enemy_distribution=None):
+    def generate_enemies(cls, level=None, total_enemies=None, enemy_distribution=None, rng=None):
         """
         TODO: Include enemy creatures, add enemy type modifiers
         Generates a list of enemies
@@ -107,20 +107,22 @@ class Creature(GameObject):
         enemy_distribution: higher value means higher level but fewer number of enemies
 
         """
+        if not rng:
+            rng = random
         if not level:
-            level = GameObject.get_level() * 10
+            level = GameObject.get_level(rng) * 10
 
         if not total_enemies:
-            total_enemies = (level**2 * GameObject.get_level()**2 * 0.1) - (GameObject.get_level()**2)
+            total_enemies = (level**2 * GameObject.get_level(rng)**2 * 0.1) - (GameObject.get_level(rng)**2)
 
         if not enemy_distribution:
-            enemy_distribution = random.uniform(0.5, 2)
+            enemy_distribution = rng.uniform(0.5, 2)
 
         enemy_list = []
         enemy_tries = 0
         while total_enemies > level and enemy_tries < 100:
-            enemy_level = (level / 10) * (enemy_distribution - GameObject.zero_to_range(enemy_distribution / 2))
-            enemy_instance = EnemyHumanoid.get_random_enemy(enemy_level)
+            enemy_level = (level / 10) * (enemy_distribution - GameObject.zero_to_range(enemy_distribution / 2, rng))
+            enemy_instance = EnemyHumanoid.get_random_enemy(enemy_level, rng=rng)
 
             total_enemies -= enemy_instance.power_level
             if total_enemies < 50:
@@ -161,8 +163,8 @@ class Creature(GameObject):
 
 class Humanoid(Creature):
     """Representation of a humanoid creature"""
-    def __init__(self, stats, name, level, inventory):
-        super().__init__(stats, name, level, inventory)
+    def __init__(self, stats, name, level, inventory, rng=None):
+        super().__init__(stats, name, level, inventory, rng=rng)
         
         self.arm_length = stats['arm_length']
         self.weapon_slots = stats['weapon_slots']
@@ -356,8 +358,8 @@ class EnemyHumanoid(Humanoid):
         'centurion'
     )
 
-    def __init__(self, enemy_stats, name, level, inventory):
-        super().__init__(enemy_stats, name, level, inventory)
+    def __init__(self, enemy_stats, name, level, inventory, rng=None):
+        super().__init__(enemy_stats, name, level, inventory, rng)
 
         self.skill = enemy_stats['skill']
         self.aggression = enemy_stats['aggression']
@@ -448,13 +450,15 @@ class EnemyHumanoid(Humanoid):
         )
 
     @classmethod
-    def get_random_enemy(cls, level=None, enemy_type=None, enemy_class=None):
+    def get_random_enemy(cls, level=None, enemy_type=None, enemy_class=None, rng=None, armour_list=None):
+        if not rng:
+            rng = random
         if not level:
-            level = items.Item.get_level()
+            level = items.Item.get_level(rng)
         if not enemy_type:
-            enemy_type = cls.enemy_list[random.randint(0, len(cls.enemy_list) - 1)]
+            enemy_type = cls.enemy_list[rng.randint(0, len(cls.enemy_list) - 1)]
         if not enemy_class:
-            enemy_class = cls.enemy_class_list[random.randint(0, len(cls.enemy_class_list) - 1)]
+            enemy_class = cls.enemy_class_list[rng.randint(0, len(cls.enemy_class_list) - 1)]
 
         if level < 0.1:
             level = 0.1
@@ -467,8 +471,8 @@ class EnemyHumanoid(Humanoid):
         if enemy_type == 'goblin':
             enemy_stats = {
                 'hp': 75 * level_scale + 10,
-                'height': 1.05 * items.Item.get_skew_multiplier(10),
-                'weight': 80 * items.Item.get_skew_multiplier(20),
+                'height': 1.05 * items.Item.get_skew_multiplier(10, rng),
+                'weight': 80 * items.Item.get_skew_multiplier(20, rng),
                 'speed': 0.25,
                 'skill': 20,
                 'aggression': 65,
@@ -484,8 +488,8 @@ class EnemyHumanoid(Humanoid):
         elif enemy_type == 'ork':
             enemy_stats = {
                 'hp': 150 * level_scale + 10,
-                'height': 2.2 * items.Item.get_skew_multiplier(20),
-                'weight': 175 * items.Item.get_skew_multiplier(20),
+                'height': 2.2 * items.Item.get_skew_multiplier(20, rng),
+                'weight': 175 * items.Item.get_skew_multiplier(20, rng),
                 'speed': 0.15,
                 'skill': 30,
                 'aggression': 65,
@@ -501,8 +505,8 @@ class EnemyHumanoid(Humanoid):
         elif enemy_type == 'outlaw':
             enemy_stats = {
                 'hp': 100 * level_scale + 10,
-                'height': 1.7 * items.Item.get_skew_multiplier(20),
-                'weight': 135 * items.Item.get_skew_multiplier(20),
+                'height': 1.7 * items.Item.get_skew_multiplier(20, rng),
+                'weight': 135 * items.Item.get_skew_multiplier(20, rng),
                 'speed': 0.2,
                 'skill': 50,
                 'aggression': 50,
@@ -518,8 +522,8 @@ class EnemyHumanoid(Humanoid):
         elif enemy_type == 'undead':
             enemy_stats = {
                 'hp': 120 * level_scale + 10,
-                'height': 1.7 * items.Item.get_skew_multiplier(20),
-                'weight': 100 * items.Item.get_skew_multiplier(20),
+                'height': 1.7 * items.Item.get_skew_multiplier(20, rng),
+                'weight': 100 * items.Item.get_skew_multiplier(20, rng),
                 'speed': 0.1,
                 'skill': 20,
                 'aggression': 80,
@@ -535,8 +539,8 @@ class EnemyHumanoid(Humanoid):
         elif enemy_type == 'skeleton':
             enemy_stats = {
                 'hp': 80 * level_scale + 10,
-                'height': 1.7 * items.Item.get_skew_multiplier(20),
-                'weight': 80 * items.Item.get_skew_multiplier(20),
+                'height': 1.7 * items.Item.get_skew_multiplier(20, rng),
+                'weight': 80 * items.Item.get_skew_multiplier(20, rng),
                 'speed': 0.2,
                 'skill': 60,
                 'aggression': 50,
@@ -552,8 +556,8 @@ class EnemyHumanoid(Humanoid):
         elif enemy_type == 'bat person':
             enemy_stats = {
                 'hp': 90 * level_scale + 10,
-                'height': 1.8 * items.Item.get_skew_multiplier(20),
-                'weight': 140 * items.Item.get_skew_multiplier(20),
+                'height': 1.8 * items.Item.get_skew_multiplier(20, rng),
+                'weight': 140 * items.Item.get_skew_multiplier(20, rng),
                 'speed': 0.4,
                 'skill': 60,
                 'aggression':  40,
@@ -581,8 +585,8 @@ class EnemyHumanoid(Humanoid):
             enemy_stats['aggression'] *= 0.8
 
         elif enemy_class == 'knight':
-            # converting a list to a set removes duplicates
-            available_weapons = list(set(available_weapons + ['sword', 'axe', 'mace', 'greatsword', 'halberd', 'spear', 'glaive', 'katana', 'nodachi']))
+            # dict keys remove duplicates like a set, but keep the order so seeded enemies are the same in every process
+            available_weapons = list(dict.fromkeys(available_weapons + ['sword', 'axe', 'mace', 'greatsword', 'halberd', 'spear', 'glaive', 'katana', 'nodachi']))
             available_armours = list(items.Armour.armour_materials)
             enemy_stats['courage'] *= 1.2
             enemy_stats['aggression'] *= 0.9
@@ -629,25 +633,28 @@ class EnemyHumanoid(Humanoid):
 
         enemy_stats['weapon_slots'] = {'left_hand': None, 'right_hand': None}
         right_handed = True
-        if random.uniform(0, 1) > 0.9:
+        if rng.uniform(0, 1) > 0.9:
             right_handed = False
 
         enemy_stats['armour_slots'] = {}
         for armour_type in items.Armour.armour_types:
             enemy_stats['armour_slots'][armour_type] = None
-            armour_material = available_armours[random.randint(0, len(available_armours) - 1)]
+            armour_material = available_armours[rng.randint(0, len(available_armours) - 1)]
 
-        armour_list = items.Armour.get_armour_set(
-            level * items.Item.get_skew_multiplier(10),
-            armour_material,
-            available_armours,
-            armour_consistency
-        )
+        if armour_list is None:
+            # armour_list can be given to use a set made ahead of time, such as by Armour.generate_armour_sets
+            armour_list = items.Armour.get_armour_set(
+                level * items.Item.get_skew_multiplier(10, rng),
+                armour_material,
+                available_armours,
+                armour_consistency,
+                rng
+            )
 
-        weapon_type = available_weapons[random.randint(0, len(available_weapons) - 1)]
-        enemy_weapon = items.Weapon.get_random_weapon(level * items.Item.get_skew_multiplier(10), weapon_type)
+        weapon_type = available_weapons[rng.randint(0, len(available_weapons) - 1)]
+        enemy_weapon = items.Weapon.get_random_weapon(level * items.Item.get_skew_multiplier(10, rng), weapon_type, rng)
 
-        enemy_name = items.Item.get_fantasy_name(random.randint(2, 2), vowels, consonants)
+        enemy_name = items.Item.get_fantasy_name(rng.randint(2, 2), vowels, consonants, rng)
 
         enemy_stats['enemy_type'] = enemy_type
         enemy_stats['enemy_class'] = enemy_class
@@ -656,7 +663,7 @@ class EnemyHumanoid(Humanoid):
         enemy_stats['courage'] = int(enemy_stats['courage'])
         enemy_stats['skill'] = int(enemy_stats['skill'])
         enemy_stats['height'] = round(enemy_stats['height'], 2)
-        enemy_stats['arm_length'] = round(enemy_stats['height'] * (2/5) * items.Item.get_skew_multiplier(10), 2)
+        enemy_stats['arm_length'] = round(enemy_stats['height'] * (2/5) * items.Item.get_skew_multiplier(10, rng), 2)
         enemy_stats['hp'] = int(enemy_stats['hp'])
         enemy_stats['weight'] = round(enemy_stats['weight'], 1)
         enemy_stats['carry_capacity'] = int(enemy_stats['carry_capacity'])
@@ -664,7 +671,7 @@ class EnemyHumanoid(Humanoid):
         enemy_stats['max_ap'] = int(enemy_stats['max_ap'] * cls.ap_modifier * (level / 10) + 10)
         level = int(level * 10)
 
-        enemy_instance = cls(enemy_stats, enemy_name, level, inventory)
+        enemy_instance = cls(enemy_stats, enemy_name, level, inventory, rng)
         enemy_instance.equip_armour(armour_list)
 
         if right_handed:
@@ -673,11 +680,11 @@ class EnemyHumanoid(Humanoid):
             enemy_instance.weapon_slots['left_hand'] = enemy_weapon
 
         if enemy_weapon.item_stats['one_handed']:
-            if random.uniform(0, 1) > 0.8:
+            if rng.uniform(0, 1) > 0.8:
                 if right_handed:
-                    enemy_instance.weapon_slots['left_hand'] = items.Weapon.get_random_weapon((level / 10) * items.Item.get_skew_multiplier(10), weapon_type)
+                    enemy_instance.weapon_slots['left_hand'] = items.Weapon.get_random_weapon((level / 10) * items.Item.get_skew_multiplier(10, rng), weapon_type, rng)
                 else:
-                    enemy_instance.weapon_slots['right_hand'] = items.Weapon.get_random_weapon((level / 10) * items.Item.get_skew_multiplier(10), weapon_type)
+                    enemy_instance.weapon_slots['right_hand'] = items.Weapon.get_random_weapon((level / 10) * items.Item.get_skew_multiplier(10, rng), weapon_type, rng)
 
         return enemy_instance
 
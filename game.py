@@ -1,6 +1,7 @@
 import math
 import random
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 if __name__ == '__main__':
@@ -55,12 +56,15 @@ class GameObject:
                             'appears to be', 'is', 'apparently is', 'seems like',
                             'it\s', 'it is')
 
-    def __init__(self, position=None, adjectives=[]):
+    def __init__(self, position=None, adjectives=[], rng=None):
+        if not rng:
+            rng = random
+
         self.position = position
         self.adjectives = adjectives
 
         if len(adjectives) == 0:
-            self.adjectives = GameObject.uninteresting_adjectives[random.randint(
+            self.adjectives = GameObject.uninteresting_adjectives[rng.randint(
                 0, len(GameObject.uninteresting_adjectives) - 1)]
 
     @staticmethod
@@ -95,22 +99,28 @@ class GameObject:
             raise Exception('Not a valid direction!')
 
     @staticmethod
-    def get_random_consonant(consonant_list=None):
+    def get_random_consonant(consonant_list=None, rng=None):
         """returns a random consonant"""
+        if not rng:
+            rng = random
         if not consonant_list:
             consonant_list = GameObject.consonants
-        return consonant_list[random.randint(0, len(consonant_list) - 1)]
+        return consonant_list[rng.randint(0, len(consonant_list) - 1)]
 
     @staticmethod
-    def get_random_vowel(vowel_list=None):
+    def get_random_vowel(vowel_list=None, rng=None):
         """returns a random vowel"""
+        if not rng:
+            rng = random
         if not vowel_list:
             vowel_list = GameObject.consonants
-        return vowel_list[random.randint(0, len(vowel_list) - 1)]
+        return vowel_list[rng.randint(0, len(vowel_list) - 1)]
 
     @staticmethod
-    def get_fantasy_name(name_length=None, vowel_list=None, consonant_list=None):
+    def get_fantasy_name(name_length=None, vowel_list=None, consonant_list=None, rng=None):
         """Returns a name using a combination of vowels and consonants"""
+        if not rng:
+            rng = random
         if not name_length:
             name_length = 2
         if not vowel_list:
@@ -118,32 +128,36 @@ class GameObject:
         if not consonant_list:
             consonant_list = GameObject.consonants
 
-        if random.randint(0, 1) == 1:
-            fantasy_name = GameObject.get_random_consonant(consonant_list)
-            fantasy_name += GameObject.get_random_vowel(vowel_list)
+        if rng.randint(0, 1) == 1:
+            fantasy_name = GameObject.get_random_consonant(consonant_list, rng)
+            fantasy_name += GameObject.get_random_vowel(vowel_list, rng)
         else:
-            fantasy_name = GameObject.get_random_vowel(vowel_list)
+            fantasy_name = GameObject.get_random_vowel(vowel_list, rng)
 
         i = 0
         while i < name_length - 1:
-            fantasy_name += GameObject.get_random_consonant(consonant_list)
-            fantasy_name += GameObject.get_random_vowel(vowel_list)
+            fantasy_name += GameObject.get_random_consonant(consonant_list, rng)
+            fantasy_name += GameObject.get_random_vowel(vowel_list, rng)
             i += 1
 
-        if random.randint(0, 1) == 1:
-            fantasy_name += GameObject.get_random_consonant(consonant_list)
+        if rng.randint(0, 1) == 1:
+            fantasy_name += GameObject.get_random_consonant(consonant_list, rng)
 
         return str.capitalize(fantasy_name)
 
     @staticmethod
-    def get_skew_multiplier(percent=stat_skew_percent):
+    def get_skew_multiplier(percent=stat_skew_percent, rng=None):
         """Gets a multiplier to skew item stats"""
-        return 1 + (random.uniform(-percent, percent) / 100)
+        if not rng:
+            rng = random
+        return 1 + (rng.uniform(-percent, percent) / 100)
 
     @staticmethod
-    def zero_to_range(rng):
+    def zero_to_range(value_range, rng=None):
         """Gives a float from zero to the argument"""
-        return random.uniform(0, rng)
+        if not rng:
+            rng = random
+        return rng.uniform(0, value_range)
 
     @staticmethod
     def rarity_sort_key(item):
@@ -156,12 +170,83 @@ class GameObject:
         return item.total_value
 
     @staticmethod
-    def get_level():
+    def get_level(rng=None):
         """Returns a rarity value from 0.1 to 10 based on weighted chance"""
-        random_number = random.uniform(0, 10)
+        if not rng:
+            rng = random
+        random_number = rng.uniform(0, 10)
         return 4*(0.1919 * random_number - 0.608)**3 + 1
 
 
+class GenerationContext:
+    """
+    Carries the seeded random number generator that game objects are generated with.
+    Pass context.rng as the rng argument of the generation functions.
+    derive makes an independent sub-stream, so parts of a map can be generated in any order or in other processes
+    and still come out the same for the same seed
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def derive(self, *key):
+        """Returns a new context whose seed only depends on this seed and the key"""
+        key_string = ':'.join(str(part) for part in (self.seed,) + key)
+        # seeding with a string hashes it with sha512, so this is the same in every process
+        return GenerationContext(random.Random(key_string).getrandbits(64))
+
+
+class ProgressReporter:
+    """
+    Shows the progress of a long running command by editing a discord message.
+    Updates are coalesced into at most one edit every interval seconds, and finish always shows the final state.
+    With no client or message it does nothing, so it can be used outside of discord
+    """
+
+    def __init__(self, client=None, message=None, interval=2, length=10):
+        self.client = client
+        self.message = message
+        self.interval = interval
+        self.length = length
+
+        if message:
+            self.message_content = message.content
+        else:
+            self.message_content = ''
+
+        self.percent = 0
+        self.shown_percent = None
+        self.last_edit_time = None
+
+    def render(self):
+        """Returns the message content with a progress bar made by GameObject.progress_bar"""
+        progress_string = GameObject.progress_bar(self.percent, self.length)
+        return f'{self.message_content}\nProgress: {progress_string}'
+
+    async def update(self, percent):
+        """Sets the progress from 0 to 100. Only edits the message if the last edit was at least interval seconds ago"""
+        self.percent = percent
+
+        if self.last_edit_time is None or time.monotonic() - self.last_edit_time >= self.interval:
+            await self.show()
+
+    async def finish(self, percent=100):
+        await self.update(percent)
+        await self.show()
+
+    async def show(self):
+        if not self.client or not self.message or self.percent == self.shown_percent:
+            return
+
+        self.message = await self.client.edit_message(self.message, self.render())
+        self.shown_percent = self.percent
+        self.last_edit_time = time.monotonic()
+
+
 class Vector2:
     def __init__(self, x, y):
         self.x = x
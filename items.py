@@ -1,4 +1,5 @@
 import random
+import numpy as np
 from game import GameObject
 from game import Vector2
 import logging
@@ -41,11 +42,13 @@ class Item(GameObject):
 
     item_types = ('weapon', 'armour')
 
-    def __init__(self, name, item_stats, position=None, adjectives=None):
-        super().__init__(position, adjectives)
+    def __init__(self, name, item_stats, position=None, adjectives=None, rng=None):
+        super().__init__(position, adjectives, rng)
         self.name = name
         self.item_stats = item_stats
         self.known_stats = {}
+        # worked out by total_value the first time it is read, and again after clear_cached_value
+        self.cached_value = None
 
     def __str__(self):
         return self.name
@@ -68,10 +71,30 @@ class Item(GameObject):
 
     @property
     def total_value(self):
+        if self.cached_value is None:
+            self.cached_value = self.get_value()
+            self.item_stats['total_value'] = self.cached_value
+        return self.cached_value
+
+    def get_value(self):
+        """Works out the value of the item from its stats. total_value keeps the result"""
         return self.item_stats['rarity'] * 50
 
+    def clear_cached_value(self):
+        """
+        Works out the value again and returns it, call it after changing item_stats directly.
+        item_stats['total_value'] is read on its own, so it is updated straight away
+        """
+        self.cached_value = None
+        return self.total_value
+
+    def set_stat(self, stat, value):
+        """Changes one of the item stats and updates the value of the item"""
+        self.item_stats[stat] = value
+        self.clear_cached_value()
+
     @classmethod
-    def generate_loot(cls, level=None, total_loot=None, loot_distribution=None):
+    def generate_loot(cls, level=None, total_loot=None, loot_distribution=None, rng=None):
         """
         Generates a list of loot
 
@@ -80,27 +103,29 @@ class Item(GameObject):
         loot_distribution: higher values means higher average rarity, but less number of items
 
         """
+        if not rng:
+            rng = random
         if not level:
-            level = cls.get_level() * 10
+            level = cls.get_level(rng) * 10
 
         if not total_loot:
-            total_loot = cls.get_level() * 0.1 * (level ** 2 - cls.zero_to_range(level ** 2))
+            total_loot = cls.get_level(rng) * 0.1 * (level ** 2 - cls.zero_to_range(level ** 2, rng))
 
         if not loot_distribution:
-            loot_distribution = random.uniform(0.5, 2)
+            loot_distribution = rng.uniform(0.5, 2)
 
         loot_list = []
         try_num = 0
         while total_loot > 0 and try_num < 50:
-            item_type = cls.item_types[random.randint(0, len(cls.item_types) - 1)]
-            item_rarity = (level / 10) * (loot_distribution - cls.zero_to_range(loot_distribution / 2))
+            item_type = cls.item_types[rng.randint(0, len(cls.item_types) - 1)]
+            item_rarity = (level / 10) * (loot_distribution - cls.zero_to_range(loot_distribution / 2, rng))
 
             if item_type == 'weapon':
-                loot_item = Weapon.get_random_weapon(rarity=item_rarity)
+                loot_item = Weapon.get_random_weapon(rarity=item_rarity, rng=rng)
                 loot_value = loot_item.total_value
 
             elif item_type == 'armour':
-                loot_item = Armour.get_random_armour(rarity=item_rarity)
+                loot_item = Armour.get_random_armour(rarity=item_rarity, rng=rng)
                 loot_value = loot_item.total_value
 
             else:
@@ -133,67 +158,55 @@ class Item(GameObject):
 
     @staticmethod
     def test_item_balance(item_classification, item_type=None, sample_size=1000):
-        """Returns comparisons of the average stats of items for balance purposes"""
-        # Don't attempt to read this code
+        """
+        Returns comparisons of the average stats of items for balance purposes.
+        Only running totals are kept, balance.py streams millions of items the same way with percentiles
+        """
         do_not_compare = []
         item_type_list = []
-        item_list = []
 
         if item_classification == 'weapon':
             item_type_list = Weapon.weapon_types
         elif item_classification == 'armour':
             item_type_list = Armour.armour_materials
+        else:
+            raise Exception(item_classification + ' is not a valid type of item! try \"weapon\" or \"armour\"')
+
+        if item_type:
+            item_type_list = [item_type]
+
+        # item type -> stat -> total, and how many items of each type there are
+        stat_totals = {item_type_name: {} for item_type_name in item_type_list}
+        item_counts = {item_type_name: 0 for item_type_name in item_type_list}
 
         logging.debug('Generating Items')
-        i = 0
-        while i < sample_size:
+        for _ in range(sample_size):
             if item_classification == 'weapon':
-                item_list.append(Weapon.get_random_weapon(None, item_type))
-            elif item_classification == 'armour':
-                item_list.append(Armour.get_random_armour(None, None, item_type))
+                item_stats = Weapon.get_random_weapon(None, item_type).item_stats
             else:
-                raise Exception(item_classification + ' is not a valid type of item! try \"weapon\" or \"armour\"')
-            i += 1
-        # we made a list of rng items, lets sort and compare this info
+                item_stats = Armour.get_random_armour(None, None, item_type).item_stats
 
-        separated_items = {}
-        # separated_items is a dict with keys as the item_type string and values that are lists which include all items of that item type
-        if item_type:
-            separated_items = {item_type: item_list}
-        else:
-            for item_type in item_type_list:
-                separated_items[item_type] = []
-                for item in item_list:
-                    if item.item_stats['item_type'] == item_type:
-                        separated_items[item_type].append(item)
+            item_type_name = item_type or item_stats['item_type']
+            if item_type_name not in stat_totals:
+                continue
+            item_counts[item_type_name] += 1
+
+            type_totals = stat_totals[item_type_name]
+            for stat in item_stats:
+                if (isinstance(item_stats[stat], int) or isinstance(item_stats[stat], float)) and stat not in do_not_compare:
+                    type_totals[stat] = type_totals.get(stat, 0) + item_stats[stat]
 
         all_item_averages = {}
         # all_item_averages is a dict with keys being the item type and values being another dict with keys being stat names and values being the average value for that stat
-        for item_type in separated_items:
-            # Loop through each item type
-            logging.debug('Getting average stats for ' + item_type)
-            item_stat_averages = {}
-            num_of_items = 0
-
-            for item in separated_items[item_type]:
-                # Loop through each item of the item type
-                item_stats = item.item_stats
-
-                for stat in item_stats:
-                    # Loop through each item stat in the item
-                    if (isinstance(item_stats[stat], int) or isinstance(item_stats[stat], float)) and stat not in do_not_compare:
-                        if stat not in item_stat_averages:
-                            item_stat_averages[stat] = 0
-                        item_stat_averages[stat] += item_stats[stat]
-                num_of_items += 1
-
-            for stat in item_stat_averages:
-                item_stat_averages[stat] /= num_of_items
-                item_stat_averages[stat] = round(item_stat_averages[stat], 2)
+        for item_type_name, type_totals in stat_totals.items():
+            if not item_counts[item_type_name]:
+                continue
+            logging.debug('Getting average stats for ' + item_type_name)
+            item_stat_averages = {stat: round(total / item_counts[item_type_name], 2) for stat, total in type_totals.items()}
 
             if item_classification == 'weapon':
                 item_stat_averages['dmg_per_ap'] = round(item_stat_averages['total_dmg'] / item_stat_averages['ap'], 2)
-            all_item_averages[item_type] = item_stat_averages
+            all_item_averages[item_type_name] = item_stat_averages
 
         cleaned_data_string = '\n'
         for item_type in all_item_averages:
@@ -239,8 +252,10 @@ class Weapon(Item):
 
     weapon_value_multiplier = 4
 
-    def __init__(self, name, weapon_stats, position=None, adjectives=None):
-        super().__init__(name, weapon_stats, position, adjectives)
+    weapon_value_arrays = None
+
+    def __init__(self, name, weapon_stats, position=None, adjectives=None, rng=None):
+        super().__init__(name, weapon_stats, position, adjectives, rng)
 
         self.item_stats['total_dmg'] = 0
         for dmg_type in weapon_stats:
@@ -248,6 +263,13 @@ class Weapon(Item):
                 # Check if dmg_type is a damage type instead of something like ap or weight
                 self.item_stats['total_dmg'] += weapon_stats[dmg_type]
 
+        self.useful_dmg_values = {}
+        self.update_useful_dmg_values()
+
+        self.item_stats['total_value'] = self.total_value
+
+    def update_useful_dmg_values(self):
+        """The dmg types the weapon actually does, shown by __str__"""
         self.useful_dmg_values = {}
         for dmg_type in self.item_stats:
             if dmg_type in Weapon.dmg_type_list:
@@ -255,8 +277,6 @@ class Weapon(Item):
                 if self.item_stats[dmg_type] != 0:
                     self.useful_dmg_values[dmg_type] = str(self.item_stats[dmg_type])
 
-        self.item_stats['total_value'] = self.total_value
-
     def __str__(self):
         weapon_stat_string = f'Level {str(int(self.item_stats["rarity"] * 10))} -- {self.name}\n'
         for dmg_type in self.useful_dmg_values:
@@ -277,330 +297,223 @@ class Weapon(Item):
         """
         description = ''
 
-    @property
-    def total_value(self):
-        self.item_stats['total_value'] = max(1, int((self.item_stats['total_dmg'] / self.item_stats['ap']) * self.item_stats['rarity'] * Weapon.weapon_value_multiplier))
+    def get_value(self):
         return max(1, int((self.item_stats['total_dmg'] / self.item_stats['ap']) * self.item_stats['rarity'] * Weapon.weapon_value_multiplier))
 
+    def clear_cached_value(self):
+        self.item_stats['total_dmg'] = 0
+        for dmg_type in Weapon.dmg_type_list:
+            if dmg_type in self.item_stats:
+                self.item_stats['total_dmg'] += self.item_stats[dmg_type]
+        self.update_useful_dmg_values()
+        return super().clear_cached_value()
+
+    # ap, ap multiplier, range, range skew percent, weight, weight skew percent, ammo type, one handed,
+    # throw dmg multiplier, then a row for each type in dmg_type_list:
+    # (multiplier, offset, spread, zero to range, spread exponent) gives
+    # multiplier * rarity ** 2 + offset - rarity ** spread exponent * spread * zero_to_range(zero to range),
+    # the last part only if zero to range is not None, so only those rows draw from the rng
+    weapon_value_table = {
+        'sword': (45, 1, 0.8, 20, 3, 20, None, True, 0.5, (
+            (5, -70, 0, None, 1),
+            (20, 3, 0, None, 1),
+            (5, -65, 0, None, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 150, 8, 1))),
+        'axe': (45, 1, 0.6, 40, 3, 20, None, True, 1.1, (
+            (4, -20, 0, None, 1),
+            (20, 3, 0, None, 1),
+            (5, -15, 0, None, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 150, 8, 1))),
+        'mace': (45, 1, 0.7, 20, 2.5, 10, None, True, 0.5, (
+            (20, 3, 0, None, 1),
+            (5, -100, 0, None, 1),
+            (5, -80, 0, None, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 150, 12, 1))),
+        'spear': (45, 1, 2.1, 15, 3, 20, None, False, 2, (
+            (0, 0, 0, None, 1),
+            (5, -80, 0, None, 1),
+            (20, 3, 0, None, 1),
+            (7, 0, 100, 2, 1),
+            (11, 0, 100, 2, 1),
+            (10, 0, 100, 2, 1),
+            (13, 0, 150, 4, 1))),
+        'halberd': (75, 1, 1.65, 10, 5, 20, None, False, 0.2, (
+            (5, -100, 0, None, 1),
+            (17, 5, 0, None, 1),
+            (17, 0, 0, None, 1),
+            (15, 0, 100, 4, 1),
+            (13, 0, 100, 2, 1),
+            (13, 0, 100, 2, 1),
+            (13, 0, 150, 16, 1))),
+        'rapier': (20, 1, 1.15, 10, 2, 10, None, True, 0.5, (
+            (5, -200, 0, None, 1),
+            (4, 1, 0, None, 1),
+            (8, 2, 0, None, 1),
+            (3, 0, 100, 2, 1),
+            (3, 0, 100, 3, 1),
+            (3, 0, 100, 3, 1),
+            (5, 0, 150, 4, 1))),
+        'greatsword': (100, 1, 1.65, 10, 5, 10, None, False, 0.8, (
+            (15, -20, 0, None, 1),
+            (40, 5, 0, None, 1),
+            (10, -50, 0, None, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 150, 12, 1))),
+        'dagger': (7, 2, 0.385, 70, 0.5, 50, None, True, 1.2, (
+            (1, -100, 0, None, 1),
+            (6, 1, 0, None, 1),
+            (5, 1, 0, None, 1),
+            (2, 0, 100, 4, 1),
+            (2, 0, 100, 3, 1),
+            (2, 0, 100, 3, 1),
+            (10, 0, 150, 4, 1))),
+        'caestus': (4, 2, 0.1, 10, 0.3, 10, None, False, 0.1, (
+            (4, 1, 0, None, 1),
+            (2, -100, 0, None, 1),
+            (2, -50, 0, None, 1),
+            (5, 0, 100, 4, 1),
+            (5, 0, 100, 2, 1),
+            (5, 0, 100, 3, 1),
+            (3, 0, 150, 8, 1))),
+        'bow': (45, 1, 140, 20, 2, 10, 'arrow', False, 0.1, (
+            (2, -150, 0, None, 1),
+            (5, -100, 0, None, 1),
+            (15, 3, 0, None, 1),
+            (5, 0, 100, 3, 1),
+            (10, 0, 100, 2, 1),
+            (5, 0, 100, 3, 1),
+            (5, 0, 150, 8, 1))),
+        'glaive': (55, 1, 2.4, 10, 5, 10, None, False, 0.9, (
+            (5, -100, 0, None, 1),
+            (20, 4, 0, None, 1),
+            (5, 1, 0, None, 1),
+            (15, 0, 100, 4, 2),
+            (13, 0, 100, 2, 2),
+            (13, 0, 100, 2, 2),
+            (13, 0, 150, 16, 2))),
+        'katana': (30, 1, 0.7, 20, 3, 20, None, True, 0.7, (
+            (3, -70, 0, None, 1),
+            (13, 3, 0, None, 1),
+            (5, -65, 0, None, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 150, 8, 1))),
+        'nodachi': (80, 1, 0.9, 10, 4, 10, None, False, 0.8, (
+            (3, -20, 0, None, 1),
+            (40, 5, 0, None, 1),
+            (10, -50, 0, None, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 2, 1),
+            (10, 0, 150, 12, 1))),
+        'wand': (20, 1, 20, 10, 1, 10, 'mana', True, 0.1, (
+            (0, 0, 0, None, 1),
+            (0, 0, 0, None, 1),
+            (0, 0, 0, None, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 4, 1),
+            (5, 3, 0, None, 1),
+            (10, 0, 150, 12, 1))),
+        'wizard staff': (40, 1, 30, 10, 10, 10, 'mana', False, 0.1, (
+            (0, 0, 0, None, 1),
+            (0, 0, 0, None, 1),
+            (0, 0, 0, None, 1),
+            (20, 0, 100, 4, 1),
+            (20, 0, 100, 4, 1),
+            (10, 5, 0, None, 1),
+            (10, 0, 150, 12, 1))),
+        'quarterstaff': (20, 1, 2, 10, 7, 10, 'mana', False, 0.1, (
+            (8, 3, 0, None, 1),
+            (1, -20, 0, None, 1),
+            (3, -20, 0, None, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 8, 1),
+            (10, 0, 150, 12, 1))),
+        'warhammer': (100, 1, 1.5, 20, 10, 10, None, False, 1.2, (
+            (45, 7, 0, None, 1),
+            (10, -50, 0, None, 1),
+            (10, -50, 0, None, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 3, 1),
+            (10, 0, 100, 4, 1),
+            (10, 0, 150, 12, 1))),
+        # Below are unlisted weapon types for use with special enemies/bosses
+        'goop': (30, 1, 2.5, 10, 1, 10, None, False, 2, (
+            (3, 2, 0, None, 1),
+            (3, -20, 0, None, 1),
+            (10, -50, 0, None, 1),
+            (10, 0, 100, 2, 1),
+            (10, 0, 100, 8, 1),
+            (10, 0, 100, 2, 1),
+            (10, 0, 150, 12, 1)))
+    }
+
     @staticmethod
-    def get_weapon_values(rarity=None, weapon_type=None):
+    def get_weapon_values(rarity=None, weapon_type=None, rng=None):
+        """
+        Returns the stats of a weapon of weapon_type from its row of weapon_value_table.
+        The rng is drawn from in the same order as when every weapon type had its own formulas
+        """
+        if not rng:
+            rng = random
         if not rarity:
-            rarity = random.uniform(1, 10)
+            rarity = rng.uniform(1, 10)
         if not weapon_type:
-            weapon_type = Weapon.weapon_types[random.randint(0, len(Weapon.weapon_types) - 1)]
+            weapon_type = Weapon.weapon_types[rng.randint(0, len(Weapon.weapon_types) - 1)]
+
+        weapon_values = Weapon.weapon_value_table.get(weapon_type)
+        if not weapon_values:
+            raise Exception('not a valid weapon type!')
+
+        (ap, ap_multiplier, weapon_range, range_skew, weight, weight_skew,
+         ammo_type, one_handed, throw_dmg_multiplier, dmg_rows) = weapon_values
 
         ap_scalar = 0.15
         rarity_scaling_exponential = rarity**2
         ap_scaling_exponential = rarity**1
+        # rng.uniform(a, b) is a + (b - a) * rng.random(), written out so the 19 draws of
+        # get_skew_multiplier and zero_to_range give the same numbers without two calls each.
+        # -p + 2p * r and 2p * r - p round the same, as adding is commutative
+        random_number = rng.random
+
+        weapon_stats = {
+            'ap': ap * ap_scaling_exponential * ap_scalar * ap_multiplier + 1,
+            'range': weapon_range * (1 + ((2 * range_skew * random_number() - range_skew) / 100)),
+            'weight': weight * (1 + ((2 * weight_skew * random_number() - weight_skew) / 100)),
+            'ammo_type': ammo_type,
+            'one_handed': one_handed,
+            'throw_dmg_multiplier': throw_dmg_multiplier
+        }
 
-        if weapon_type == 'sword':
-            weapon_stats = {
-                'ap': 45 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 0.8 * GameObject.get_skew_multiplier(20),
-                'weight': 3 * GameObject.get_skew_multiplier(20),
-                'ammo_type': None,
-                'one_handed': True,
-                'throw_dmg_multiplier': 0.5,
-                'blunt_dmg': 5 * rarity_scaling_exponential - 70,
-                'slash_dmg': 20 * rarity_scaling_exponential + 3,
-                'puncture_dmg': 5 * rarity_scaling_exponential - 65,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(8))
-            }
-        elif weapon_type == 'axe':
-            weapon_stats = {
-                'ap': 45 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 0.6 * GameObject.get_skew_multiplier(40),
-                'weight': 3 * GameObject.get_skew_multiplier(20),
-                'ammo_type': None,
-                'one_handed': True,
-                'throw_dmg_multiplier': 1.1,
-                'blunt_dmg': 4 * rarity_scaling_exponential - 20,
-                'slash_dmg': 20 * rarity_scaling_exponential + 3,
-                'puncture_dmg': 5 * rarity_scaling_exponential - 15,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(8))
-            }
-        elif weapon_type == 'mace':
-            weapon_stats = {
-                'ap': 45 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 0.7 * GameObject.get_skew_multiplier(20),
-                'weight': 2.5 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': True,
-                'throw_dmg_multiplier': 0.5,
-                'blunt_dmg': 20 * rarity_scaling_exponential + 3,
-                'slash_dmg': 5 * rarity_scaling_exponential - 100,
-                'puncture_dmg': 5 * rarity_scaling_exponential - 80,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        elif weapon_type == 'spear':
-            weapon_stats = {
-                'ap': 45 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 2.1 * GameObject.get_skew_multiplier(15),
-                'weight': 3 * GameObject.get_skew_multiplier(20),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 2,
-                'blunt_dmg': 0,
-                'slash_dmg': 5 * rarity_scaling_exponential - 80,
-                'puncture_dmg': 20 * rarity_scaling_exponential + 3,
-                'electric_dmg': 7 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'fire_dmg': 11 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'true_dmg': 13 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(4))
-            }
-        elif weapon_type == 'halberd':
-            weapon_stats = {
-                'ap': 75 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 1.65 * GameObject.get_skew_multiplier(10),
-                'weight': 5 * GameObject.get_skew_multiplier(20),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.2,
-                'blunt_dmg': 5 * rarity_scaling_exponential - 100,
-                'slash_dmg': 17 * rarity_scaling_exponential + 5,
-                'puncture_dmg': 17 * rarity_scaling_exponential,
-                'electric_dmg': 15 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 13 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'magic_dmg': 13 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'true_dmg': 13 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(16))
-
-            }
-        elif weapon_type == 'rapier':
-            weapon_stats = {
-                'ap': 20 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 1.15 * GameObject.get_skew_multiplier(10),
-                'weight': 2 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': True,
-                'throw_dmg_multiplier': 0.5,
-                'blunt_dmg': 5 * rarity_scaling_exponential - 200,
-                'slash_dmg': 4 * rarity_scaling_exponential + 1,
-                'puncture_dmg': 8 * rarity_scaling_exponential + 2,
-                'electric_dmg': 3 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'fire_dmg': 3 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 3 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 5 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(4))
-
-            }
-        elif weapon_type == 'greatsword':
-            weapon_stats = {
-                'ap': 100 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 1.65 * GameObject.get_skew_multiplier(10),
-                'weight': 5 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.8,
-                'blunt_dmg': 15 * rarity_scaling_exponential - 20,
-                'slash_dmg': 40 * rarity_scaling_exponential + 5,
-                'puncture_dmg': 10 * rarity_scaling_exponential - 50,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-
-            }
-        elif weapon_type == 'dagger':
-            weapon_stats = {
-                'ap': 7 * ap_scaling_exponential * ap_scalar * 2 + 1,
-                'range': 0.385 * GameObject.get_skew_multiplier(70),
-                'weight': 0.5 * GameObject.get_skew_multiplier(50),
-                'ammo_type': None,
-                'one_handed': True,
-                'throw_dmg_multiplier': 1.2,
-                'blunt_dmg': 1 * rarity_scaling_exponential - 100,
-                'slash_dmg': 6 * rarity_scaling_exponential + 1,
-                'puncture_dmg': 5 * rarity_scaling_exponential + 1,
-                'electric_dmg': 2 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 2 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 2 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(4))
-
-            }
-        elif weapon_type == 'caestus':
-            weapon_stats = {
-                'ap': 4 * ap_scaling_exponential * ap_scalar * 2 + 1,
-                'range': 0.1 * GameObject.get_skew_multiplier(10),
-                'weight': 0.3 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.1,
-                'blunt_dmg': 4 * rarity_scaling_exponential + 1,
-                'slash_dmg': 2 * rarity_scaling_exponential - 100,
-                'puncture_dmg': 2 * rarity_scaling_exponential - 50,
-                'electric_dmg': 5 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 5 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'magic_dmg': 5 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 3 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(8))
-
-            }
-        elif weapon_type == 'bow':
-            weapon_stats = {
-                'ap': 45 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 140 * GameObject.get_skew_multiplier(20),
-                'weight': 2 * GameObject.get_skew_multiplier(10),
-                'ammo_type': 'arrow',
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.1,
-                'blunt_dmg': 2 * rarity_scaling_exponential - 150,
-                'slash_dmg': 5 * rarity_scaling_exponential - 100,
-                'puncture_dmg': 15 * rarity_scaling_exponential + 3,
-                'electric_dmg': 5 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'magic_dmg': 5 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 5 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(8))
-            }
-        elif weapon_type == 'glaive':
-            weapon_stats = {
-                'ap': 55 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 2.4 * GameObject.get_skew_multiplier(10),
-                'weight': 5 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.9,
-                'blunt_dmg': 5 * rarity_scaling_exponential - 100,
-                'slash_dmg': 20 * rarity_scaling_exponential + 4,
-                'puncture_dmg': 5 * rarity_scaling_exponential + 1,
-                'electric_dmg': 15 * rarity_scaling_exponential - (rarity_scaling_exponential * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 13 * rarity_scaling_exponential - (rarity_scaling_exponential * 100 * Weapon.zero_to_range(2)),
-                'magic_dmg': 13 * rarity_scaling_exponential - (rarity_scaling_exponential * 100 * Weapon.zero_to_range(2)),
-                'true_dmg': 13 * rarity_scaling_exponential - (rarity_scaling_exponential * 150 * Weapon.zero_to_range(16))
-            }
-        elif weapon_type == 'katana':
-            weapon_stats = {
-                'ap': 30 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 0.7 * GameObject.get_skew_multiplier(20),
-                'weight': 3 * GameObject.get_skew_multiplier(20),
-                'ammo_type': None,
-                'one_handed': True,
-                'throw_dmg_multiplier': 0.7,
-                'blunt_dmg': 3 * rarity_scaling_exponential - 70,
-                'slash_dmg': 13 * rarity_scaling_exponential + 3,
-                'puncture_dmg': 5 * rarity_scaling_exponential - 65,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(8))
-            }
-        elif weapon_type == 'nodachi':
-            weapon_stats = {
-                'ap': 80 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 0.9 * GameObject.get_skew_multiplier(10),
-                'weight': 4 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.8,
-                'blunt_dmg': 3 * rarity_scaling_exponential - 20,
-                'slash_dmg': 40 * rarity_scaling_exponential + 5,
-                'puncture_dmg': 10 * rarity_scaling_exponential - 50,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        elif weapon_type == 'wand':
-            weapon_stats = {
-                'ap': 20 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 20 * GameObject.get_skew_multiplier(10),
-                'weight': 1 * GameObject.get_skew_multiplier(10),
-                'ammo_type': 'mana',
-                'one_handed': True,
-                'throw_dmg_multiplier': 0.1,
-                'blunt_dmg': 0,
-                'slash_dmg': 0,
-                'puncture_dmg': 0,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'magic_dmg': 5 * rarity_scaling_exponential + 3,
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        elif weapon_type == 'wizard staff':
-            weapon_stats = {
-                'ap': 40 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 30 * GameObject.get_skew_multiplier(10),
-                'weight': 10 * GameObject.get_skew_multiplier(10),
-                'ammo_type': 'mana',
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.1,
-                'blunt_dmg': 0,
-                'slash_dmg': 0,
-                'puncture_dmg': 0,
-                'electric_dmg': 20 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 20 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'magic_dmg': 10 * rarity_scaling_exponential + 5,
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        elif weapon_type == 'quarterstaff':
-            weapon_stats = {
-                'ap': 20 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 2 * GameObject.get_skew_multiplier(10),
-                'weight': 7 * GameObject.get_skew_multiplier(10),
-                'ammo_type': 'mana',
-                'one_handed': False,
-                'throw_dmg_multiplier': 0.1,
-                'blunt_dmg': 8 * rarity_scaling_exponential + 3,
-                'slash_dmg': 1 * rarity_scaling_exponential - 20,
-                'puncture_dmg': 3 * rarity_scaling_exponential - 20,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(8)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        elif weapon_type == 'warhammer':
-            weapon_stats = {
-                'ap': 100 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 1.5 * GameObject.get_skew_multiplier(20),
-                'weight': 10 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 1.2,
-                'blunt_dmg': 45 * rarity_scaling_exponential + 7,
-                'slash_dmg': 10 * rarity_scaling_exponential - 50,
-                'puncture_dmg': 10 * rarity_scaling_exponential - 50,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(3)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(4)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        # Below are unlisted weapon types for use with special enemies/bosses
-        elif weapon_type == 'goop':
-            weapon_stats = {
-                'ap': 30 * ap_scaling_exponential * ap_scalar + 1,
-                'range': 2.5 * GameObject.get_skew_multiplier(10),
-                'weight': 1 * GameObject.get_skew_multiplier(10),
-                'ammo_type': None,
-                'one_handed': False,
-                'throw_dmg_multiplier': 2,
-                'blunt_dmg': 3 * rarity_scaling_exponential + 2,
-                'slash_dmg': 3 * rarity_scaling_exponential - 20,
-                'puncture_dmg': 10 * rarity_scaling_exponential - 50,
-                'electric_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'fire_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(8)),
-                'magic_dmg': 10 * rarity_scaling_exponential - (rarity * 100 * Weapon.zero_to_range(2)),
-                'true_dmg': 10 * rarity_scaling_exponential - (rarity * 150 * Weapon.zero_to_range(12))
-            }
-        else:
-            raise Exception('not a valid weapon type!')
-
-        for dmg_type in weapon_stats:
-
-            skew_multiplier = Weapon.get_skew_multiplier()
+        dmg_values = []
+        for multiplier, offset, spread, zero_range, spread_exponent in dmg_rows:
+            dmg_value = multiplier * rarity_scaling_exponential + offset
+            if zero_range is not None:
+                spread_scale = rarity if spread_exponent == 1 else rarity_scaling_exponential
+                dmg_value = dmg_value - (spread_scale * spread * (zero_range * random_number()))
+            dmg_values.append(dmg_value)
 
-            if dmg_type in Weapon.dmg_type_list:
-                """Check if dmg_type is a damage type instead of something like ap or weight"""
-                weapon_stats[dmg_type] = weapon_stats[dmg_type] * skew_multiplier
-                weapon_stats[dmg_type] = int(weapon_stats[dmg_type])
+        # every stat used to draw a skew multiplier, but only the dmg types use theirs
+        for _ in range(0, len(weapon_stats)):
+            random_number()
 
-                if weapon_stats[dmg_type] < 0:
-                    weapon_stats[dmg_type] = 0
+        skew_percent = Weapon.stat_skew_percent
+        for dmg_type, dmg_value in zip(Weapon.dmg_type_list, dmg_values):
+            dmg_value = int(dmg_value * (1 + ((2 * skew_percent * random_number() - skew_percent) / 100)))
+            weapon_stats[dmg_type] = dmg_value if dmg_value > 0 else 0
 
         weapon_stats['weight'] = round(weapon_stats['weight'], 1)
         weapon_stats['range'] = round(weapon_stats['range'], 2)
@@ -610,21 +523,118 @@ class Weapon(Item):
 
         return weapon_stats
 
+    @staticmethod
+    def get_weapon_value_arrays():
+        """
+        Returns weapon_value_table as numpy arrays indexed by the position of the weapon type in the table,
+        so generate_batch can look up the values of every weapon at once
+        """
+        if Weapon.weapon_value_arrays is None:
+            table_rows = list(Weapon.weapon_value_table.values())
+            dmg_rows = np.array([[(multiplier, offset, spread if zero_range is not None else 0,
+                                   zero_range if zero_range is not None else 0, spread_exponent)
+                                  for multiplier, offset, spread, zero_range, spread_exponent in table_row[9]]
+                                 for table_row in table_rows], dtype=np.float64)
+
+            Weapon.weapon_value_arrays = {
+                'weapon_types': tuple(Weapon.weapon_value_table),
+                'ap': np.array([table_row[0] * table_row[1] for table_row in table_rows], dtype=np.float64),
+                'range': np.array([table_row[2] for table_row in table_rows], dtype=np.float64),
+                'range_skew': np.array([table_row[3] for table_row in table_rows], dtype=np.float64),
+                'weight': np.array([table_row[4] for table_row in table_rows], dtype=np.float64),
+                'weight_skew': np.array([table_row[5] for table_row in table_rows], dtype=np.float64),
+                'dmg_multiplier': dmg_rows[:, :, 0],
+                'dmg_offset': dmg_rows[:, :, 1],
+                'dmg_spread': dmg_rows[:, :, 2] * dmg_rows[:, :, 3],
+                'dmg_spread_squared': dmg_rows[:, :, 4] != 1
+            }
+
+        return Weapon.weapon_value_arrays
+
+    @staticmethod
+    def generate_batch(weapon_count, rarities=None, weapon_types=None, rng=None):
+        """
+        Returns a WeaponBatch of weapon_count weapons, with their stats worked out as numpy columns.
+        rarities and weapon_types can be one value for every weapon or a sequence with a value per weapon,
+        and are random like in get_random_weapon when not given.
+        The stats are drawn from a numpy generator seeded from rng, so they are not the ones get_random_weapon
+        would give for the same rng, but the same rng always gives the same batch
+        """
+        if not rng:
+            rng = random
+        numpy_rng = np.random.default_rng(rng.getrandbits(64))
+        weapon_value_arrays = Weapon.get_weapon_value_arrays()
+        table_types = weapon_value_arrays['weapon_types']
+
+        if rarities is None:
+            # GameObject.get_level for every weapon
+            rarities = 4 * (0.1919 * numpy_rng.uniform(0, 10, weapon_count) - 0.608) ** 3 + 1
+        rarities = np.maximum(np.broadcast_to(np.asarray(rarities, dtype=np.float64), (weapon_count,)), 0.1)
+
+        if weapon_types is None:
+            type_indexes = numpy_rng.integers(0, len(Weapon.weapon_types), weapon_count)
+        elif isinstance(weapon_types, str):
+            type_indexes = np.full(weapon_count, table_types.index(weapon_types))
+        else:
+            type_indexes = np.array([table_types.index(weapon_type) for weapon_type in weapon_types])
+            if len(type_indexes) != weapon_count:
+                raise Exception(f'{len(type_indexes)} weapon types were given for {weapon_count} weapons!')
+
+        ap_scalar = 0.15
+        rarity_scaling_exponential = rarities ** 2
+        skew_percent = Weapon.stat_skew_percent
+
+        ap = weapon_value_arrays['ap'][type_indexes] * rarities * ap_scalar + 1
+
+        range_skew = weapon_value_arrays['range_skew'][type_indexes]
+        weapon_range = weapon_value_arrays['range'][type_indexes] * (
+            1 + (2 * range_skew * numpy_rng.random(weapon_count) - range_skew) / 100)
+        weight_skew = weapon_value_arrays['weight_skew'][type_indexes]
+        weight = weapon_value_arrays['weight'][type_indexes] * (
+            1 + (2 * weight_skew * numpy_rng.random(weapon_count) - weight_skew) / 100)
+
+        # rows with no spread have a spread of 0, so drawing for them changes nothing
+        spread_scale = np.where(weapon_value_arrays['dmg_spread_squared'][type_indexes],
+                                rarity_scaling_exponential[:, None], rarities[:, None])
+        dmg = (weapon_value_arrays['dmg_multiplier'][type_indexes] * rarity_scaling_exponential[:, None]
+               + weapon_value_arrays['dmg_offset'][type_indexes]
+               - spread_scale * weapon_value_arrays['dmg_spread'][type_indexes]
+               * numpy_rng.random((weapon_count, len(Weapon.dmg_type_list))))
+        dmg *= 1 + (2 * skew_percent * numpy_rng.random(dmg.shape) - skew_percent) / 100
+        # int() rounds towards zero, the same as the cast
+        dmg = np.maximum(dmg.astype(np.int64), 0)
+
+        return WeaponBatch(type_indexes, rarities, ap, np.round(weapon_range, 2), np.round(weight, 1), dmg)
+
     @classmethod
-    def get_random_weapon(cls, rarity=None, weapon_type=None):
+    def get_random_weapon(cls, rarity=None, weapon_type=None, rng=None):
         # Returns a randomized weapon with the option to specify its rarity and type
+        if not rng:
+            rng = random
 
         if not rarity:
-            rarity = GameObject.get_level()
+            rarity = GameObject.get_level(rng)
         if not weapon_type:
-            weapon_type = Weapon.weapon_types[random.randint(0, len(Weapon.weapon_types) - 1)]
+            weapon_type = Weapon.weapon_types[rng.randint(0, len(Weapon.weapon_types) - 1)]
         if rarity < 0.1:
             rarity = 0.1
             logger.debug('Weapon level is less than 1')
 
+        weapon_stats = Weapon.get_weapon_values(rarity, weapon_type, rng)
+        weapon_name, adjectives = Weapon.get_weapon_name(weapon_stats, rng)
+
+        return cls(weapon_name, weapon_stats, None, adjectives, rng)
+
+    @staticmethod
+    def get_weapon_name(weapon_stats, rng=None):
+        """Returns the name and adjectives of a weapon from its stats, as given by get_weapon_values"""
+        if not rng:
+            rng = random
+
+        rarity = weapon_stats['rarity']
+        weapon_type = weapon_stats['item_type']
         rarity_scaling_exponential = pow(rarity, 2)
         weapon_name = weapon_type
-        weapon_stats = Weapon.get_weapon_values(rarity, weapon_type)
         adjectives = []
 
         total_dmg = 0
@@ -721,20 +731,20 @@ class Weapon(Item):
                             'precise'
                         )
 
-                    adjective = adjective_list[random.randint(0, len(adjective_list) - 1)]
+                    adjective = adjective_list[rng.randint(0, len(adjective_list) - 1)]
                     adjectives.append(adjective)
                     weapon_name = f'{adjective} {weapon_name}'
 
         if dmg_per_ap < 5:
-            adjective = Item.boring_adjectives[random.randint(0, len(Item.boring_adjectives) - 1)]
+            adjective = Item.boring_adjectives[rng.randint(0, len(Item.boring_adjectives) - 1)]
             adjectives.append(adjective)
             weapon_name = f'{adjective} {weapon_name}'
 
         if dmg_per_ap > rarity_scaling_exponential * 4.5 / rarity and rarity > 2.5:
-            if weapon_type in Weapon.japanese_weapons or random.uniform(0, 1) > 0.8:
-                fantasy_name = GameObject.get_fantasy_name(random.randint(2, 2), GameObject.japanese_letters, GameObject.japanese_letters)
+            if weapon_type in Weapon.japanese_weapons or rng.uniform(0, 1) > 0.8:
+                fantasy_name = GameObject.get_fantasy_name(rng.randint(2, 2), GameObject.japanese_letters, GameObject.japanese_letters, rng)
             else:
-                fantasy_name = GameObject.get_fantasy_name(random.randint(2, 2))
+                fantasy_name = GameObject.get_fantasy_name(rng.randint(2, 2), rng=rng)
 
             weapon_titles = [
                 ' of ' + fantasy_name,
@@ -753,9 +763,68 @@ class Weapon(Item):
                 ' - \"The ' + weapon_type + ' of all ' + weapon_type + 's\"',
                 ' - One ' + weapon_type + ' to rule them all.'
                 ]
-            weapon_name += weapon_titles[random.randint(0, len(weapon_titles) - 1)]
+            weapon_name += weapon_titles[rng.randint(0, len(weapon_titles) - 1)]
 
-        return cls(weapon_name, weapon_stats, None, adjectives)
+        return weapon_name, adjectives
+
+
+class WeaponBatch:
+    """
+    The stats of many weapons as numpy columns, made by Weapon.generate_batch.
+    Each row is one weapon, and Weapon objects are only made when get_weapon or to_weapons is called
+    """
+
+    def __init__(self, type_indexes, rarities, ap, weapon_range, weight, dmg):
+        self.type_indexes = type_indexes
+        self.rarities = rarities
+        self.ap = ap
+        self.range = weapon_range
+        self.weight = weight
+        # one column for each type in Weapon.dmg_type_list
+        self.dmg = dmg
+
+        self.total_dmg = dmg.sum(axis=1)
+        self.dmg_per_ap = self.total_dmg / ap
+        # Weapon.total_value for every weapon
+        self.total_value = np.maximum(
+            1, (self.dmg_per_ap * rarities * Weapon.weapon_value_multiplier).astype(np.int64))
+
+    def __len__(self):
+        return len(self.type_indexes)
+
+    @property
+    def weapon_types(self):
+        return np.array(Weapon.get_weapon_value_arrays()['weapon_types'])[self.type_indexes]
+
+    def get_weapon_stats(self, weapon_index):
+        """Returns the stats of one weapon in the same form as Weapon.get_weapon_values"""
+        weapon_type = Weapon.get_weapon_value_arrays()['weapon_types'][self.type_indexes[weapon_index]]
+        ammo_type, one_handed, throw_dmg_multiplier = Weapon.weapon_value_table[weapon_type][6:9]
+
+        weapon_stats = {
+            'ap': float(self.ap[weapon_index]),
+            'range': float(self.range[weapon_index]),
+            'weight': float(self.weight[weapon_index]),
+            'ammo_type': ammo_type,
+            'one_handed': one_handed,
+            'throw_dmg_multiplier': throw_dmg_multiplier
+        }
+        for dmg_type, dmg_value in zip(Weapon.dmg_type_list, self.dmg[weapon_index].tolist()):
+            weapon_stats[dmg_type] = dmg_value
+
+        weapon_stats['rarity'] = float(self.rarities[weapon_index])
+        weapon_stats['item_type'] = weapon_type
+
+        return weapon_stats
+
+    def get_weapon(self, weapon_index, rng=None):
+        """Returns one weapon of the batch, named by Weapon.get_weapon_name"""
+        weapon_stats = self.get_weapon_stats(weapon_index)
+        weapon_name, adjectives = Weapon.get_weapon_name(weapon_stats, rng)
+        return Weapon(weapon_name, weapon_stats, None, adjectives, rng)
+
+    def to_weapons(self, rng=None):
+        return [self.get_weapon(weapon_index, rng) for weapon_index in range(len(self))]
 
 
 class Armour(Item):
@@ -800,15 +869,22 @@ class Armour(Item):
 
     armour_value_multiplier = 2
 
-    def __init__(self, name, armour_values, position=None, adjectives=None):
-        super().__init__(name, armour_values, position, adjectives)
+    armour_value_arrays = None
+
+    def __init__(self, name, armour_values, position=None, adjectives=None, rng=None):
+        super().__init__(name, armour_values, position, adjectives, rng)
         self.name = name
         self.item_stats = armour_values
         self.useful_resistances = {}
         self.useful_multipliers = {}
         self.item_stats['total_value'] = self.total_value
         self.adjectives = adjectives
+        self.update_useful_stats()
 
+    def update_useful_stats(self):
+        """The resistances and multipliers the armour actually has, shown by __str__"""
+        self.useful_resistances = {}
+        self.useful_multipliers = {}
         for value in self.item_stats:
             if value in Armour.armour_resistance_types:
                 if self.item_stats[value] != 0:
@@ -833,176 +909,190 @@ class Armour(Item):
 
         return 'Level ' + str(int(self.item_stats['rarity'] * 10)) + ' -- ' + self.name + '\n' + armour_stat_string
 
-    @property
-    def total_value(self):
-        self.item_stats['total_value'] = max(1, int((self.item_stats['total_protection'] / (self.item_stats['total_multiplier'] / 2)) * Armour.armour_value_multiplier))
+    def get_value(self):
         return max(1, int((self.item_stats['total_protection'] / (self.item_stats['total_multiplier'] / 2)) * Armour.armour_value_multiplier))
 
+    def clear_cached_value(self):
+        self.item_stats['total_protection'] = 0
+        self.item_stats['total_multiplier'] = 1
+        for resistance_type in Armour.armour_resistance_types:
+            self.item_stats['total_protection'] += self.item_stats.get(resistance_type, 0)
+        for multiplier_type in Armour.armour_multiplier_types:
+            self.item_stats['total_multiplier'] *= self.item_stats.get(multiplier_type, 1)
+        self.update_useful_stats()
+        return super().clear_cached_value()
+
+    # weight, then a row for each type in armour_resistance_types:
+    # (multiplier, offset, zero to range) gives
+    # multiplier * rarity ** 1.6 + offset - rarity ** 1.6 * 100 * zero_to_range(zero to range),
+    # then a row for each of the dmg multipliers in armour_multiplier_types:
+    # (value, zero to range) gives value - zero_to_range(zero to range).
+    # The zero_to_range parts are only there if zero to range is not None, so only those rows draw from the rng
+    armour_value_table = {
+        'cloth': (8, (
+            (0.5, -100, None),
+            (3, 5, None),
+            (1, -3, None),
+            (1, -3, None),
+            (5, 0, 4),
+            (0, 0, None),
+            (5, 0, 2)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 30),
+            (3, 10),
+            (3, 20))),
+        'leather': (12, (
+            (0.3, -100, None),
+            (5, 7, None),
+            (1.5, -3, None),
+            (1.3, -3, None),
+            (5, 0, 4),
+            (0, 0, None),
+            (5, 0, 2)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 30),
+            (3, 12),
+            (3, 20))),
+        'wooden': (15, (
+            (0.3, -100, None),
+            (2, -3, None),
+            (5, 5, None),
+            (3, -3, None),
+            (5, 0, 4),
+            (0, 0, None),
+            (5, 0, 2)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 30),
+            (3, 8),
+            (3, 20))),
+        'chainmail': (20, (
+            (0.5, -100, None),
+            (2, 0, None),
+            (5, 10, None),
+            (1, -3, None),
+            (2, 0, 4),
+            (2, 0, 4),
+            (2, 0, 4)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 10),
+            (3, 20),
+            (3, 20))),
+        'bronze': (30, (
+            (0.5, -100, None),
+            (1, -3, None),
+            (10, 10, None),
+            (5, 3, None),
+            (0, 0, None),
+            (2, 0, 4),
+            (0, 1, None)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 5),
+            (3, 30),
+            (3, 10))),
+        'iron': (40, (
+            (0.5, -100, None),
+            (2, -3, None),
+            (13, 10, None),
+            (7, 4, None),
+            (0, 0, None),
+            (2, 0, 3),
+            (0, 1, None)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 4),
+            (3, 30),
+            (3, 10))),
+        'steel': (50, (
+            (0.5, -100, None),
+            (3, -3, None),
+            (15, 10, None),
+            (10, 5, None),
+            (0, 0, None),
+            (2, 0, 3),
+            (0, 1, None)), (
+            (1, None),
+            (1, None),
+            (1, None),
+            (1, None),
+            (3, 5),
+            (3, 30),
+            (3, 8)))
+    }
+
+    # the range of the weight modifier each armour type draws
+    armour_type_weight_modifiers = {
+        'helmet': (0.2, 0.3),
+        'chestpiece': (0.9, 1.1),
+        'arm guards': (0.15, 0.25),
+        'gloves': (0.1, 0.15),
+        'leggings': (0.7, 0.8)
+    }
+
     @staticmethod
-    def get_armour_values(rarity=None, armour_type=None, armour_material=None):
+    def get_armour_values(rarity=None, armour_type=None, armour_material=None, rng=None):
+        """
+        Returns the stats of a piece of armour of armour_material from its row of armour_value_table.
+        The rng is drawn from in the same order as when every material had its own formulas
+        """
+        if not rng:
+            rng = random
         if not rarity:
-            rarity = GameObject.get_level()
+            rarity = GameObject.get_level(rng)
         if not armour_type:
-            armour_type = Armour.armour_types[random.randint(0, len(Armour.armour_types) - 1)]
+            armour_type = Armour.armour_types[rng.randint(0, len(Armour.armour_types) - 1)]
         if not armour_material:
-            armour_material = Armour.armour_materials[random.randint(0, len(Armour.armour_materials) - 1)]
+            armour_material = Armour.armour_materials[rng.randint(0, len(Armour.armour_materials) - 1)]
 
-        weight_modifier = 0
-        rarity_scaling_exponential = pow(rarity, 1.6)
-
-        if armour_material == 'cloth':
-            armour_stats = {
-                'weight': weight_modifier * 8,
-                'general_resistance': rarity_scaling_exponential * 0.5 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 3 + 5,
-                'slash_dmg_resistance': rarity_scaling_exponential * 1 - 3,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 1 - 3,
-                'electric_dmg_resistance': rarity_scaling_exponential * 5 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'fire_dmg_resistance': 0,
-                'magic_dmg_resistance': rarity_scaling_exponential * 5 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(2)),
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier': 3 - (GameObject.zero_to_range(30)),
-                'fire_dmg_multiplier': 3 - (GameObject.zero_to_range(10)),
-                'magic_dmg_multiplier': 3 - (GameObject.zero_to_range(20))
-            }
-        elif armour_material == 'leather':
-            armour_stats = {
-                'weight': weight_modifier * 12,
-                'general_resistance': rarity_scaling_exponential * 0.3 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 5 + 7,
-                'slash_dmg_resistance': rarity_scaling_exponential * 1.5 - 3,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 1.3 - 3,
-                'electric_dmg_resistance': rarity_scaling_exponential * 5 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'fire_dmg_resistance': 0,
-                'magic_dmg_resistance': rarity_scaling_exponential * 5 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(2)),
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier': 3 - (GameObject.zero_to_range(30)),
-                'fire_dmg_multiplier': 3 - (GameObject.zero_to_range(12)),
-                'magic_dmg_multiplier': 3 - (GameObject.zero_to_range(20))
-            }
-        elif armour_material == 'wooden':
-            armour_stats = {
-                'weight': weight_modifier * 15,
-                'general_resistance': rarity_scaling_exponential * 0.3 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 2 - 3,
-                'slash_dmg_resistance': rarity_scaling_exponential * 5 + 5,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 3 - 3,
-                'electric_dmg_resistance': rarity_scaling_exponential * 5 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'fire_dmg_resistance': 0,
-                'magic_dmg_resistance': rarity_scaling_exponential * 5 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(2)),
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier': 3 - (GameObject.zero_to_range(30)),
-                'fire_dmg_multiplier': 3 - (GameObject.zero_to_range(8)),
-                'magic_dmg_multiplier': 3 - (GameObject.zero_to_range(20))
-            }
-        elif armour_material == 'chainmail':
-            armour_stats = {
-                'weight': weight_modifier * 20,
-                'general_resistance': rarity_scaling_exponential * 0.5 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 2,
-                'slash_dmg_resistance': rarity_scaling_exponential * 5 + 10,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 1 - 3,
-                'electric_dmg_resistance': rarity_scaling_exponential * 2 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'fire_dmg_resistance': rarity_scaling_exponential * 2 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'magic_dmg_resistance': rarity_scaling_exponential * 2 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier':  3 - (GameObject.zero_to_range(10)),
-                'fire_dmg_multiplier':  3 - (GameObject.zero_to_range(20)),
-                'magic_dmg_multiplier':  3 - (GameObject.zero_to_range(20))
-            }
-        elif armour_material == 'bronze':
-            armour_stats = {
-                'weight': weight_modifier * 30,
-                'general_resistance': rarity_scaling_exponential * 0.5 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 1 - 3,
-                'slash_dmg_resistance': rarity_scaling_exponential * 10 + 10,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 5 + 3,
-                'electric_dmg_resistance': 0,
-                'fire_dmg_resistance': rarity_scaling_exponential * 2 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(4)),
-                'magic_dmg_resistance': 1,
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier':  3 - (GameObject.zero_to_range(5)),
-                'fire_dmg_multiplier':  3 - (GameObject.zero_to_range(30)),
-                'magic_dmg_multiplier':  3 - (GameObject.zero_to_range(10))
-            }
-        elif armour_material == 'iron':
-            armour_stats = {
-                'weight': weight_modifier * 40,
-                'general_resistance': rarity_scaling_exponential * 0.5 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 2 - 3,
-                'slash_dmg_resistance': rarity_scaling_exponential * 13 + 10,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 7 + 4,
-                'electric_dmg_resistance': 0,
-                'fire_dmg_resistance': rarity_scaling_exponential * 2 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(3)),
-                'magic_dmg_resistance': 1,
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier':  3 - (GameObject.zero_to_range(4)),
-                'fire_dmg_multiplier':  3 - (GameObject.zero_to_range(30)),
-                'magic_dmg_multiplier':  3 - (GameObject.zero_to_range(10))
-            }
-        elif armour_material == 'steel':
-            armour_stats = {
-                'weight': weight_modifier * 50,
-                'general_resistance': rarity_scaling_exponential * 0.5 - 100,
-                'blunt_dmg_resistance': rarity_scaling_exponential * 3 - 3,
-                'slash_dmg_resistance': rarity_scaling_exponential * 15 + 10,
-                'puncture_dmg_resistance': rarity_scaling_exponential * 10 + 5,
-                'electric_dmg_resistance': 0,
-                'fire_dmg_resistance': rarity_scaling_exponential * 2 - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(3)),
-                'magic_dmg_resistance': 1,
-                'general_dmg_multiplier': 1,
-                'blunt_dmg_multiplier': 1,
-                'slash_dmg_multiplier': 1,
-                'puncture_dmg_multiplier': 1,
-                'electric_dmg_multiplier':  3 - (GameObject.zero_to_range(5)),
-                'fire_dmg_multiplier':  3 - (GameObject.zero_to_range(30)),
-                'magic_dmg_multiplier':  3 - (GameObject.zero_to_range(8))
-            }
-        else:
+        armour_values = Armour.armour_value_table.get(armour_material)
+        if not armour_values:
             raise Exception('Not a valid armour material!')
+        weight, resistance_rows, multiplier_rows = armour_values
 
-        armour_stats['speed_multiplier'] = 1
-        if armour_type == 'helmet':
-            weight_modifier = random.uniform(0.2, 0.3)
-
-        elif armour_type == 'chestpiece':
-            weight_modifier = random.uniform(0.9, 1.1)
+        weight_modifier = 0
+        rarity_scaling_exponential = pow(rarity, 1.6)
 
-        elif armour_type == 'arm guards':
-            weight_modifier = random.uniform(0.15, 0.25)
+        armour_stats = {'weight': weight_modifier * weight}
+        for resistance_type, (multiplier, offset, zero_range) in zip(Armour.armour_resistance_types, resistance_rows):
+            resistance = rarity_scaling_exponential * multiplier + offset
+            if zero_range is not None:
+                resistance = resistance - (rarity_scaling_exponential * 100 * GameObject.zero_to_range(zero_range, rng))
+            armour_stats[resistance_type] = resistance
 
-        elif armour_type == 'gloves':
-            weight_modifier = random.uniform(0.1, 0.15)
+        for multiplier_type, (value, zero_range) in zip(Armour.armour_multiplier_types, multiplier_rows):
+            if zero_range is not None:
+                value = value - GameObject.zero_to_range(zero_range, rng)
+            armour_stats[multiplier_type] = value
 
-        elif armour_type == 'leggings':
-            weight_modifier = random.uniform(0.7, 0.8)
-            armour_stats['speed_multiplier'] = max(1, 1 + ((rarity / 2) - Weapon.zero_to_range(rarity)))
+        armour_stats['speed_multiplier'] = 1
+        if armour_type in Armour.armour_type_weight_modifiers:
+            weight_modifier = rng.uniform(*Armour.armour_type_weight_modifiers[armour_type])
+        if armour_type == 'leggings':
+            armour_stats['speed_multiplier'] = max(1, 1 + ((rarity / 2) - Weapon.zero_to_range(rarity, rng)))
 
-        weight_modifier = 1 * GameObject.get_skew_multiplier(10)
+        weight_modifier = 1 * GameObject.get_skew_multiplier(10, rng)
 
         total_protection = 0
         total_multiplier = 1
         for value in armour_stats:
 
-            skew_multiplier = GameObject.get_skew_multiplier()
+            skew_multiplier = GameObject.get_skew_multiplier(rng=rng)
             armour_stats[value] = armour_stats[value] * weight_modifier
 
             if value in Armour.armour_resistance_types or value in Armour.armour_multiplier_types:
@@ -1033,22 +1123,35 @@ class Armour(Item):
         return armour_stats
 
     @classmethod
-    def get_random_armour(cls, rarity=None, armour_type=None, armour_material=None):
+    def get_random_armour(cls, rarity=None, armour_type=None, armour_material=None, rng=None):
+        if not rng:
+            rng = random
         if not rarity:
-            rarity = GameObject.get_level()
+            rarity = GameObject.get_level(rng)
         if not armour_type:
-            armour_type = Armour.armour_types[random.randint(0, len(Armour.armour_types) - 1)]
+            armour_type = Armour.armour_types[rng.randint(0, len(Armour.armour_types) - 1)]
         if not armour_material:
-            armour_material = Armour.armour_materials[random.randint(0, len(Armour.armour_materials) - 1)]
+            armour_material = Armour.armour_materials[rng.randint(0, len(Armour.armour_materials) - 1)]
         if rarity < 0.1:
             rarity = 0.1
             logger.debug('Armour level is less than 1')
 
-        armour_stats = Armour.get_armour_values(rarity, armour_type, armour_material)
-        armour_name = armour_material + ' ' + armour_type
+        armour_stats = Armour.get_armour_values(rarity, armour_type, armour_material, rng)
         armour_stats['ap'] = 10
         armour_stats['armour_type'] = armour_type
         armour_stats['armour_material'] = armour_material
+        armour_name, adjectives = Armour.get_armour_name(armour_stats, rng)
+
+        return cls(armour_name, armour_stats, None, adjectives, rng)
+
+    @staticmethod
+    def get_armour_name(armour_stats, rng=None):
+        """Returns the name and adjectives of a piece of armour from its stats, as given by get_random_armour"""
+        if not rng:
+            rng = random
+
+        rarity = armour_stats['rarity']
+        armour_name = armour_stats['armour_material'] + ' ' + armour_stats['armour_type']
         adjectives = []
         rarity_scaling_exponential = rarity**1.6
 
@@ -1075,21 +1178,21 @@ class Armour(Item):
                     elif resistance_type == 'magic_dmg_resistance':
                         adjective_list = ['blessed', 'encanted', 'magical', 'dark']
 
-                    adjective = adjective_list[random.randint(0, len(adjective_list) - 1)]
+                    adjective = adjective_list[rng.randint(0, len(adjective_list) - 1)]
                     adjectives.append(adjective)
                     armour_name = f'{adjective} {armour_name}'
 
         if (armour_stats['total_value'] / armour_stats['weight_modifier']) < 10:
-            adjective = Item.boring_adjectives[random.randint(0, len(Item.boring_adjectives) - 1)]
+            adjective = Item.boring_adjectives[rng.randint(0, len(Item.boring_adjectives) - 1)]
             adjectives.append(adjective)
             armour_name = f'{adjective} {armour_name}'
 
         if (armour_stats['total_value'] / armour_stats['weight_modifier']) / rarity_scaling_exponential > 10 and rarity > 2.5:
 
-            if random.uniform(0, 1) > 0.8:
-                fantasy_name = GameObject.get_fantasy_name(random.randint(2, 2), GameObject.japanese_letters, GameObject.japanese_letters)
+            if rng.uniform(0, 1) > 0.8:
+                fantasy_name = GameObject.get_fantasy_name(rng.randint(2, 2), GameObject.japanese_letters, GameObject.japanese_letters, rng)
             else:
-                fantasy_name = GameObject.get_fantasy_name(random.randint(2, 2))
+                fantasy_name = GameObject.get_fantasy_name(rng.randint(2, 2), rng=rng)
 
             armour_titles = [
                 ' of ' + fantasy_name,
@@ -1106,17 +1209,171 @@ class Armour(Item):
                 ', originating from the deserts of ' + fantasy_name,
                 ', pretty good I guess'
             ]
-            armour_name += armour_titles[random.randint(0, len(armour_titles) - 1)]
+            armour_name += armour_titles[rng.randint(0, len(armour_titles) - 1)]
+
+        return armour_name, adjectives
+
+    @staticmethod
+    def get_armour_value_arrays():
+        """
+        Returns armour_value_table as numpy arrays indexed by the position of the material in armour_materials,
+        so generate_batch can look up the values of every piece of armour at once
+        """
+        if Armour.armour_value_arrays is None:
+            table_rows = [Armour.armour_value_table[armour_material] for armour_material in Armour.armour_materials]
+            resistance_rows = np.array([[(multiplier, offset, zero_range if zero_range is not None else 0)
+                                         for multiplier, offset, zero_range in table_row[1]]
+                                        for table_row in table_rows], dtype=np.float64)
+            multiplier_rows = np.array([[(value, zero_range if zero_range is not None else 0)
+                                         for value, zero_range in table_row[2]]
+                                        for table_row in table_rows], dtype=np.float64)
+
+            Armour.armour_value_arrays = {
+                'resistance_multiplier': resistance_rows[:, :, 0],
+                'resistance_offset': resistance_rows[:, :, 1],
+                'resistance_spread': resistance_rows[:, :, 2] * 100,
+                'multiplier_value': multiplier_rows[:, :, 0],
+                'multiplier_spread': multiplier_rows[:, :, 1],
+                'leggings_index': Armour.armour_types.index('leggings')
+            }
 
-        return cls(armour_name, armour_stats, None, adjectives)
+        return Armour.armour_value_arrays
 
     @staticmethod
-    def get_armour_set(rarity=None, main_armour_material=None, armour_material_list=None, consistency=None):
+    def get_batch_indexes(values, value_list, value_count, numpy_rng):
+        """
+        Returns the position in value_list of every value, for one value or a sequence with a value per row.
+        None picks a random one for each row
+        """
+        if values is None:
+            return numpy_rng.integers(0, len(value_list), value_count)
+        if isinstance(values, str):
+            values = [values]
+        indexes = np.array([value_list.index(value) if value in value_list else -1 for value in values])
+        if (indexes < 0).any():
+            raise Exception(f'{values[int(np.argmax(indexes < 0))]} is not one of {value_list}!')
+        return np.broadcast_to(indexes, (value_count,))
+
+    @staticmethod
+    def generate_batch(armour_count, rarities=None, armour_types=None, armour_materials=None, rng=None):
+        """
+        Returns an ArmourBatch of armour_count pieces of armour, with their stats worked out as numpy columns.
+        rarities, armour_types and armour_materials can be one value for every piece or a sequence with a value
+        per piece, and are random like in get_random_armour when not given.
+        The stats are drawn from a numpy generator seeded from rng, so they are not the ones get_random_armour
+        would give for the same rng, but the same rng always gives the same batch
+        """
+        if not rng:
+            rng = random
+        numpy_rng = np.random.default_rng(rng.getrandbits(64))
+
+        if rarities is None:
+            rarities = Armour.get_batch_levels(armour_count, numpy_rng)
+        rarities = np.broadcast_to(np.asarray(rarities, dtype=np.float64), (armour_count,))
+        type_indexes = Armour.get_batch_indexes(armour_types, Armour.armour_types, armour_count, numpy_rng)
+        material_indexes = Armour.get_batch_indexes(armour_materials, Armour.armour_materials, armour_count, numpy_rng)
+
+        return Armour.get_batch_values(rarities, type_indexes, material_indexes, numpy_rng)
+
+    @staticmethod
+    def generate_armour_sets(set_count, rarities=None, main_armour_materials=None, armour_material_list=None,
+                             consistency=None, rng=None):
+        """
+        Returns an ArmourBatch with an armour set for each of set_count creatures, made the same way as
+        get_armour_set: every slot has a chance of 1 - consistency to be a random material from
+        armour_material_list or left empty, and the rarity is skewed again for each slot.
+        rarities, main_armour_materials and consistency can be one value for every set or a sequence with a value
+        per set, a consistency of 0 counts as 1 like in get_armour_set. Use ArmourBatch.get_armour_set or to_armour_sets to get lists for Humanoid.equip_armour
+        """
+        if not rng:
+            rng = random
+        numpy_rng = np.random.default_rng(rng.getrandbits(64))
+
+        if rarities is None:
+            rarities = Armour.get_batch_levels(set_count, numpy_rng)
+        rarities = np.broadcast_to(np.asarray(rarities, dtype=np.float64), (set_count,))
+        main_material_indexes = Armour.get_batch_indexes(
+            main_armour_materials, Armour.armour_materials, set_count, numpy_rng)
+
+        if not armour_material_list:
+            armour_material_list = Armour.armour_materials
+        # the last index is the empty slot
+        material_list_indexes = np.append(Armour.get_batch_indexes(
+            armour_material_list, Armour.armour_materials, len(armour_material_list), numpy_rng), -1)
+
+        if consistency is None:
+            consistency = 1
+        consistency = np.broadcast_to(np.asarray(consistency, dtype=np.float64), (set_count,))
+        # get_armour_set treats a consistency of 0 as no consistency given
+        consistency = np.where(consistency == 0, 1, consistency)
+
+        slot_shape = (set_count, len(Armour.armour_types))
+        slot_rarities = rarities[:, None] * np.cumprod(1 + (20 * numpy_rng.random(slot_shape) - 10) / 100, axis=1)
+        inconsistent = numpy_rng.random(slot_shape) > consistency[:, None]
+        slot_materials = np.where(
+            inconsistent, material_list_indexes[numpy_rng.integers(0, len(material_list_indexes), slot_shape)],
+            main_material_indexes[:, None])
+        filled_slots = slot_materials >= 0
+
+        armour_batch = Armour.get_batch_values(
+            slot_rarities[filled_slots],
+            np.broadcast_to(np.arange(len(Armour.armour_types)), slot_shape)[filled_slots],
+            slot_materials[filled_slots],
+            numpy_rng)
+        armour_batch.set_indexes = np.nonzero(filled_slots)[0]
+        armour_batch.set_count = set_count
+
+        return armour_batch
+
+    @staticmethod
+    def get_batch_levels(level_count, numpy_rng):
+        """GameObject.get_level for level_count rows"""
+        return 4 * (0.1919 * numpy_rng.uniform(0, 10, level_count) - 0.608) ** 3 + 1
+
+    @staticmethod
+    def get_batch_values(rarities, type_indexes, material_indexes, numpy_rng):
+        """Works out the stats of every piece of armour the same way get_armour_values does, as numpy columns"""
+        armour_value_arrays = Armour.get_armour_value_arrays()
+        armour_count = len(type_indexes)
+        rarities = np.maximum(rarities, 0.1)
+        rarity_scaling_exponential = rarities ** 1.6
+        skew_percent = Armour.stat_skew_percent
+
+        resistances = (armour_value_arrays['resistance_multiplier'][material_indexes]
+                       * rarity_scaling_exponential[:, None]
+                       + armour_value_arrays['resistance_offset'][material_indexes]
+                       - rarity_scaling_exponential[:, None] * armour_value_arrays['resistance_spread'][material_indexes]
+                       * numpy_rng.random((armour_count, len(Armour.armour_resistance_types))))
+
+        # the dmg multipliers, then the speed multiplier which only leggings have
+        multipliers = np.ones((armour_count, len(Armour.armour_multiplier_types)))
+        multipliers[:, :-1] = (armour_value_arrays['multiplier_value'][material_indexes]
+                               - armour_value_arrays['multiplier_spread'][material_indexes]
+                               * numpy_rng.random((armour_count, len(Armour.armour_multiplier_types) - 1)))
+        leggings = type_indexes == armour_value_arrays['leggings_index']
+        multipliers[:, -1] = np.where(
+            leggings, np.maximum(1, 1 + rarities / 2 - rarities * numpy_rng.random(armour_count)), 1)
+
+        weight_modifiers = 1 + (2 * 10 * numpy_rng.random(armour_count) - 10) / 100
+        resistance_skews = 1 + (2 * skew_percent * numpy_rng.random(resistances.shape) - skew_percent) / 100
+        multiplier_skews = 1 + (2 * skew_percent * numpy_rng.random(multipliers.shape) - skew_percent) / 100
+
+        # int() rounds towards zero, the same as the cast
+        resistances = np.maximum((resistances * weight_modifiers[:, None] * resistance_skews).astype(np.int64), 0)
+        multipliers = np.maximum((multipliers * weight_modifiers[:, None] * multiplier_skews).astype(np.int64), 0)
+        multipliers = np.maximum(np.round(multipliers * multiplier_skews, 1), 1)
+
+        return ArmourBatch(type_indexes, material_indexes, rarities, resistances, multipliers, weight_modifiers)
+
+    @staticmethod
+    def get_armour_set(rarity=None, main_armour_material=None, armour_material_list=None, consistency=None, rng=None):
+        if not rng:
+            rng = random
         if not rarity:
-            rarity = GameObject.get_level()
+            rarity = GameObject.get_level(rng)
 
         if not main_armour_material:
-            main_armour_material = Armour.armour_materials[random.randint(0, len(Armour.armour_materials) - 1)]
+            main_armour_material = Armour.armour_materials[rng.randint(0, len(Armour.armour_materials) - 1)]
 
         if not armour_material_list:
             armour_material_list = list(Armour.armour_materials)
@@ -1131,28 +1388,106 @@ class Armour(Item):
 
         armour_set = []
         for armour_type in Armour.armour_types:
-            rarity *= GameObject.get_skew_multiplier(10)
+            rarity *= GameObject.get_skew_multiplier(10, rng)
 
-            if random.uniform(0, 1) > consistency:
-                inconsistent_armour_material = armour_material_list[random.randint(0, len(armour_material_list) - 1)]
+            if rng.uniform(0, 1) > consistency:
+                inconsistent_armour_material = armour_material_list[rng.randint(0, len(armour_material_list) - 1)]
 
                 if inconsistent_armour_material == 'none':
                     pass
                 else:
-                    armour_set.append(Armour.get_random_armour(rarity, armour_type, inconsistent_armour_material))
+                    armour_set.append(Armour.get_random_armour(rarity, armour_type, inconsistent_armour_material, rng))
             else:
-                armour_set.append(Armour.get_random_armour(rarity, armour_type, main_armour_material))
+                armour_set.append(Armour.get_random_armour(rarity, armour_type, main_armour_material, rng))
 
         return armour_set
 
 
+class ArmourBatch:
+    """
+    The stats of many pieces of armour as numpy columns, made by Armour.generate_batch or Armour.generate_armour_sets.
+    Each row is one piece, and Armour objects are only made when get_armour, to_armour or the armour set methods are called
+    """
+
+    def __init__(self, type_indexes, material_indexes, rarities, resistances, multipliers, weight_modifiers):
+        self.type_indexes = type_indexes
+        self.material_indexes = material_indexes
+        self.rarities = rarities
+        # one column for each type in Armour.armour_resistance_types and Armour.armour_multiplier_types
+        self.resistances = resistances
+        self.multipliers = multipliers
+        self.weight_modifiers = weight_modifiers
+
+        self.total_protection = resistances.sum(axis=1)
+        self.total_multiplier = multipliers.prod(axis=1)
+        # Armour.total_value for every piece
+        self.total_value = np.maximum(
+            1, (self.total_protection / (self.total_multiplier / 2) * Armour.armour_value_multiplier).astype(np.int64))
+
+        # the set each piece belongs to, when made by Armour.generate_armour_sets
+        self.set_indexes = None
+        self.set_count = 0
+
+    def __len__(self):
+        return len(self.type_indexes)
+
+    @property
+    def armour_types(self):
+        return np.array(Armour.armour_types)[self.type_indexes]
+
+    @property
+    def armour_materials(self):
+        return np.array(Armour.armour_materials)[self.material_indexes]
+
+    def get_armour_stats(self, armour_index):
+        """Returns the stats of one piece of armour in the same form as get_random_armour gives them"""
+        armour_stats = {'weight': 0.0}
+        for resistance_type, resistance in zip(Armour.armour_resistance_types, self.resistances[armour_index].tolist()):
+            armour_stats[resistance_type] = resistance
+        for multiplier_type, multiplier in zip(Armour.armour_multiplier_types, self.multipliers[armour_index].tolist()):
+            armour_stats[multiplier_type] = multiplier
+
+        total_protection = int(self.total_protection[armour_index])
+        total_multiplier = float(self.total_multiplier[armour_index])
+        armour_stats['total_value'] = max(1, int(total_protection * (1 / total_multiplier) * Armour.armour_value_multiplier))
+        armour_stats['total_protection'] = total_protection
+        armour_stats['total_multiplier'] = total_multiplier
+        armour_stats['rarity'] = float(self.rarities[armour_index])
+        armour_stats['item_type'] = Armour.armour_materials[self.material_indexes[armour_index]]
+        armour_stats['weight_modifier'] = float(self.weight_modifiers[armour_index])
+        armour_stats['ap'] = 10
+        armour_stats['armour_type'] = Armour.armour_types[self.type_indexes[armour_index]]
+        armour_stats['armour_material'] = armour_stats['item_type']
+
+        return armour_stats
+
+    def get_armour(self, armour_index, rng=None):
+        """Returns one piece of armour of the batch, named by Armour.get_armour_name"""
+        armour_stats = self.get_armour_stats(armour_index)
+        armour_name, adjectives = Armour.get_armour_name(armour_stats, rng)
+        return Armour(armour_name, armour_stats, None, adjectives, rng)
+
+    def to_armour(self, rng=None):
+        return [self.get_armour(armour_index, rng) for armour_index in range(len(self))]
+
+    def get_armour_set(self, set_index, rng=None):
+        """Returns the armour set of one creature as a list, like Armour.get_armour_set"""
+        first_index, last_index = np.searchsorted(self.set_indexes, (set_index, set_index + 1))
+        return [self.get_armour(armour_index, rng) for armour_index in range(first_index, last_index)]
+
+    def to_armour_sets(self, rng=None):
+        return [self.get_armour_set(set_index, rng) for set_index in range(self.set_count)]
+
+
 class Chest(Item):
 
     chest_materials = ('wooden', 'iron', 'bronze', 'steel')
 
-    def __init__(self, material=None, inventory=[], capacity=None, position=None, adjectives=None):
+    def __init__(self, material=None, inventory=[], capacity=None, position=None, adjectives=None, rng=None):
+        if not rng:
+            rng = random
         if not material:
-            material = self.chest_materials[random.randint(0, len(self.chest_materials) - 1)]
+            material = self.chest_materials[rng.randint(0, len(self.chest_materials) - 1)]
         if not capacity:
             capacity = 500
         if not adjectives:
@@ -1209,7 +1544,7 @@ class Chest(Item):
             attribute_dict['adjectives'])
 
     @classmethod
-    def generate_chest(cls, level=None, total_loot=None, loot_distribution=None):
+    def generate_chest(cls, level=None, total_loot=None, loot_distribution=None, rng=None):
         """
         Returns a chest filled with loot
 
@@ -1218,16 +1553,18 @@ class Chest(Item):
         loot_distribution: higher value means fewer but higher level items
 
         """
+        if not rng:
+            rng = random
         if not level:
-            level = cls.get_level() * 10
+            level = cls.get_level(rng) * 10
 
         if not total_loot:
-            total_loot = cls.get_level() * 10 * (level / 5) - cls.zero_to_range(level)
+            total_loot = cls.get_level(rng) * 10 * (level / 5) - cls.zero_to_range(level, rng)
 
         if not loot_distribution:
-            loot_distribution = random.uniform(0.2, 2)
+            loot_distribution = rng.uniform(0.2, 2)
 
-        return cls(Item.generate_loot(level, total_loot, loot_distribution))
+        return cls(Item.generate_loot(level, total_loot, loot_distribution, rng), rng=rng)
 
     @property
     def total_value(self):
@@ -15,6 +15,7 @@ import discord
 import logging
 import random
 import asyncio
+import io
 import os
 import json
 import datetime
@@ -52,6 +53,10 @@ save_data = None
 
 inspect_target = None
 
+map_process_pool = None
+map_pool = None
+map_image_cache = None
+
 client = discord.Client()
 
 logger.info('Starting Discord RPG...')
@@ -175,6 +180,22 @@ def get_command_arguments(message_string):
     return arguments
 
 
+def get_map_snapshot_sink():
+    """Returns a sink for debug map snapshots if they are turned on in the settings, otherwise None"""
+    if settings.get('map_snapshots'):
+        return rooms.MapSnapshotSink(settings.get('map_snapshot_rooms'), settings.get('map_snapshot_seconds'))
+    return None
+
+
+def get_map_generation_kwargs():
+    """Arguments for Map.generate_map that come from the settings"""
+    return {
+        'process_pool': map_process_pool,
+        'lazy_population': settings.get('lazy_map_population'),
+        'placement_strategy': settings.get('map_placement_strategy')
+    }
+
+
 async def auto_save(interval):
     while True:
         await asyncio.sleep(interval)
@@ -228,7 +249,7 @@ async def on_message(message):
                                                    f'{prefix}armour\n'
                                                    f'{prefix}enemy\n'
                                                    f'{prefix}room\n'
-                                                   f'{prefix}map (number of rooms)\n'
+                                                   f'{prefix}map (number of rooms) (seed)\n'
                                                    f'{prefix}inspect (item/enemy name)\n'
                                                    f'{prefix}create character')
 
@@ -454,24 +475,40 @@ async def on_message(message):
         arguments = get_command_arguments(message.content)
         try:
             map_size = int(arguments[0])
-            msg = await client.send_message(message.channel, f'Generating map of size {map_size}\n'
-                                                             f'This may take a moment...')
-            map_dungeon = await rooms.Map.generate_map(map_size, client=client, progress_message=msg)
+            map_seed = None
+            if len(arguments) > 1:
+                map_seed = int(arguments[1])
         except:
             logger.debug('Invalid arguments')
-            map_size = random.randint(5, 30)
+            map_size = None
+            map_seed = None
+
+        # seeded maps have to be generated, anything else can come straight from the pool
+        pooled_map = None
+        if map_seed is None:
+            pooled_map = map_pool.take_map(map_size)
+
+        if pooled_map:
+            map_dungeon, map_image = pooled_map
+        else:
+            if not map_size:
+                map_size = random.randint(5, 30)
             msg = await client.send_message(message.channel, f'Generating map of size {map_size}\n'
                                                              f'This may take a moment...')
-            map_dungeon = await rooms.Map.generate_map(map_size, client=client, progress_message=msg)
-        finally:
-            map_dungeon.export_map_image('map.png')
-            await client.send_file(message.channel, f'{os.path.dirname(os.path.realpath(__file__))}/map.png')
+            map_dungeon = await map_pool.generate_map(map_size, client=client, progress_message=msg,
+                                                      snapshot_sink=get_map_snapshot_sink(), seed=map_seed)
+            map_image = await map_image_cache.get_map_image_async(map_dungeon)
+
+        await client.send_file(message.channel, io.BytesIO(map_image), filename='map.png',
+                               content=f'Seed: {map_dungeon.seed}')
 
     elif message.content.startswith(f'{prefix}shutdown'):
         logger.warning('Shutting down...')
         await client.send_message(message.channel, 'Shutting down...')
         try:
             await save_settings(settings)
+            map_pool.stop()
+            map_process_pool.shutdown()
             await client.logout()
             await client.close()
         except TypeError:
@@ -484,12 +521,20 @@ async def on_message(message):
 
 
 async def main():
+    global map_process_pool
+    global map_pool
+    global map_image_cache
     await load_settings()
     await load_save()
+    map_process_pool = rooms.MapProcessPool(settings.get('map_workers'))
+    map_image_cache = rooms.MapImageCache(settings.get('map_image_cache_bytes', 32 * 1024 * 1024))
+    map_pool = rooms.MapPool(settings.get('map_pool_buckets', [[5, 30]]), settings.get('map_pool_size', 2),
+                             settings.get('map_pool_refill_concurrency', 1), get_map_generation_kwargs())
     loop = asyncio.get_event_loop()
     auto_save_task = loop.create_task(auto_save(3600))
     client_start_task = loop.create_task(client.start(settings['bot_token']))
-    await asyncio.wait([auto_save_task, client_start_task])
+    map_pool_task = loop.create_task(map_pool.run())
+    await asyncio.wait([auto_save_task, client_start_task, map_pool_task])
 
 if __name__ == '__main__':
     loop = asyncio.get_event_loop()
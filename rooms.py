@@ -1,13 +1,26 @@
+import array
+import asyncio
+import bisect
+import collections
+import concurrent.futures
 import datetime
+import hashlib
+import heapq
+import io
 import logging
+import multiprocessing
 import os
 import random
+import time
 
+import numpy as np
 from PIL import Image
 
 import creatures
 import items
 from game import GameObject
+from game import GenerationContext
+from game import ProgressReporter
 from game import Vector2
 
 logger = logging.getLogger(__name__)
@@ -36,14 +49,20 @@ class Room:
             items, enemies,
             position=None,
             entrance_direction=None,
-            exit_directions=None):
+            exit_directions=None,
+            seed=None):
 
         self.level = level
         self.size_vector = Vector2(int(size_vector.x), int(size_vector.y))
         self.doors = doors
         self.biome = biome
-        self.items = items
-        self.enemies = enemies
+        # rooms with a seed and no items or enemies are populated from the seed the first time they are needed
+        self.seed = seed
+        self.item_list = items
+        self.enemy_list = enemies
+        # totals of the enemies and items, worked out the first time they are needed and kept up to date after
+        self.cached_enemy_power = None
+        self.cached_loot = None
 
         if not position:
             self.position = None
@@ -66,28 +85,107 @@ class Room:
         'bat person': 1.1
     }
 
+    @property
+    def items(self):
+        if not self.populated:
+            self.populate()
+        return self.item_list
+
+    @items.setter
+    def items(self, item_list):
+        self.item_list = item_list
+        self.cached_loot = None
+
+    @property
+    def enemies(self):
+        if not self.populated:
+            self.populate()
+        return self.enemy_list
+
+    @enemies.setter
+    def enemies(self, enemy_list):
+        self.enemy_list = enemy_list
+        self.cached_enemy_power = None
+
+    @property
+    def populated(self):
+        """False if the room still has to generate its items and enemies from its seed"""
+        return self.seed is None or self.item_list is not None or self.enemy_list is not None
+
+    def populate(self):
+        """Generates the items and enemies of the room from its seed, the same ones every time for the same seed"""
+        populated_room = Room.generate_room(
+            self.doors,
+            self.size_vector,
+            self.level,
+            biome=self.biome,
+            position=self.position,
+            entrance_direction=self.entrance_direction,
+            exit_directions=self.exit_directions,
+            rng=GenerationContext(self.seed).rng)
+
+        self.item_list = populated_room.item_list
+        self.enemy_list = populated_room.enemy_list
+        self.cached_enemy_power = populated_room.cached_enemy_power
+        self.cached_loot = None
+
     @property
     def total_enemy_power(self):
-        enemy_power = 0
-        for enemy in self.enemies:
-            enemy_power += enemy.power_level
-        return enemy_power
+        if self.cached_enemy_power is None:
+            enemy_power = 0
+            for enemy in self.enemies:
+                enemy_power += enemy.power_level
+            self.cached_enemy_power = enemy_power
+        return self.cached_enemy_power
 
     @property
     def total_loot(self):
-        loot_value = 0
-        for item in self.items:
-            loot_value += item.item_stats['total_value']
-        return loot_value
+        if self.cached_loot is None:
+            loot_value = 0
+            for item in self.items:
+                loot_value += item.item_stats['total_value']
+            self.cached_loot = loot_value
+        return self.cached_loot
+
+    def add_item(self, item):
+        self.items.append(item)
+        if self.cached_loot is not None:
+            self.cached_loot += item.item_stats['total_value']
+
+    def remove_item(self, item):
+        self.items.remove(item)
+        if self.cached_loot is not None:
+            self.cached_loot -= item.item_stats['total_value']
+
+    def add_enemy(self, enemy):
+        self.enemies.append(enemy)
+        if self.cached_enemy_power is not None:
+            self.cached_enemy_power += enemy.power_level
+
+    def remove_enemy(self, enemy):
+        """Call before the enemy changes, so the power taken off the total is the power that was added"""
+        self.enemies.remove(enemy)
+        if self.cached_enemy_power is not None:
+            self.cached_enemy_power -= enemy.power_level
+
+    def clear_cached_totals(self):
+        """Call after changing an item or enemy that is already in the room, or the lists directly"""
+        self.cached_enemy_power = None
+        self.cached_loot = None
 
     def json_readable(self):
-        item_list = []
-        for item in self.items:
-            item_list.append(item.json_readable())
+        # rooms that were never visited are saved as just their seed
+        item_list = None
+        enemy_list = None
 
-        enemy_list = []
-        for enemy in self.enemies:
-            enemy_list.append(enemy.json_readable())
+        if self.populated:
+            item_list = []
+            for item in self.items:
+                item_list.append(item.json_readable())
+
+            enemy_list = []
+            for enemy in self.enemies:
+                enemy_list.append(enemy.json_readable())
 
         if self.position:
             position = self.position.json_readable()
@@ -101,7 +199,8 @@ class Room:
             'biome': self.biome,
             'items': item_list,
             'enemies': enemy_list,
-            'position': position
+            'position': position,
+            'seed': self.seed
         }
 
     def __str__(self):
@@ -145,20 +244,24 @@ class Room:
         size_vector = Vector2.load_from_save(attribute_dict['size_vector'])
         position = Vector2.load_from_save(attribute_dict['position'])
 
-        item_list = []
-        for item in attribute_dict['items']:
-            if item['item_stats']['item_type'] in items.Armour.armour_materials:
-                item_list.append(items.Armour.load_from_save(item))
+        item_list = None
+        if attribute_dict['items'] is not None:
+            item_list = []
+            for item in attribute_dict['items']:
+                if item['item_stats']['item_type'] in items.Armour.armour_materials:
+                    item_list.append(items.Armour.load_from_save(item))
 
-            elif item['item_stats']['item_type'] in items.Weapon.weapon_types:
-                item_list.append(items.Weapon.load_from_save(item))
+                elif item['item_stats']['item_type'] in items.Weapon.weapon_types:
+                    item_list.append(items.Weapon.load_from_save(item))
 
-            elif item['item_stats']['item_type'] == 'chest':
-                item_list.append(items.Chest.load_from_save(item))
+                elif item['item_stats']['item_type'] == 'chest':
+                    item_list.append(items.Chest.load_from_save(item))
 
-        enemy_dict = []
-        for enemy in attribute_dict['enemies']:
-            enemy_dict.append(creatures.EnemyHumanoid.load_from_save(enemy))
+        enemy_dict = None
+        if attribute_dict['enemies'] is not None:
+            enemy_dict = []
+            for enemy in attribute_dict['enemies']:
+                enemy_dict.append(creatures.EnemyHumanoid.load_from_save(enemy))
 
         return cls(
             attribute_dict['level'],
@@ -167,13 +270,43 @@ class Room:
             attribute_dict['biome'],
             item_list,
             enemy_dict,
-            position
+            position,
+            seed=attribute_dict.get('seed')
         )
 
     @classmethod
     def empty(cls, size_vector=Vector2.zero(), position=Vector2.zero()):
         return cls(None, size_vector, None, None, None, None, position, None, None)
 
+    def get_wall_span(self, side, size_vector):
+        """
+        Returns (fixed_position, low, high) for a room of size_vector placed against the side of this room.
+        For north and south the y position is fixed and the x position can be anywhere from low to high,
+        for east and west it is the other way around. Every position shares some wall with this room
+        """
+        if side == 'north':
+            return (self.position.y + self.size_vector.y,
+                    self.position.x - size_vector.x + 1, self.position.x + self.size_vector.x - 1)
+        elif side == 'south':
+            return (self.position.y - size_vector.y,
+                    self.position.x - size_vector.x + 1, self.position.x + self.size_vector.x - 1)
+        elif side == 'east':
+            return (self.position.x + self.size_vector.x,
+                    self.position.y - size_vector.y + 1, self.position.y + self.size_vector.y - 1)
+        elif side == 'west':
+            return (self.position.x - size_vector.x,
+                    self.position.y - size_vector.y + 1, self.position.y + self.size_vector.y - 1)
+        else:
+            raise Exception('Not a valid direction!')
+
+    @staticmethod
+    def get_wall_position(side, fixed_position, wall_position):
+        """Turns a fixed position and a position along the wall from get_wall_span into a Vector2"""
+        if side in ('north', 'south'):
+            return Vector2(wall_position, fixed_position)
+        else:
+            return Vector2(fixed_position, wall_position)
+
     def check_collision(self, room_2):
         """
             Checks if the left of room_1 is to the left of any part of room 2 and
@@ -232,7 +365,14 @@ class Room:
         else:
             return False
 
-    def check_all_collision(self, room_list):
+    def check_all_collision(self, room_list, collider_grid=None):
+        """
+            Checks if self collides with any room in room_list.
+            If a collider_grid is given only the rooms sharing a grid cell with self are checked
+        """
+        if collider_grid is not None:
+            room_list = collider_grid.query(self.position, self.size_vector)
+
         for other_room in room_list:
 
             if self is other_room:
@@ -256,47 +396,51 @@ class Room:
             loot_distribution=None,
             position=None,
             entrance_direction=None,
-            exit_directions=None):
+            exit_directions=None,
+            rng=None):
+
+        if not rng:
+            rng = random
 
         if not doors:
             doors = {
-                'north': random.randint(0, 1) == 1,
-                'south': random.randint(0, 1) == 1,
-                'east': random.randint(0, 1) == 1,
-                'west': random.randint(0, 1) == 1,
+                'north': rng.randint(0, 1) == 1,
+                'south': rng.randint(0, 1) == 1,
+                'east': rng.randint(0, 1) == 1,
+                'west': rng.randint(0, 1) == 1,
             }
         if not size_vector:
             size_vector = Vector2(0, 0)
-            size_vector.x = random.randint(2, 20)
-            size_vector.y = random.randint(2, 20)
+            size_vector.x = rng.randint(2, 20)
+            size_vector.y = rng.randint(2, 20)
         if not level:
-            level = GameObject.get_level() * 10
+            level = GameObject.get_level(rng) * 10
 
         if not enemy_power:
-            enemy_power = (level ** 2 * GameObject.get_level() * 1) - (random.randint(-5, 13))
+            enemy_power = (level ** 2 * GameObject.get_level(rng) * 1) - (rng.randint(-5, 13))
 
         if not total_loot:
-            total_loot = GameObject.get_level() * ((size_vector.x * size_vector.y) / 500) * (
-                        level ** 2 - GameObject.zero_to_range(level ** 2))
+            total_loot = GameObject.get_level(rng) * ((size_vector.x * size_vector.y) / 500) * (
+                        level ** 2 - GameObject.zero_to_range(level ** 2, rng))
 
         if not biome:
-            biome = cls.biome_list[random.randint(0, len(cls.biome_list) - 1)]
+            biome = cls.biome_list[rng.randint(0, len(cls.biome_list) - 1)]
 
         if not enemy_distribution:
-            enemy_distribution = random.uniform(0.5, 2)
+            enemy_distribution = rng.uniform(0.5, 2)
 
         if not loot_distribution:
-            loot_distribution = random.uniform(0.5, 2)
+            loot_distribution = rng.uniform(0.5, 2)
 
         level = int(level)
         enemy_power = int(enemy_power)
         total_loot = int(total_loot)
 
-        loot_list = items.Item.generate_loot(level, total_loot, loot_distribution)
+        loot_list = items.Item.generate_loot(level, total_loot, loot_distribution, rng)
 
         chest_list = []
         for _ in range(0, 3):
-            if random.uniform(0, 1) < 0.1 or len(loot_list) > 5:
+            if rng.uniform(0, 1) < 0.1 or len(loot_list) > 5:
                 chest_inventory = []
                 chest_value = total_loot
                 chest_value = chest_value // 3
@@ -307,25 +451,27 @@ class Room:
                     chest_value -= loot_item.total_value
                     loot_list.remove(loot_item)
 
-                chest_list.append(items.Chest(None, chest_inventory))
+                chest_list.append(items.Chest(None, chest_inventory, rng=rng))
 
         for chest in chest_list:
-            chest.position = Vector2(random.randint(0, size_vector.x),
-                                     random.randint(0, size_vector.y))
+            chest.position = Vector2(rng.randint(0, size_vector.x),
+                                     rng.randint(0, size_vector.y))
 
             chest.inventory.sort(key=items.Item.value_sort_key, reverse=True)
             loot_list.append(chest)
 
         for item in loot_list:
-            item.position = Vector2(random.randint(0, size_vector.x),
-                                    random.randint(0, size_vector.y))
+            item.position = Vector2(rng.randint(0, size_vector.x),
+                                    rng.randint(0, size_vector.y))
 
-        enemy_list = creatures.EnemyHumanoid.generate_enemies(level, enemy_power, enemy_distribution)
-        enemy_list.sort(key=creatures.Creature.power_sort_key, reverse=True)
+        enemy_list = creatures.EnemyHumanoid.generate_enemies(level, enemy_power, enemy_distribution, rng)
+        # the power levels are worked out once, for both the sort and the total enemy power of the room
+        enemy_powers = {id(enemy): enemy.power_level for enemy in enemy_list}
+        enemy_list.sort(key=lambda enemy: enemy_powers[id(enemy)], reverse=True)
 
         for enemy in enemy_list:
-            enemy.position = Vector2(random.randint(0, size_vector.x),
-                                     random.randint(0, size_vector.y))
+            enemy.position = Vector2(rng.randint(0, size_vector.x),
+                                     rng.randint(0, size_vector.y))
 
         room_instance = cls(
             level,
@@ -337,59 +483,765 @@ class Room:
             position,
             entrance_direction,
             exit_directions)
+        room_instance.cached_enemy_power = sum(enemy_powers.values())
 
         return room_instance
 
 
+class ColliderGrid:
+    """Uniform grid index of rooms, used to only check collisions between rooms that are near each other"""
+
+    def __init__(self, cell_size=16):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def get_cells(self, position, size_vector):
+        """Returns the keys of every grid cell covered by the rectangle"""
+        first_x = position.x // self.cell_size
+        first_y = position.y // self.cell_size
+        last_x = (position.x + max(size_vector.x, 1) - 1) // self.cell_size
+        last_y = (position.y + max(size_vector.y, 1) - 1) // self.cell_size
+
+        cell_keys = []
+        for cell_x in range(int(first_x), int(last_x) + 1):
+            for cell_y in range(int(first_y), int(last_y) + 1):
+                cell_keys.append((cell_x, cell_y))
+        return cell_keys
+
+    def add(self, room):
+        for cell_key in self.get_cells(room.position, room.size_vector):
+            if cell_key not in self.cells:
+                self.cells[cell_key] = []
+            self.cells[cell_key].append(room)
+
+    def remove(self, room):
+        for cell_key in self.get_cells(room.position, room.size_vector):
+            cell = self.cells.get(cell_key)
+            if not cell:
+                continue
+
+            for i, other_room in enumerate(cell):
+                if other_room is room:
+                    del cell[i]
+                    break
+
+            if len(cell) == 0:
+                del self.cells[cell_key]
+
+    def query(self, position, size_vector):
+        """Returns every room that shares a grid cell with the rectangle, without duplicates"""
+        found_rooms = {}
+        for cell_key in self.get_cells(position, size_vector):
+            for room in self.cells.get(cell_key, ()):
+                found_rooms[id(room)] = room
+        return list(found_rooms.values())
+
+    def add_index(self, position, size_vector, room_index):
+        """Indexes a rectangle by the index of its row in a RoomTable instead of by its room"""
+        for cell_key in self.get_cells(position, size_vector):
+            if cell_key not in self.cells:
+                self.cells[cell_key] = []
+            self.cells[cell_key].append(room_index)
+
+    def query_indexes(self, position, size_vector):
+        """Returns a numpy array of every index added with add_index that shares a grid cell with the rectangle"""
+        found_indexes = set()
+        for cell_key in self.get_cells(position, size_vector):
+            found_indexes.update(self.cells.get(cell_key, ()))
+        return np.fromiter(found_indexes, dtype=np.int64, count=len(found_indexes))
+
+
+class RoomTable:
+    """
+    The rooms of a very large map as numpy arrays, one row per room, instead of a Room object each.
+    Collision checks, bounds and rendering run over the arrays, and RoomView gives a Room like view of a row.
+    Rooms are populated from their seed when they are turned into a Room, so only layouts are kept here.
+    RoomTable.generate lays a map out straight into a table, from_rooms and from_map copy a map that is already made
+    """
+    door_bits = {'north': 1, 'south': 2, 'east': 4, 'west': 8}
+    column_names = ('positions', 'sizes', 'levels', 'doors', 'exits')
+
+    def __init__(self, positions, sizes, levels, doors, seeds=None, biome=None, seed=None, exits=None):
+        """
+        :param positions: (room count, 2) int32 array of the bottom left corner of each room
+        :param sizes: (room count, 2) int32 array of the size of each room
+        :param levels: int32 array of the level of each room
+        :param doors: uint8 array of door_bits added together for the doors of each room
+        :param seeds: uint64 array of the seed of each room, or None if the rooms were not seeded
+        :param seed: seed of the map, so renders of the same map get the same colours
+        :param exits: uint8 array of door_bits added together for the exit directions of each room, none if None
+        """
+        if exits is None:
+            exits = np.zeros(len(levels), dtype=np.uint8)
+
+        # the columns are views of the first rows of these arrays, which have room for rows to be added
+        self.buffers = {'positions': positions, 'sizes': sizes, 'levels': levels, 'doors': doors, 'exits': exits}
+        self.set_row_count(len(levels))
+        self.seeds = seeds
+        self.biome = biome
+        self.seed = seed
+
+    @classmethod
+    def empty(cls, biome=None, seed=None, capacity=1024):
+        """Returns a table without rows, ready for append_room"""
+        room_table = cls(np.zeros((capacity, 2), dtype=np.int32), np.zeros((capacity, 2), dtype=np.int32),
+                         np.zeros(capacity, dtype=np.int32), np.zeros(capacity, dtype=np.uint8),
+                         biome=biome, seed=seed, exits=np.zeros(capacity, dtype=np.uint8))
+        room_table.set_row_count(0)
+        return room_table
+
+    @classmethod
+    def from_rooms(cls, room_list, biome=None, seed=None):
+        """Copies the layout of room_list, the rooms can be dropped afterwards"""
+        positions = np.array([(room.position.x, room.position.y) for room in room_list], dtype=np.int32).reshape(-1, 2)
+        sizes = np.array([(room.size_vector.x, room.size_vector.y) for room in room_list], dtype=np.int32).reshape(-1, 2)
+        levels = np.array([int(room.level or 0) for room in room_list], dtype=np.int32)
+        doors = np.array([RoomTable.get_door_mask(room.doors) for room in room_list], dtype=np.uint8)
+        exits = np.array([RoomTable.get_exit_mask(room.exit_directions) for room in room_list], dtype=np.uint8)
+
+        seeds = None
+        if room_list and all(room.seed is not None for room in room_list):
+            seeds = np.array([room.seed for room in room_list], dtype=np.uint64)
+
+        return cls(positions, sizes, levels, doors, seeds, biome, seed, exits)
+
+    @classmethod
+    def from_map(cls, game_map):
+        return cls.from_rooms(game_map.room_list, game_map.biome, game_map.seed)
+
+    @classmethod
+    def generate(cls, map_size, connectivity, biome, level, level_interval=1, special_rooms=None,
+                 special_room_occurance=0.01, seed=None):
+        """
+        Lays out a map with the 'interval' strategy straight into a table, see RoomTableGenerator.
+        The rows are the same rooms, in the same order and with the same seeds, as MapGenerator gives for the seed
+        """
+        map_generator = RoomTableGenerator(map_size, connectivity, biome, level, level_interval, None, special_rooms,
+                                           special_room_occurance, seed)
+        map_generator.finish_layout()
+        return map_generator.room_table
+
+    @staticmethod
+    def get_door_mask(doors):
+        door_mask = 0
+        if doors:
+            for direction, door_bit in RoomTable.door_bits.items():
+                if doors[direction]:
+                    door_mask |= door_bit
+        return door_mask
+
+    @staticmethod
+    def get_exit_mask(exit_directions):
+        exit_mask = 0
+        for direction in exit_directions or ():
+            exit_mask |= RoomTable.door_bits[direction]
+        return exit_mask
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, room_index):
+        return RoomView(self, room_index)
+
+    def __iter__(self):
+        for room_index in range(0, len(self)):
+            yield RoomView(self, room_index)
+
+    def set_row_count(self, row_count):
+        for column_name in RoomTable.column_names:
+            setattr(self, column_name, self.buffers[column_name][:row_count])
+
+    def append_room(self, room):
+        """
+        Adds the layout of room as a new row and returns its index.
+        The arrays double in size when they are full, so adding a room takes O(1) time on average
+        """
+        room_index = len(self)
+        if room_index == len(self.buffers['levels']):
+            for column_name, buffer in self.buffers.items():
+                grown_buffer = np.zeros((max(2 * len(buffer), 64),) + buffer.shape[1:], dtype=buffer.dtype)
+                grown_buffer[:room_index] = buffer[:room_index]
+                self.buffers[column_name] = grown_buffer
+
+        self.buffers['positions'][room_index] = (room.position.x, room.position.y)
+        self.buffers['sizes'][room_index] = (room.size_vector.x, room.size_vector.y)
+        self.buffers['levels'][room_index] = int(room.level or 0)
+        self.buffers['doors'][room_index] = RoomTable.get_door_mask(room.doors)
+        self.buffers['exits'][room_index] = RoomTable.get_exit_mask(room.exit_directions)
+        self.set_row_count(room_index + 1)
+
+        return room_index
+
+    def sort_by_level(self):
+        """Sorts the rows by level like Map.room_level_sort_key, rooms of the same level keep their order"""
+        row_order = np.argsort(self.levels, kind='stable')
+        for column_name in RoomTable.column_names:
+            self.buffers[column_name] = getattr(self, column_name)[row_order]
+        if self.seeds is not None:
+            self.seeds = self.seeds[row_order]
+        self.set_row_count(len(row_order))
+
+    def to_rooms(self):
+        """Returns a full Room for every row, which each populate from their seed when first used"""
+        return [room_view.to_room() for room_view in self]
+
+    def get_colliding_indexes(self, position, size_vector, room_indexes=None):
+        """Returns the indexes of every room overlapping the rectangle, only out of room_indexes if they are given"""
+        if room_indexes is None:
+            room_indexes = np.arange(len(self))
+
+        x = self.positions[room_indexes, 0]
+        y = self.positions[room_indexes, 1]
+        colliding = ((x < position.x + size_vector.x) & (x + self.sizes[room_indexes, 0] > position.x) &
+                     (y < position.y + size_vector.y) & (y + self.sizes[room_indexes, 1] > position.y))
+        return room_indexes[colliding]
+
+    def check_collision(self, position, size_vector, ignore_index=None):
+        """Checks if the rectangle overlaps any room, except the room at ignore_index"""
+        colliding_indexes = self.get_colliding_indexes(position, size_vector)
+        if ignore_index is not None:
+            colliding_indexes = colliding_indexes[colliding_indexes != ignore_index]
+        return len(colliding_indexes) > 0
+
+    def get_map_bounds(self):
+        """Returns the same dict as Map.get_map_bounds, the bounds always cover the origin"""
+        if len(self) == 0:
+            return {'dimensions': Vector2(0, 0), 'position': Vector2(0, 0)}
+
+        left_most = min(0, int(self.positions[:, 0].min()))
+        bottom_most = min(0, int(self.positions[:, 1].min()))
+        right_most = max(0, int((self.positions[:, 0] + self.sizes[:, 0]).max()))
+        top_most = max(0, int((self.positions[:, 1] + self.sizes[:, 1]).max()))
+
+        return {'dimensions': Vector2(right_most - left_most, top_most - bottom_most),
+                'position': Vector2(left_most, bottom_most)}
+
+    def get_cell_owners(self, map_bounds, cells_per_chunk=1 << 20):
+        """
+        Returns a (y, x) array covering map_bounds with the index of the room over each cell, or -1 if there is none.
+        Where rooms overlap the later room is kept, as if the rooms were drawn one at a time.
+        Every cell of every room is worked out at once, in chunks of rooms so big maps do not need all cells in memory
+        """
+        width = map_bounds['dimensions'].x
+        cell_owners = np.full(map_bounds['dimensions'].y * width, -1, dtype=np.int64)
+
+        corners = (self.positions - map_bounds['position'].to_list()).astype(np.int64)
+        widths = self.sizes[:, 0].astype(np.int64)
+        cell_counts = widths * self.sizes[:, 1]
+        cell_ends = np.cumsum(cell_counts)
+
+        first_room = 0
+        while first_room < len(self):
+            end_room = max(int(np.searchsorted(cell_ends, cell_ends[first_room] - cell_counts[first_room] +
+                                               cells_per_chunk, side='right')), first_room + 1)
+
+            chunk_counts = cell_counts[first_room:end_room]
+            room_indexes = np.repeat(np.arange(first_room, end_room), chunk_counts)
+            # where each cell is inside its room, counted row by row from the bottom left corner
+            cell_offsets = np.arange(len(room_indexes)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+            cell_x = corners[room_indexes, 0] + cell_offsets % widths[room_indexes]
+            cell_y = corners[room_indexes, 1] + cell_offsets // widths[room_indexes]
+            np.maximum.at(cell_owners, cell_y * width + cell_x, room_indexes)
+
+            first_room = end_room
+
+        return cell_owners.reshape(map_bounds['dimensions'].y, width)
+
+    def get_level_raster(self):
+        """The same raster as Map.get_level_raster"""
+        cell_owners = self.get_cell_owners(self.get_map_bounds())
+        return np.where(cell_owners >= 0, self.levels[cell_owners], -1).astype(np.int32)
+
+    def get_room_colours(self):
+        """
+        Returns an RGBA colour for every room and a transparent one at the end, for cells without a room.
+        The first room is white and every other room gets a random colour, drawn at once from the seed of the map
+        """
+        colour_rng = np.random.default_rng(self.seed)
+
+        room_colours = np.zeros((len(self) + 1, 4), dtype=np.uint8)
+        room_colours[:-1, :3] = colour_rng.integers(0, 256, (len(self), 3))
+        room_colours[:-1, 3] = 255
+        if len(self) > 0:
+            room_colours[0] = (255, 255, 255, 255)
+
+        return room_colours
+
+    def render_map_array(self, resolution=10):
+        """
+        Returns the map as an RGBA numpy array with resolution pixels per map cell, with the colours of get_room_colours
+        """
+        cell_owners = self.get_cell_owners(self.get_map_bounds())
+        # -1 picks the transparent colour at the end
+        image_array = self.get_room_colours()[cell_owners]
+        image_array = np.repeat(np.repeat(image_array, resolution, axis=0), resolution, axis=1)
+
+        # images have y going down, so the bottom of the map has to be the last row
+        return image_array[::-1]
+
+    def render_map_image(self, resolution=10):
+        image = Image.fromarray(np.ascontiguousarray(self.render_map_array(resolution)))
+
+        image_bytes = io.BytesIO()
+        image.save(image_bytes, 'PNG')
+
+        return image_bytes.getvalue()
+
+
+class RoomView:
+    """One row of a RoomTable that reads like a Room, made on demand so the table does not hold an object per room"""
+    __slots__ = ('room_table', 'room_index')
+
+    def __init__(self, room_table, room_index):
+        self.room_table = room_table
+        self.room_index = room_index
+
+    @property
+    def position(self):
+        return Vector2(*self.room_table.positions[self.room_index].tolist())
+
+    @property
+    def size_vector(self):
+        return Vector2(*self.room_table.sizes[self.room_index].tolist())
+
+    @property
+    def level(self):
+        return int(self.room_table.levels[self.room_index])
+
+    @property
+    def doors(self):
+        door_mask = int(self.room_table.doors[self.room_index])
+        return {direction: door_mask & door_bit != 0 for direction, door_bit in RoomTable.door_bits.items()}
+
+    @property
+    def exit_directions(self):
+        exit_mask = int(self.room_table.exits[self.room_index])
+        return [direction for direction, door_bit in RoomTable.door_bits.items() if exit_mask & door_bit]
+
+    @property
+    def seed(self):
+        if self.room_table.seeds is None:
+            return None
+        return int(self.room_table.seeds[self.room_index])
+
+    def check_all_collision(self):
+        """Checks if this room overlaps any other room of the table"""
+        return self.room_table.check_collision(self.position, self.size_vector, self.room_index)
+
+    def to_room(self):
+        return Room(self.level, self.size_vector, self.doors, self.room_table.biome, None, None, self.position,
+                    exit_directions=self.exit_directions, seed=self.seed)
+
+
+class RoomGraph:
+    """
+    Which rooms are connected by doors, stored as compact int arrays in compressed sparse row form:
+    the neighbours of room i are neighbours[offsets[i]:offsets[i + 1]], where i is the index of the room in room_list.
+    Distances from the entrance room are worked out once, and recent routes are kept in a LRU cache
+    """
+
+    def __init__(self, room_list, offsets, neighbours, entrance_index=0, route_cache_size=128):
+        self.room_list = room_list
+        self.room_indexes = {id(room): i for i, room in enumerate(room_list)}
+        self.offsets = offsets
+        self.neighbours = neighbours
+        self.entrance_index = entrance_index
+
+        # room centres are doubled so they stay ints, they are only used for the A* heuristic
+        self.centres_x = array.array('i', (2 * room.position.x + room.size_vector.x for room in room_list))
+        self.centres_y = array.array('i', (2 * room.position.y + room.size_vector.y for room in room_list))
+        self.max_step_length = 1
+        for i in range(0, len(room_list)):
+            for neighbour in self.get_neighbours(i):
+                self.max_step_length = max(self.max_step_length, self.get_centre_distance(i, neighbour))
+
+        self.route_cache_size = route_cache_size
+        self.route_cache = collections.OrderedDict()
+
+        if room_list:
+            self.entrance_distances, self.entrance_parents = self.breadth_first_search(entrance_index)
+        else:
+            self.entrance_distances, self.entrance_parents = array.array('i'), array.array('i')
+
+    @staticmethod
+    def get_touching_rooms(room, collider_grid):
+        """Yields the rooms sharing some of the north or east wall of room, so every pair is found once"""
+        for side in ('north', 'east'):
+            if side == 'north':
+                wall = Room.empty(Vector2(room.size_vector.x, 1),
+                                  Vector2(room.position.x, room.position.y + room.size_vector.y))
+            else:
+                wall = Room.empty(Vector2(1, room.size_vector.y),
+                                  Vector2(room.position.x + room.size_vector.x, room.position.y))
+
+            for other_room in collider_grid.query(wall.position, wall.size_vector):
+                if wall.check_collision(other_room):
+                    yield other_room
+
+    @classmethod
+    def from_connections(cls, room_list, connections, entrance_index=0):
+        """
+        Builds the graph from the connections made while the map was generated,
+        pairs of room positions as tuples, so they still match rooms copied to and from other processes
+        """
+        room_indexes = {(room.position.x, room.position.y): i for i, room in enumerate(room_list)}
+
+        neighbour_lists = [[] for _ in room_list]
+        for room_position, other_position in connections:
+            room_index = room_indexes[room_position]
+            other_index = room_indexes[other_position]
+            neighbour_lists[room_index].append(other_index)
+            neighbour_lists[other_index].append(room_index)
+
+        return cls.from_neighbour_lists(room_list, neighbour_lists, entrance_index)
+
+    @classmethod
+    def from_rooms(cls, room_list, entrance_index=0):
+        """
+        Builds the graph of a map that was not just generated, guessing that rooms sharing a wall are connected.
+        Rooms are always placed against the wall of the room they come from, so no generated connection is missed
+        """
+        collider_grid = Map.generate_collider_grid(room_list)
+        room_indexes = {id(room): i for i, room in enumerate(room_list)}
+
+        neighbour_lists = [[] for _ in room_list]
+        for room_index, room in enumerate(room_list):
+            for other_room in RoomGraph.get_touching_rooms(room, collider_grid):
+                other_index = room_indexes[id(other_room)]
+                neighbour_lists[room_index].append(other_index)
+                neighbour_lists[other_index].append(room_index)
+
+        return cls.from_neighbour_lists(room_list, neighbour_lists, entrance_index)
+
+    @classmethod
+    def from_neighbour_lists(cls, room_list, neighbour_lists, entrance_index=0):
+        offsets = array.array('i', [0])
+        neighbours = array.array('i')
+        for neighbour_list in neighbour_lists:
+            neighbours.extend(sorted(set(neighbour_list)))
+            offsets.append(len(neighbours))
+
+        return cls(room_list, offsets, neighbours, entrance_index)
+
+    @property
+    def room_count(self):
+        return len(self.offsets) - 1
+
+    @property
+    def connection_count(self):
+        return len(self.neighbours) // 2
+
+    def get_neighbours(self, room_index):
+        return self.neighbours[self.offsets[room_index]:self.offsets[room_index + 1]]
+
+    def get_centre_distance(self, room_index, other_index):
+        return (abs(self.centres_x[room_index] - self.centres_x[other_index]) +
+                abs(self.centres_y[room_index] - self.centres_y[other_index]))
+
+    def breadth_first_search(self, start_index):
+        """Returns the number of doors to walk through to reach each room from start_index, -1 if it can not be reached,
+        and the room each room is reached from"""
+        distances = array.array('i', [-1]) * self.room_count
+        parents = array.array('i', [-1]) * self.room_count
+        distances[start_index] = 0
+
+        queue = collections.deque([start_index])
+        while queue:
+            room_index = queue.popleft()
+            for neighbour in self.get_neighbours(room_index):
+                if distances[neighbour] == -1:
+                    distances[neighbour] = distances[room_index] + 1
+                    parents[neighbour] = room_index
+                    queue.append(neighbour)
+
+        return distances, parents
+
+    def get_distance(self, room_index):
+        """Returns how many doors away from the entrance the room is, or -1 if it can not be reached"""
+        return self.entrance_distances[room_index]
+
+    def find_route(self, start_index, goal_index):
+        """
+        Returns a tuple of the room indexes on a shortest route from start_index to goal_index, including both,
+        or None if there is no route. Routes from the entrance come straight from the precomputed search,
+        other routes are found with A* and cached
+        """
+        route_key = (start_index, goal_index)
+        if route_key in self.route_cache:
+            self.route_cache.move_to_end(route_key)
+            return self.route_cache[route_key]
+
+        if start_index == self.entrance_index:
+            route = self.get_entrance_route(goal_index)
+        else:
+            route = self.search_route(start_index, goal_index)
+
+        self.route_cache[route_key] = route
+        if len(self.route_cache) > self.route_cache_size:
+            self.route_cache.popitem(last=False)
+
+        return route
+
+    def get_entrance_route(self, goal_index):
+        if self.entrance_distances[goal_index] == -1:
+            return None
+
+        route = [goal_index]
+        while route[-1] != self.entrance_index:
+            route.append(self.entrance_parents[route[-1]])
+        return tuple(reversed(route))
+
+    def search_route(self, start_index, goal_index):
+        """A* search, the straight line distance divided by the longest step between two rooms never overestimates"""
+        # rooms that can not be reached from the entrance can still be connected to each other
+        if (self.entrance_distances[start_index] == -1) != (self.entrance_distances[goal_index] == -1):
+            return None
+
+        parents = {start_index: -1}
+        costs = {start_index: 0}
+        open_heap = [(0, start_index)]
+
+        while open_heap:
+            _, room_index = heapq.heappop(open_heap)
+            if room_index == goal_index:
+                route = [goal_index]
+                while parents[route[-1]] != -1:
+                    route.append(parents[route[-1]])
+                return tuple(reversed(route))
+
+            cost = costs[room_index] + 1
+            for neighbour in self.get_neighbours(room_index):
+                if neighbour not in costs or cost < costs[neighbour]:
+                    costs[neighbour] = cost
+                    parents[neighbour] = room_index
+                    estimate = cost + self.get_centre_distance(neighbour, goal_index) / self.max_step_length
+                    heapq.heappush(open_heap, (estimate, neighbour))
+
+        return None
+
+
 class Map:
     """Holds multiple rooms and their relation to each other"""
 
-    def __init__(self, level, biome, room_list=[]):
+    def __init__(self, level, biome, room_list=None, seed=None):
+        if room_list is None:
+            room_list = []
+
         self.room_list = room_list
         self.level = level
         self.biome = biome
+        # seed of the GenerationContext the map was made with, None if it was not seeded
+        self.seed = seed
+        self.level_raster = None
+        self.room_graph = None
+        self.content_hash = None
+        # the same index placement uses, made the first time the map is searched
+        self.collider_grid = None
+
+        self.update_map_bounds()
+
+    def get_collider_grid(self):
+        if self.collider_grid is None:
+            self.collider_grid = Map.generate_collider_grid(self.room_list)
+        return self.collider_grid
+
+    def get_rooms_in_rectangle(self, position, size_vector):
+        """Returns every room overlapping the rectangle, only checking the rooms near it"""
+        rectangle = Room.empty(size_vector, position)
+        return [room for room in self.get_collider_grid().query(position, size_vector)
+                if rectangle.check_collision(room)]
+
+    def get_rooms_in_radius(self, centre, radius):
+        """Returns every room with some part of it within radius of centre"""
+        found_rooms = []
+        # one more tile around the square, so rooms just touching it at exactly radius away are found too
+        for room in self.get_collider_grid().query(centre - [radius + 1, radius + 1],
+                                                   Vector2(2 * radius + 2, 2 * radius + 2)):
+            # distance from the centre to the closest point of the room
+            distance_x = max(room.position.x - centre.x, 0, centre.x - (room.position.x + room.size_vector.x))
+            distance_y = max(room.position.y - centre.y, 0, centre.y - (room.position.y + room.size_vector.y))
+            if distance_x ** 2 + distance_y ** 2 <= radius ** 2:
+                found_rooms.append(room)
+        return found_rooms
 
-    def print_map(self, export_file=None):
+    @staticmethod
+    def get_room_contents(room_list, content_type, is_inside):
+        """
+        Returns (content, map position) of the enemies or items of room_list at a map position is_inside accepts.
+        Their positions are stored relative to their room, so they are moved by the room position first
+        """
+        contents = []
+        for room in room_list:
+            for content in getattr(room, content_type) or []:
+                if content.position is None:
+                    continue
+
+                map_position = room.position + content.position
+                if is_inside(map_position):
+                    contents.append((content, map_position))
+        return contents
+
+    def get_contents_in_rectangle(self, content_type, position, size_vector):
+        """content_type is 'enemies' or 'items'"""
+        def is_inside(map_position):
+            return (position.x <= map_position.x < position.x + size_vector.x and
+                    position.y <= map_position.y < position.y + size_vector.y)
+
+        return Map.get_room_contents(self.get_rooms_in_rectangle(position, size_vector), content_type, is_inside)
+
+    def get_contents_in_radius(self, content_type, centre, radius):
+        """content_type is 'enemies' or 'items'"""
+        def is_inside(map_position):
+            return (map_position.x - centre.x) ** 2 + (map_position.y - centre.y) ** 2 <= radius ** 2
+
+        return Map.get_room_contents(self.get_rooms_in_radius(centre, radius), content_type, is_inside)
+
+    def get_content_hash(self):
+        """Returns a hash of everything that changes how the map looks, worked out once until the rooms change"""
+        if self.content_hash is None:
+            map_hash = hashlib.sha1(str(self.seed).encode())
+            for room in self.room_list:
+                map_hash.update(f'{room.position.x},{room.position.y},{room.size_vector.x},{room.size_vector.y},'
+                                f'{room.level};'.encode())
+            self.content_hash = map_hash.hexdigest()
+        return self.content_hash
+
+    def add_room(self, room):
+        """Adds room to the map, keeping the bounds up to date and drawing it on the raster if it is inside them"""
+        self.room_list.append(room)
+        self.room_graph = None
+        self.content_hash = None
+        if self.collider_grid is not None:
+            self.collider_grid.add(room)
+
+        if self.extend_map_bounds(room):
+            self.level_raster = None
+        elif self.level_raster is not None:
+            self.draw_room_on_raster(room, int(room.level or 0))
+
+    def remove_room(self, room):
+        """Removes room from the map. The bounds are only scanned again if room was on the edge of the map"""
+        if self.room_list and self.room_list[-1] is room:
+            del (self.room_list[-1])
+        else:
+            self.room_list.remove(room)
+        self.room_graph = None
+        self.content_hash = None
+        if self.collider_grid is not None:
+            self.collider_grid.remove(room)
+
+        on_edge = (room.position.x == self.left_most or room.position.x + room.size_vector.x == self.right_most or
+                   room.position.y == self.bottom_most or room.position.y + room.size_vector.y == self.top_most)
+
+        if on_edge:
+            old_bounds = (self.left_most, self.right_most, self.top_most, self.bottom_most)
+            self.update_map_bounds()
+            if old_bounds != (self.left_most, self.right_most, self.top_most, self.bottom_most):
+                self.level_raster = None
+
+        if self.level_raster is not None:
+            self.draw_room_on_raster(room, -1)
+
+    def update_map_bounds(self):
+        """Scans every room for the bounds of the map, which always cover the origin"""
+        self.left_most = 0
+        self.right_most = 0
+        self.top_most = 0
+        self.bottom_most = 0
+
+        for room in self.room_list:
+            self.extend_map_bounds(room)
+
+    def extend_map_bounds(self, room):
+        """Grows the bounds to cover room, returns True if they changed"""
+        changed = False
+
+        if room.position.x < self.left_most:
+            self.left_most = room.position.x
+            changed = True
+
+        if room.position.x + room.size_vector.x > self.right_most:
+            self.right_most = room.position.x + room.size_vector.x
+            changed = True
+
+        if room.position.y + room.size_vector.y > self.top_most:
+            self.top_most = room.position.y + room.size_vector.y
+            changed = True
+
+        if room.position.y < self.bottom_most:
+            self.bottom_most = room.position.y
+            changed = True
+
+        return changed
+
+    def get_room_graph(self):
+        """Returns the RoomGraph of the rooms, built the first time it is needed if generation did not build it"""
+        if self.room_graph is None:
+            self.room_graph = RoomGraph.from_rooms(self.room_list)
+        return self.room_graph
+
+    def get_route(self, start_room, goal_room):
+        """Returns the rooms on a shortest route through doors from start_room to goal_room, or None"""
+        room_graph = self.get_room_graph()
+        route = room_graph.find_route(room_graph.room_indexes[id(start_room)], room_graph.room_indexes[id(goal_room)])
+        if route is None:
+            return None
+        return [self.room_list[room_index] for room_index in route]
+
+    def get_room_distance(self, room):
+        """Returns how many doors away from the entrance room is, or -1 if it can not be reached"""
+        room_graph = self.get_room_graph()
+        return room_graph.get_distance(room_graph.room_indexes[id(room)])
+
+    def get_level_raster(self):
+        """
+        Returns a numpy array covering the map bounds where each cell holds the level of the room over it,
+        or -1 if there is no room. Row 0 is the bottom of the map.
+        The raster is built once and reused until clear_render_cache is called
+        """
+        if self.level_raster is not None:
+            return self.level_raster
 
         map_bounds = self.get_map_bounds()
-        ascii_pixel_matrix = []
+        self.level_raster = np.full((map_bounds['dimensions'].y, map_bounds['dimensions'].x), -1, dtype=np.int32)
 
-        for y in range(map_bounds['position'].y, map_bounds['dimensions'].y + map_bounds['position'].y):
-            ascii_pixel_row = ['']
+        for room in self.room_list:
+            self.draw_room_on_raster(room, int(room.level or 0))
 
-            for x in range(map_bounds['position'].x, map_bounds['dimensions'].x + map_bounds['position'].x):
+        return self.level_raster
 
-                pixel_collider = Room.empty(Vector2(1, 1), Vector2(x, y))
-                collides = False
+    def draw_room_on_raster(self, room, level):
+        x = room.position.x - self.left_most
+        y = room.position.y - self.bottom_most
+        self.level_raster[y:y + room.size_vector.y, x:x + room.size_vector.x] = level
 
-                room_level = 0
-                for room in self.room_list:
-                    if room.check_collision(pixel_collider):
-                        collides = True
-                        room_level = room.level
+    def clear_render_cache(self):
+        """
+        Call after changing room_list without add_room or remove_room,
+        so the bounds are scanned again and the next render rebuilds the raster
+        """
+        self.update_map_bounds()
+        self.level_raster = None
+        self.room_graph = None
+        self.content_hash = None
+        self.collider_grid = None
 
-                if collides:
-                    if room_level < 10:
-                        ascii_pixel_row.append(f'{int(room_level)}')
-                    else:
-                        ascii_pixel_row.append('#')
-                else:
-                    ascii_pixel_row.append(' ')
+    def print_map(self, export_file=None):
 
-            ascii_pixel_matrix.append(ascii_pixel_row)
+        map_bounds = self.get_map_bounds()
+        level_raster = self.get_level_raster()
+
+        # levels under 10 are drawn as their digit, higher levels as # and empty space as a space
+        ascii_raster = np.where(level_raster < 10, level_raster + ord('0'), ord('#'))
+        ascii_raster = np.where(level_raster < 0, ord(' '), ascii_raster).astype(np.uint8)
 
         map_string = f'{map_bounds}\n'
 
         for room in self.room_list:
             map_string += f'Room level {room.level} dimensions: {room.size_vector}\n'
 
-        for row in ascii_pixel_matrix:
-            row_string = ''
-
-            for pixel in row:
-                row_string += pixel
-
-            map_string = f'{map_string}\n{row_string}'
+        for row in ascii_raster:
+            map_string += '\n' + row.tobytes().decode('ascii')
 
         if export_file:
             export_file = f'{os.path.dirname(os.path.realpath(__file__))}/Maps/{export_file}'
@@ -400,82 +1252,54 @@ class Map:
 
         return map_string
 
-    def export_map_image(self, export_file='map.png', resolution=10):
-
-        export_file = f'{os.path.dirname(os.path.realpath(__file__))}/{export_file}'
-        map_bounds = self.get_map_bounds()
-
-        y_offset = 0
-        for room in self.room_list:
-            if room.position.y < y_offset:
-                y_offset = room.position.y
+    def render_map_array(self, resolution=10):
+        """
+        Returns the map as an RGBA numpy array with resolution pixels per map cell, drawn over the rows of a RoomTable.
+        The first room is white and every other room gets a random colour, which is the same every time for seeded maps
+        """
+        return RoomTable.from_map(self).render_map_array(resolution)
 
-        image = Image.new(mode='RGBA', size=(map_bounds['dimensions'].x,
-                                             map_bounds['dimensions'].y + 1),
-                          color=(0, 0, 0, 0))
+    def render_map_image(self, resolution=10):
+        """Returns the map as PNG encoded bytes, ready to be sent without touching the disk"""
+        image = Image.fromarray(np.ascontiguousarray(self.render_map_array(resolution)))
 
-        # print(image.size)
-        for room in self.room_list:
-            if room is self.room_list[0]:
-                color = (255, 255, 255, 255)
-            else:
-                color = (
-                    random.randint(0, 255),
-                    random.randint(0, 255),
-                    random.randint(0, 255),
-                    255
-                )
+        image_bytes = io.BytesIO()
+        image.save(image_bytes, 'PNG')
 
-            for y in range(0, room.size_vector.y):
-                for x in range(0, room.size_vector.x):
-                    image.putpixel((room.position.x + x - map_bounds['position'].x,
-                                    room.position.y + y - map_bounds['position'].y),
-                                   color)
+        return image_bytes.getvalue()
 
-        image = image.resize((map_bounds['dimensions'].x * resolution,
-                              map_bounds['dimensions'].y * resolution),
-                             resample=Image.NEAREST)
+    def export_map_image(self, export_file='map.png', resolution=10):
 
-        image = image.transpose(Image.FLIP_TOP_BOTTOM)
+        export_file = f'{os.path.dirname(os.path.realpath(__file__))}/{export_file}'
+        image_bytes = self.render_map_image(resolution)
 
-        image.save(export_file, 'PNG')
+        with open(export_file, 'wb') as file:
+            file.write(image_bytes)
 
-        return image
+        return image_bytes
 
     def get_map_bounds(self):
         """
-        Returns a map with
+        Returns a dict with the dimensions and bottom left position of the map.
+        The bounds are kept up to date by add_room and remove_room, so this does not look at the rooms
         """
-        left_most = 0
-        right_most = 0
-        top_most = 0
-        bottom_most = 0
-
-        for room in self.room_list:
-            if room.position.x < left_most:
-                left_most = room.position.x
-
-            if room.position.x + room.size_vector.x > right_most:
-                right_most = room.position.x + room.size_vector.x
-
-            if room.position.y + room.size_vector.y > top_most:
-                top_most = room.position.y + room.size_vector.y
-
-            if room.position.y < bottom_most:
-                bottom_most = room.position.y
+        width = abs(self.right_most - self.left_most)
+        height = abs(self.top_most - self.bottom_most)
 
-        width = abs(right_most - left_most)
-        height = abs(top_most - bottom_most)
-
-        return {'dimensions': Vector2(width, height), 'position': Vector2(left_most, bottom_most)}
+        return {'dimensions': Vector2(width, height), 'position': Vector2(self.left_most, self.bottom_most)}
 
     @staticmethod
     def room_level_sort_key(room):
         return room.level
 
     @classmethod
-    def generate_collider_grid(cls, size_vector=Vector2.zero()):
-        pass
+    def generate_collider_grid(cls, room_list=None, cell_size=16):
+        """Returns a ColliderGrid holding every room in room_list"""
+        collider_grid = ColliderGrid(cell_size)
+        if room_list:
+            for room in room_list:
+                collider_grid.add(room)
+        return collider_grid
 
     @classmethod
     async def generate_map(
@@ -489,7 +1313,12 @@ class Map:
             special_rooms=[],
             special_room_occurance=0.01,
             client=None,
-            progress_message=None
+            progress_message=None,
+            process_pool=None,
+            snapshot_sink=None,
+            seed=None,
+            lazy_population=False,
+            placement_strategy='random'
     ):
 
         """
@@ -501,285 +1330,1030 @@ class Map:
         :param current_map: The map that this map will build upon
         :param special_rooms: list of premade rooms
         :param special_room_occurance: how often premade rooms appear as percent (0, 1)
+        :param process_pool: MapProcessPool to lay out the map in and populate its rooms across, so the event loop stays free
+        :param snapshot_sink: MapSnapshotSink that saves debug snapshots of the map as it is laid out, off if None
+        :param seed: the same seed and arguments always give the same map, a random seed is picked if None
+        :param lazy_population: only lay out the map, each room generates its items and enemies when they are first used
+        :param placement_strategy: 'random' retries random spots, 'interval' picks from the free spots of a wall,
+            which takes a bounded amount of work per room and finishes dense maps
         :return: Map instance
         """
 
         start_time = datetime.datetime.now()
 
+        generator_kwargs = Map.get_generator_kwargs(
+            map_size, connectivity, biome, level, level_interval, current_map, special_rooms, special_room_occurance,
+            snapshot_sink, seed, placement_strategy)
+        map_size = generator_kwargs['map_size']
+
+        progress_reporter = ProgressReporter(client, progress_message, length=min(map_size, 20))
+        await progress_reporter.update(0)
+
+        # the layout is the first half of the progress bar and populating the rooms is the second half
+        if lazy_population:
+            layout_progress = 100
+        else:
+            layout_progress = 50
+
+        if process_pool:
+            event_loop = asyncio.get_event_loop()
+
+            progress_queue = process_pool.manager.Queue()
+            layout_future = event_loop.run_in_executor(
+                process_pool.executor, build_layout, generator_kwargs, progress_queue)
+
+            while not layout_future.done():
+                await asyncio.wait([layout_future], timeout=0.5)
+
+                while not progress_queue.empty():
+                    await progress_reporter.update(int(progress_queue.get() * layout_progress))
+
+            map_generator = layout_future.result()
+
+        else:
+            map_generator = MapGenerator(**generator_kwargs)
+
+            while not map_generator.finished:
+                map_generator.place_next_room()
+                await progress_reporter.update(int(map_generator.progress * layout_progress))
+
+            map_generator.finish_layout()
+
+        if lazy_population:
+            populated_chunks = [map_generator.room_list]
+
+        elif process_pool:
+            population_chunks = map_generator.get_population_chunks(
+                process_pool.get_chunk_size(len(map_generator.room_list)))
+            chunk_futures = [
+                event_loop.run_in_executor(process_pool.executor, populate_rooms, room_chunk)
+                for room_chunk in population_chunks]
+
+            for chunks_done, chunk_future in enumerate(asyncio.as_completed(chunk_futures), 1):
+                await chunk_future
+                await progress_reporter.update(50 + int(chunks_done / len(chunk_futures) * 50))
+
+            populated_chunks = [chunk_future.result() for chunk_future in chunk_futures]
+
+        else:
+            population_chunks = map_generator.get_population_chunks()
+            populated_chunks = []
+            for room_chunk in population_chunks:
+                populated_chunks.append(populate_rooms(room_chunk))
+                await progress_reporter.update(50 + int(len(populated_chunks) / len(population_chunks) * 50))
+
+        game_map = map_generator.finish_map(populated_chunks)
+
+        await progress_reporter.finish()
+
+        generation_time = datetime.datetime.now() - start_time
+        logger.info(f'Map of size {map_size} with seed {generator_kwargs["seed"]} generated in {generation_time}')
+
+        return game_map
+
+    @staticmethod
+    def get_generator_kwargs(
+            map_size=None,
+            connectivity=None,
+            biome=None,
+            level=None,
+            level_interval=1,
+            current_map=[],
+            special_rooms=[],
+            special_room_occurance=0.01,
+            snapshot_sink=None,
+            seed=None,
+            placement_strategy='random'
+    ):
+        """Fills in the arguments generate_map was not given from the seed and returns the arguments of MapGenerator"""
+        context = GenerationContext(seed)
+        rng = context.rng
+
         if not map_size:
-            map_size = random.randint(5, 30)
+            map_size = rng.randint(5, 30)
             logger.debug(map_size)
 
         if not connectivity:
-            connectivity = random.uniform(0, 1)
+            connectivity = rng.uniform(0, 1)
 
         if not biome:
-            biome = Room.biome_list[random.randint(0, len(Room.biome_list) - 1)]
+            biome = Room.biome_list[rng.randint(0, len(Room.biome_list) - 1)]
 
         if not level:
             level = 1
 
+        return {
+            'map_size': int(map_size),
+            'connectivity': connectivity,
+            'biome': biome,
+            'level': int(level),
+            'level_interval': level_interval,
+            'current_map': current_map,
+            'special_rooms': special_rooms,
+            'special_room_occurance': special_room_occurance,
+            'snapshot_sink': snapshot_sink,
+            'seed': context.seed,
+            'placement_strategy': placement_strategy
+        }
+
+    @classmethod
+    async def stream_map(
+            cls,
+            map_size=None,
+            connectivity=None,
+            biome=None,
+            level=None,
+            level_interval=1,
+            current_map=[],
+            special_rooms=[],
+            special_room_occurance=0.01,
+            process_pool=None,
+            snapshot_sink=None,
+            seed=None,
+            lazy_population=False,
+            placement_strategy='random',
+            batch_size=25
+    ):
+        """
+        Generates a map like generate_map, but yields lists of up to batch_size finished rooms as soon as they are
+        ready instead of returning a Map, so the caller can show or save a map as it grows or stop early.
+        Every room is yielded once and they add up to the rooms of the Map generate_map gives for the same arguments.
+        The 'interval' strategy never moves a placed room, so its rooms are yielded while the map is laid out.
+        The 'random' strategy can take back rooms until the end, rollbacks can follow each other back to the first
+        room, so its rooms are only yielded once it is done. Its layout runs in process_pool if one is given,
+        otherwise it runs one room at a time in the event loop, giving other tasks a turn every batch_size rooms
+        so the caller can still cancel it. process_pool also populates the batches
+        """
+        generator_kwargs = Map.get_generator_kwargs(
+            map_size, connectivity, biome, level, level_interval, current_map, special_rooms, special_room_occurance,
+            snapshot_sink, seed, placement_strategy)
+        # a random layout given a process_pool is made in the pool instead
+        if placement_strategy == 'interval' or not process_pool:
+            map_generator = MapGenerator(**generator_kwargs)
+
+        async def finish_batch(room_batch):
+            for room in room_batch:
+                room.seed = map_generator.get_room_seed(room)
+
+            if lazy_population:
+                return room_batch
+            elif process_pool:
+                return await asyncio.get_event_loop().run_in_executor(
+                    process_pool.executor, populate_rooms, room_batch)
+            else:
+                return populate_rooms(room_batch)
+
+        streamed_rooms = set()
+        try:
+            if placement_strategy == 'interval':
+                room_batch = list(map_generator.room_list)
+                streamed_rooms.update(id(room) for room in room_batch)
+
+                while not map_generator.finished:
+                    if map_generator.place_next_room():
+                        room_batch.append(map_generator.room_list[-1])
+                        streamed_rooms.add(id(map_generator.room_list[-1]))
+
+                    if len(room_batch) >= batch_size:
+                        yield await finish_batch(room_batch)
+                        room_batch = []
+                        await asyncio.sleep(0)
+
+                if room_batch:
+                    yield await finish_batch(room_batch)
+
+                map_generator.finish_layout()
+
+            elif process_pool:
+                # build_layout also finishes the layout
+                map_generator = await asyncio.get_event_loop().run_in_executor(
+                    process_pool.executor, build_layout, generator_kwargs)
+
+            else:
+                rooms_placed = 0
+                while not map_generator.finished:
+                    map_generator.place_next_room()
+                    rooms_placed += 1
+                    if rooms_placed % batch_size == 0:
+                        await asyncio.sleep(0)
+
+                map_generator.finish_layout()
+
+            # hallways, and every room for strategies that can take rooms back
+            room_list = [room for room in map_generator.room_list if id(room) not in streamed_rooms]
+            for i in range(0, len(room_list), batch_size):
+                yield await finish_batch(room_list[i:i + batch_size])
+                await asyncio.sleep(0)
+
+        finally:
+            # the layout might have been stopped early, before finish_layout closed the sink
+            if snapshot_sink:
+                snapshot_sink.close()
+
+
+class MapGenerator:
+    """
+    Lays out the rooms of a map one room at a time, so the caller can report progress between rooms,
+    then populates them into a finished Map.
+    The layout draws from its own stream of the seed and every room gets a seed derived from its position,
+    which no other room shares, so the same seed always gives the same map
+    """
+
+    def __init__(
+            self,
+            map_size,
+            connectivity,
+            biome,
+            level,
+            level_interval=1,
+            current_map=None,
+            special_rooms=None,
+            special_room_occurance=0.01,
+            snapshot_sink=None,
+            seed=None,
+            placement_strategy='random'
+    ):
+
+        self.context = GenerationContext(seed)
+        self.layout_rng = self.context.derive('layout').rng
+
+        self.map_size = map_size
+        self.connectivity = connectivity
+        self.biome = biome
+        self.level = level
+        self.level_interval = level_interval
+        self.special_rooms = special_rooms or []
+        self.special_room_occurance = special_room_occurance
+        self.snapshot_sink = snapshot_sink
+        # 'random' retries random spots and rolls back 5 rooms, 'interval' picks from the free spots directly
+        self.placement_strategy = placement_strategy
+
         if current_map:
-            room_list = current_map
+            self.room_list = current_map
         else:
-            room_list = [
+            self.room_list = [
                 Room(
                     items=None,
                     enemies=None,
                     doors={'north': True, 'south': False, 'east': False, 'west': False},
                     position=Vector2.zero(),
-                    size_vector=Vector2(random.randint(2, 8), random.randint(2, 8)),
+                    size_vector=Vector2(self.layout_rng.randint(2, 8), self.layout_rng.randint(2, 8)),
                     biome=biome,
                     level=level,
                     entrance_direction=None,
                     exit_directions=['north']
                 )]
 
-        map_size = int(map_size)
-        level = int(level)
+        self.collider_grid = Map.generate_collider_grid(self.room_list)
+        self.list_index = 0
 
-        message_content = progress_message.content
-        progress_message = await client.edit_message(progress_message, message_content +
-                                                     f'\nProgress: []')
+        if self.snapshot_sink:
+            self.snapshot_sink.start_map(self.level, self.biome, self.room_list)
+        # (position, position) pairs of the rooms that lead into each other, for the RoomGraph of the map
+        self.connections = []
 
-        list_index = 0
-        while list_index <= map_size - 2:
-            last_room = room_list[list_index]
-            room_succesful = False
-            level += level_interval
+        # how hard the layout was, for benchmarks: spots checked for a new room and times rooms were taken back
+        self.placement_attempts = 0
+        self.rollbacks = 0
 
-            entrance_direction = GameObject.opposite_direction(
-                last_room.exit_directions[random.randint(0, len(last_room.exit_directions) - 1)])
+        # rooms the interval strategy can still attach rooms to, the newest is used first
+        self.open_rooms = list(self.room_list)
+        # set when no room has space left, the layout is then finished with fewer rooms than map_size
+        self.out_of_space = False
 
-            room_tries = 0
-            while room_tries < 100:
+    @property
+    def finished(self):
+        return self.out_of_space or self.list_index > self.map_size - 2
 
-                doors = {
-                    'north': random.randint(0, 1) == 1,
-                    'south': random.randint(0, 1) == 1,
-                    'east': random.randint(0, 1) == 1,
-                    'west': random.randint(0, 1) == 1
-                }
-                pass  # get rid of pycharm formatting bug
-                doors[entrance_direction] = True
+    @property
+    def progress(self):
+        """How much of the layout is done, from 0 to 1"""
+        return len(self.room_list) / self.map_size
+
+    def place_next_room(self):
+        """Attaches a new room to the last room with the placement strategy of the generator"""
+        if self.placement_strategy == 'interval':
+            return self.place_room_in_interval()
+        else:
+            return self.place_room_randomly()
 
-                exit_directions = []
+    def get_random_room(self, entrance_direction):
+        """Returns a room with an entrance on entrance_direction and at least one exit, or a random special room"""
+        rng = self.layout_rng
 
-                for direction in doors:
-                    if direction != entrance_direction and doors[direction]:
-                        exit_directions.append(direction)
+        while True:
+            doors = {
+                'north': rng.randint(0, 1) == 1,
+                'south': rng.randint(0, 1) == 1,
+                'east': rng.randint(0, 1) == 1,
+                'west': rng.randint(0, 1) == 1
+            }
+            pass  # get rid of pycharm formatting bug
+            doors[entrance_direction] = True
+
+            exit_directions = []
+
+            for direction in doors:
+                if direction != entrance_direction and doors[direction]:
+                    exit_directions.append(direction)
+
+            if len(exit_directions) > 0:
+                break
+
+        if rng.uniform(0, 1) < self.special_room_occurance and len(self.special_rooms) > 0:
+            return self.special_rooms[rng.randint(0, len(self.special_rooms) - 1)]
+
+        return Room(
+            items=None,
+            enemies=None,
+            doors=doors,
+            biome=self.biome,
+            level=self.level,
+            position=Vector2.zero(),
+            size_vector=Vector2(rng.randint(2, 20), rng.randint(2, 20)),
+            entrance_direction=entrance_direction,
+            exit_directions=exit_directions
+        )
 
-                if len(exit_directions) == 0:
-                    # room_tries += 1
-                    # logger.debug(f'No exit {room_tries}')
-                    continue
+    def add_placed_room(self, room, last_room):
+        """Adds room to the layout and returns what open_rooms keeps for it"""
+        self.room_list.append(room)
+        self.connections.append(((last_room.position.x, last_room.position.y), (room.position.x, room.position.y)))
+        self.collider_grid.add(room)
+        logger.info(f'Generated level {self.level} room')
+        if self.snapshot_sink:
+            self.snapshot_sink.add_room(self.level, room)
+        self.list_index += 1
+        return room
+
+    def get_open_room(self, open_room):
+        """Returns the Room an entry of open_rooms stands for"""
+        return open_room
+
+    def remove_last_rooms(self, room_count):
+        """Removes up to room_count of the last placed rooms so the map can grow in another direction"""
+        for _ in range(0, room_count):
+            if self.list_index > 0:
+                self.level -= int(1 * self.level_interval)
+                self.list_index -= 1
+                self.collider_grid.remove(self.room_list[-1])
+                if self.snapshot_sink:
+                    self.snapshot_sink.remove_room(self.room_list[-1])
+                del (self.room_list[-1])
+                del (self.connections[-1])
+
+    def place_room_randomly(self):
+        """
+        Tries to attach a new room at a random spot on a wall of the last room up to 100 times.
+        If every try collides, the last 5 rooms are removed so the map can grow in another direction
+        """
+        rng = self.layout_rng
+        last_room = self.room_list[self.list_index]
+        self.level += self.level_interval
+
+        entrance_direction = GameObject.opposite_direction(
+            last_room.exit_directions[rng.randint(0, len(last_room.exit_directions) - 1)])
+
+        for _ in range(0, 100):
+            self.placement_attempts += 1
+            room = self.get_random_room(entrance_direction)
+
+            fixed_position, low, high = last_room.get_wall_span(entrance_direction, room.size_vector)
+            room.position = Room.get_wall_position(entrance_direction, fixed_position, rng.randint(low, high))
+
+            if not room.check_all_collision(self.room_list, self.collider_grid):
+                self.add_placed_room(room, last_room)
+                return True
+
+        logger.info(f'level {self.level} room unsuccesful')
+        self.level -= 1 * self.level_interval
+        self.rollbacks += 1
+        self.remove_last_rooms(5)
+        return False
 
-                if random.uniform(0, 1) < special_room_occurance and len(special_rooms) > 0:
+    def get_colliding_rectangles(self, room):
+        """Returns (x, y, width, height) of every laid out room overlapping room, checking only the rooms near it"""
+        return [(other_room.position.x, other_room.position.y, other_room.size_vector.x, other_room.size_vector.y)
+                for other_room in self.collider_grid.query(room.position, room.size_vector)
+                if room.check_collision(other_room)]
 
-                    room = special_rooms[random.randint(0, len(special_rooms) - 1)]
+    def get_free_intervals(self, last_room, entrance_direction, size_vector):
+        """
+        Returns the fixed position and a sorted list of (low, high) ranges of the wall span of last_room
+        where a room of size_vector can be placed without colliding with any other room
+        """
+        fixed_position, low, high = last_room.get_wall_span(entrance_direction, size_vector)
 
-                else:
+        # the area every position in the span could cover, only rooms inside it can block the span
+        if entrance_direction in ('north', 'south'):
+            sweep_room = Room.empty(Vector2(high - low + size_vector.x, size_vector.y), Vector2(low, fixed_position))
+        else:
+            sweep_room = Room.empty(Vector2(size_vector.x, high - low + size_vector.y), Vector2(fixed_position, low))
 
-                    room = Room(
-                        items=None,
-                        enemies=None,
-                        doors=doors,
-                        biome=biome,
-                        level=level,
-                        position=Vector2.zero(),
-                        size_vector=Vector2(random.randint(2, 20), random.randint(2, 20)),
-                        entrance_direction=entrance_direction,
-                        exit_directions=exit_directions
-                    )
+        blocked_intervals = []
+        for other_x, other_y, other_width, other_height in self.get_colliding_rectangles(sweep_room):
+            if entrance_direction in ('north', 'south'):
+                blocked_intervals.append((other_x - size_vector.x + 1, other_x + other_width - 1))
+            else:
+                blocked_intervals.append((other_y - size_vector.y + 1, other_y + other_height - 1))
 
-                # if room is above last_room
-                if entrance_direction == 'north':
-                    room.position.x = random.randint(last_room.position.x - room.size_vector.x + 1,
-                                                     last_room.position.x + last_room.size_vector.x - 1)
+        blocked_intervals.sort()
 
-                    room.position.y = int(last_room.position.y + last_room.size_vector.y)
+        free_intervals = []
+        free_start = low
+        for blocked_low, blocked_high in blocked_intervals:
+            if blocked_low > free_start:
+                free_intervals.append((free_start, min(blocked_low - 1, high)))
+            free_start = max(free_start, blocked_high + 1)
+            if free_start > high:
+                break
 
-                # if room is below last_room
-                elif entrance_direction == 'south':
-                    room.position.x = random.randint(last_room.position.x - room.size_vector.x + 1,
-                                                     last_room.position.x + last_room.size_vector.x - 1)
+        if free_start <= high:
+            free_intervals.append((free_start, high))
 
-                    room.position.y = int(last_room.position.y - room.size_vector.y)
+        return fixed_position, free_intervals
 
-                # if room to the right of last_room
-                elif entrance_direction == 'east':
-                    room.position.x = int(last_room.position.x + last_room.size_vector.x)
+    def attach_room_in_interval(self, last_room):
+        """
+        Returns a new room placed at a random free spot on one of the exit walls of last_room,
+        or None if not even a room of the smallest size fits against any of them.
+        Every exit wall is tried once, in a random order. If the room does not fit anywhere on a wall
+        it is halved until it does or it is as small as a room can be, so the work is bounded
+        """
+        rng = self.layout_rng
 
-                    room.position.y = room.position.y = random.randint(last_room.position.y - room.size_vector.y + 1,
-                                                                       last_room.position.y + last_room.size_vector.y - 1)
+        exit_directions = list(last_room.exit_directions)
+        rng.shuffle(exit_directions)
+
+        for exit_direction in exit_directions:
+            entrance_direction = GameObject.opposite_direction(exit_direction)
+            room = self.get_random_room(entrance_direction)
+
+            self.placement_attempts += 1
+            fixed_position, free_intervals = self.get_free_intervals(last_room, entrance_direction, room.size_vector)
+
+            # special rooms are shared, so only rooms made for this spot are shrunk
+            while len(free_intervals) == 0 and room not in self.special_rooms and room.area > 4:
+                room.size_vector = Vector2(max(2, room.size_vector.x // 2), max(2, room.size_vector.y // 2))
+                room.area = room.size_vector.x * room.size_vector.y
+                self.placement_attempts += 1
+                fixed_position, free_intervals = self.get_free_intervals(
+                    last_room, entrance_direction, room.size_vector)
+
+            if len(free_intervals) == 0:
+                continue
 
-                # if room to the left of last_room
-                elif entrance_direction == 'west':
-                    room.position.x = int(last_room.position.x - room.size_vector.x)
+            # every free position is equally likely, no matter which interval it is in
+            free_position = rng.randint(0, sum(high - low + 1 for low, high in free_intervals) - 1)
+            for low, high in free_intervals:
+                if free_position <= high - low:
+                    break
+                free_position -= high - low + 1
 
-                    room.position.y = random.randint(last_room.position.y - room.size_vector.y + 1,
-                                                     last_room.position.y + last_room.size_vector.y - 1)
+            room.position = Room.get_wall_position(entrance_direction, fixed_position, low + free_position)
+            return room
 
-                if room.check_all_collision(room_list):
-                    room_tries += 1
-                    # logger.debug(f'room tries: {room_tries}')
+        return None
+
+    def place_room_in_interval(self):
+        """
+        Attaches a new room to the newest room that still has space against one of its exit walls.
+        Rooms are never removed: when the last room is a dead end the map branches off the room before it instead,
+        and a room that had no space is never checked again, since rooms are only ever added.
+        Returns False only if no room in the map has space left, which also finishes the layout
+        """
+        self.level += self.level_interval
+
+        while len(self.open_rooms) > 0:
+            last_room = self.get_open_room(self.open_rooms[-1])
+            room = self.attach_room_in_interval(last_room)
+            if room:
+                self.open_rooms.append(self.add_placed_room(room, last_room))
+                return True
+
+            self.open_rooms.pop()
+
+        logger.info(f'No room has space for a level {self.level} room, the map has {len(self.room_list)} rooms')
+        self.level -= 1 * self.level_interval
+        self.out_of_space = True
+        return False
+
+    @staticmethod
+    def get_room_rows(room_list, axis, cross_axis):
+        """
+        Groups rooms by where they start on axis. Rooms in a row can not overlap on cross_axis without colliding,
+        so each row is sorted by cross_axis and its start and end lists can both be searched with bisect
+        """
+        room_rows = {}
+        for room in sorted(room_list, key=lambda room: getattr(room.position, cross_axis)):
+            row_start = getattr(room.position, axis)
+            if row_start not in room_rows:
+                room_rows[row_start] = ([], [], [])
+
+            cross_starts, cross_ends, row_rooms = room_rows[row_start]
+            cross_starts.append(getattr(room.position, cross_axis))
+            cross_ends.append(getattr(room.position, cross_axis) + getattr(room.size_vector, cross_axis))
+            row_rooms.append(room)
+
+        return room_rows
+
+    def add_hallways(self, min_hallway_length=2, max_hallway_length=15):
+        """
+        Connects rooms that face each other across a gap of min_hallway_length to max_hallway_length tiles
+        with a 2 wide hallway, each with a chance of connectivity. Only the north door of the lower room and the south
+        door of the upper room are connected, or the east door of the left room and the west door of the right room.
+        Rooms are grouped into rows by where they start, so for each room only the rows within max_hallway_length
+        are searched, with bisect, which keeps the pass at O(n log n). Hallways that would collide with a room are
+        dropped, using the collider grid
+        """
+        rng = self.context.derive('hallways').rng
+        room_list = list(self.room_list)
+
+        hallway_count = 0
+        for axis, cross_axis, near_door, far_door in (('y', 'x', 'north', 'south'), ('x', 'y', 'east', 'west')):
+            room_rows = MapGenerator.get_room_rows(room_list, axis, cross_axis)
+
+            for room in room_list:
+                if not room.doors or not room.doors[near_door]:
                     continue
 
-                room_list.append(room)
-                logger.info(f'Generated level {level} room')
-                # last_room = room
-                room_tries = 100000
-                room_succesful = True
-                wip_map = Map(level, biome, room_list)
-                wip_map.print_map(f'{level}.txt')
-                list_index += 1
-
-            if not room_succesful:
-                logger.info(f'level {level} room unsuccesful')
-                level -= 1 * level_interval
-                for _ in range(0, 5):
-                    if list_index > 0:
-                        level -= int(1 * level_interval)
-                        list_index -= 1
-                        del (room_list[-1])
-
-            progress_string = GameObject.progress_bar(int((len(room_list) / map_size) * 100), map_size)
-
-            progress_message = await client.edit_message(progress_message, message_content +
-                                                         f'\nProgress: {progress_string}')
-
-        # for room in room_list:
-        #     for other_room in room_list:
-        #
-        #         hallway = None
-        #
-        #         # if room is underneath or above other_room
-        #         if cls.check_horizontal_alignment(room, other_room) and \
-        #                 random.uniform(0, 1) < connectivity:
-        #
-        #             hallway_pos = Vector2.zero()
-        #             hallway_size = Vector2(2, 0)
-        #
-        #             # if room is below other_room
-        #             if room.position.y - other_room.position.y < 0:
-        #                 if other_room.position.y - room.position.y < 15 > 2 and \
-        #                         room.doors['north'] and other_room.doors['south']:
-        #
-        #                     hallway_pos.y = room.position.y + room.size_vector.y
-        #                     hallway_size.y = other_room.position.y - room.position.y + room.size_vector.y
-        #
-        #                     if hallway_size.y < 2:
-        #                         continue
-        #                 else:
-        #                     continue
-        #
-        #             # if room is above other_room
-        #             elif room.position.y - other_room.position.y > 0:
-        #                 if room.position.y - other_room.position.y < 15 > 2 and \
-        #                         room.doors['south'] and other_room.doors['north']:
-        #
-        #                     hallway_pos.y = other_room.position.y + other_room.size_vector.y
-        #                     hallway_size.y = room.position.y - other_room.position.y + other_room.size_vector.y
-        #
-        #                     if hallway_size.y < 2:
-        #                         continue
-        #                 else:
-        #                     continue
-        #
-        #             hallway_pos.x = ((room.position.x + room.size_vector.x / 2) +
-        #                              (other_room.position.x + other_room.size_vector.x / 2)) // 2
-        #
-        #             hallway = Room.generate_room(doors={
-        #                 'north': True,
-        #                 'south': True,
-        #                 'east': False,
-        #                 'west': False},
-        #                 level=int(level/2),
-        #                 size_vector=hallway_size,
-        #                 position=hallway_pos
-        #             )
-        #
-        #             if hallway.check_all_collision(room_list):
-        #                 hallway = None
-        #             else:
-        #                 logger.debug(f'Created vertical hallway between {hallway.position.y} and {hallway.position.y + hallway.size_vector.y}')
-        #
-        #         # if room is to the left or right of other_room
-        #         if cls.check_vertical_alignment(room, other_room) and \
-        #                 random.uniform(0, 1) < connectivity:
-        #
-        #             hallway_pos = Vector2.zero()
-        #             hallway_size = Vector2(0, 2)
-        #
-        #             # if room is to the left of other room
-        #             if room.position.x - other_room.position.x < 0:
-        #                 if other_room.position.x - room.position.x < 15 and \
-        #                         room.doors['east'] and other_room.doors['west']:
-        #
-        #                     hallway_pos.x = room.position.x + room.size_vector.x
-        #                     hallway_size.x = other_room.position.x - room.position.x + room.size_vector.x
-        #
-        #                     if hallway_size.x < 2:
-        #                         continue
-        #                 else:
-        #                     continue
-        #
-        #             # if room is to the right of other_room
-        #             else:
-        #                 if room.position.x - other_room.position.x < 15 and \
-        #                         room.doors['west'] and other_room.doors['east']:
-        #
-        #                     hallway_pos.x = other_room.position.x + other_room.size_vector.x
-        #                     hallway_size.x = room.position.x - other_room.position.x + other_room.size_vector.x
-        #
-        #                     if hallway_size.x < 2:
-        #                         continue
-        #                 else:
-        #                     continue
-        #
-        #             hallway_pos.y = ((room.position.y + room.size_vector.y / 2) +
-        #                              (other_room.position.y + other_room.size_vector.y / 2)) // 2
-        #
-        #             hallway = Room.generate_room(doors={
-        #                 'north': False,
-        #                 'south': False,
-        #                 'east': True,
-        #                 'west': True},
-        #                 level=int(level / 2),
-        #                 size_vector=hallway_size,
-        #                 position=hallway_pos
-        #             )
-        #
-        #             if hallway.check_all_collision(room_list):
-        #                 hallway = None
-        #             else:
-        #                 logger.debug(f'Created horizontal hallway between {hallway.position.x} and {hallway.position.x + hallway.size_vector.x}')
-        #
-        #         if hallway:
-        #             room_list.append(hallway)
-        #             await asyncio.sleep(0.1)
+                room_end = getattr(room.position, axis) + getattr(room.size_vector, axis)
+                room_cross_start = getattr(room.position, cross_axis)
+                room_cross_end = room_cross_start + getattr(room.size_vector, cross_axis)
+
+                for hallway_length in range(min_hallway_length, max_hallway_length + 1):
+                    room_row = room_rows.get(room_end + hallway_length)
+                    if not room_row:
+                        continue
+
+                    cross_starts, cross_ends, row_rooms = room_row
+                    first_room = bisect.bisect_right(cross_ends, room_cross_start)
+                    last_room = bisect.bisect_left(cross_starts, room_cross_end)
+
+                    for other_room in row_rooms[first_room:last_room]:
+                        if not other_room.doors or not other_room.doors[far_door]:
+                            continue
+
+                        overlap_start = max(room_cross_start, getattr(other_room.position, cross_axis))
+                        overlap_end = min(room_cross_end,
+                                          getattr(other_room.position, cross_axis) + getattr(other_room.size_vector, cross_axis))
+                        if overlap_end - overlap_start < 2 or rng.uniform(0, 1) >= self.connectivity:
+                            continue
+
+                        hallway_cross_position = (overlap_start + overlap_end) // 2 - 1
+                        if axis == 'y':
+                            hallway_position = Vector2(hallway_cross_position, room_end)
+                            hallway_size = Vector2(2, hallway_length)
+                            hallway_doors = {'north': True, 'south': True, 'east': False, 'west': False}
+                        else:
+                            hallway_position = Vector2(room_end, hallway_cross_position)
+                            hallway_size = Vector2(hallway_length, 2)
+                            hallway_doors = {'north': False, 'south': False, 'east': True, 'west': True}
+
+                        hallway = Room(
+                            min(room.level, other_room.level),
+                            hallway_size,
+                            hallway_doors,
+                            self.biome,
+                            None,
+                            None,
+                            hallway_position,
+                            exit_directions=[]
+                        )
+
+                        if self.get_colliding_rectangles(hallway):
+                            continue
+
+                        self.add_hallway(hallway, room, other_room)
+                        hallway_count += 1
+
+        logger.debug(f'Created {hallway_count} hallways')
+
+    def add_hallway(self, hallway, room, other_room):
+        self.room_list.append(hallway)
+        self.collider_grid.add(hallway)
+        self.connections.append(((room.position.x, room.position.y), tuple(hallway.position)))
+        self.connections.append((tuple(hallway.position), (other_room.position.x, other_room.position.y)))
+
+    def finish_layout(self):
+        """Lays out any rooms that are left, sorts the rooms by level and gives each one its seed, ready to be populated"""
+        while not self.finished:
+            self.place_next_room()
+
+        self.add_hallways()
+
+        self.room_list.sort(key=Map.room_level_sort_key)
+        for room in self.room_list:
+            room.seed = self.get_room_seed(room)
+
+        if self.snapshot_sink:
+            self.snapshot_sink.close()
 
+    def get_room_seed(self, room):
+        """Rooms can not share a position, so deriving the seed from it gives every room its own"""
+        return self.context.derive('room', room.position.x, room.position.y).seed
+
+    def get_population_chunks(self, chunk_size=25):
+        """Splits the laid out rooms into lists of up to chunk_size rooms, in level order, for populate_rooms"""
+        return [self.room_list[i:i + chunk_size] for i in range(0, len(self.room_list), chunk_size)]
+
+    def finish_map(self, populated_chunks=None):
+        """
+        Returns the finished Map.
+        populated_chunks are the chunks of get_population_chunks, populated by populate_rooms unless the rooms
+        should populate themselves when they are first used. If they are not given the layout is finished and populated here
+        """
+        if populated_chunks is None:
+            self.finish_layout()
+            populated_chunks = [populate_rooms(room_chunk) for room_chunk in self.get_population_chunks()]
+
+        room_list = []
+        for populated_chunk in populated_chunks:
+            room_list.extend(populated_chunk)
+        # the chunks are already in level order, this only matters if they were given out of order
         room_list.sort(key=Map.room_level_sort_key)
 
-        for room in room_list:
-            populated_room = Room.generate_room(
-                room.doors,
-                room.size_vector,
-                room.level,
-                biome=biome,
-                position=room.position,
-                entrance_direction=room.entrance_direction,
-                exit_directions=room.exit_directions)
-            room_list.remove(room)
-            room_list.append(populated_room)
+        game_map = Map(self.level, self.biome, room_list, self.context.seed)
+        game_map.room_graph = RoomGraph.from_connections(room_list, self.connections)
 
-        generation_time = datetime.datetime.now() - start_time
-        logger.info(f'Map of size {map_size} generated in {generation_time}')
+        return game_map
+
+
+class RoomTableGenerator(MapGenerator):
+    """
+    Lays out a map like MapGenerator with the 'interval' strategy, but puts every placed room in a RoomTable row
+    instead of keeping its Room. Only the room being placed and the room it is placed against are made as Rooms,
+    the collider grid and open_rooms hold row indexes, and collisions are checked over the rows near a room at once.
+    The rows and seeds are the same as MapGenerator gives for the same seed.
+    There is no rollback, snapshot sink or RoomGraph connections, finish_layout leaves the finished rows in room_table
+    """
+
+    def __init__(
+            self,
+            map_size,
+            connectivity,
+            biome,
+            level,
+            level_interval=1,
+            current_map=None,
+            special_rooms=None,
+            special_room_occurance=0.01,
+            seed=None
+    ):
+        super().__init__(map_size, connectivity, biome, level, level_interval, current_map, special_rooms,
+                         special_room_occurance, None, seed, 'interval')
+
+        first_rooms = self.room_list
+        self.room_table = RoomTable.empty(biome, self.context.seed)
+        # the table stands in for the room list, it has len, indexes and iterates like one
+        self.room_list = self.room_table
+        self.collider_grid = ColliderGrid()
+        self.open_rooms = [self.add_row(room) for room in first_rooms]
+
+    def add_row(self, room):
+        room_index = self.room_table.append_room(room)
+        self.collider_grid.add_index(room.position, room.size_vector, room_index)
+        return room_index
+
+    def get_colliding_rectangles(self, room):
+        colliding_indexes = self.room_table.get_colliding_indexes(
+            room.position, room.size_vector, self.collider_grid.query_indexes(room.position, room.size_vector))
+        return np.concatenate([self.room_table.positions[colliding_indexes],
+                               self.room_table.sizes[colliding_indexes]], axis=1).tolist()
+
+    def add_placed_room(self, room, last_room):
+        room_index = self.add_row(room)
+        logger.info(f'Generated level {self.level} room')
+        self.list_index += 1
+        return room_index
+
+    def get_open_room(self, open_room):
+        return self.room_table[open_room].to_room()
+
+    def add_hallway(self, hallway, room, other_room):
+        self.add_row(hallway)
+
+    def finish_layout(self):
+        """Lays out any rooms that are left, then sorts the rows by level and gives each row its seed"""
+        while not self.finished:
+            self.place_next_room()
+
+        self.add_hallways()
+
+        self.room_table.sort_by_level()
+        self.room_table.seeds = np.array([self.context.derive('room', x, y).seed
+                                          for x, y in self.room_table.positions.tolist()], dtype=np.uint64)
+        # the rows have moved, so the indexes in the grid and in open_rooms no longer match them
+        self.collider_grid = None
+        self.open_rooms = []
+
+
+class MapImageCache:
+    """
+    Least recently used cache of rendered map PNGs, keyed by the content hash of the map and the resolution,
+    so showing the same map again does not render it again.
+    The oldest images are dropped once the images take more than max_bytes
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.cached_bytes = 0
+        self.images = collections.OrderedDict()
+
+    def get_map_image(self, game_map, resolution=10):
+        """Returns the PNG bytes of game_map, rendering them only if they are not cached"""
+        image_key = (game_map.get_content_hash(), resolution)
+
+        map_image = self.get_cached_image(image_key)
+        if map_image is None:
+            map_image = game_map.render_map_image(resolution)
+            self.add_image(image_key, map_image)
+        return map_image
+
+    async def get_map_image_async(self, game_map, resolution=10):
+        """
+        get_map_image for the event loop, rendering a big map takes long enough to hold up the bot,
+        so the map is hashed and rendered in a thread. The cache itself is only touched in the event loop
+        """
+        event_loop = asyncio.get_running_loop()
+        image_key = (await event_loop.run_in_executor(None, game_map.get_content_hash), resolution)
+
+        map_image = self.get_cached_image(image_key)
+        if map_image is None:
+            map_image = await event_loop.run_in_executor(None, game_map.render_map_image, resolution)
+            self.add_image(image_key, map_image)
+        return map_image
+
+    def get_cached_image(self, image_key):
+        """Returns the cached PNG bytes for image_key and marks them as recently used, or None if they are not cached"""
+        if image_key not in self.images:
+            return None
+
+        self.images.move_to_end(image_key)
+        return self.images[image_key]
+
+    def add_image(self, image_key, map_image):
+        # an image bigger than the whole budget would only push everything else out
+        if len(map_image) > self.max_bytes:
+            return
+
+        self.images[image_key] = map_image
+        self.cached_bytes += len(map_image)
+
+        while self.cached_bytes > self.max_bytes:
+            _, old_image = self.images.popitem(last=False)
+            self.cached_bytes -= len(old_image)
+
+
+class MapSnapshotSink:
+    """
+    Saves ascii snapshots of a map to the Maps folder while it is being laid out, for debugging.
+    Snapshots are throttled to one every every_rooms placed rooms and/or every every_seconds seconds,
+    and the files are written on a background thread so generation does not wait for the disk
+    """
+
+    def __init__(self, every_rooms=None, every_seconds=None, export_folder='Maps'):
+        if not every_rooms and not every_seconds:
+            every_rooms = 25
+
+        self.every_rooms = every_rooms
+        self.every_seconds = every_seconds
+        # relative folders are inside the bot folder, absolute ones are used as they are
+        self.export_folder = os.path.join(os.path.dirname(os.path.realpath(__file__)), export_folder)
+
+        self.rooms_since_snapshot = 0
+        self.last_snapshot_time = time.monotonic()
+        # made on the first write so the sink can still be pickled and sent to a MapProcessPool worker
+        self.writer = None
+        # a copy of the map being laid out, kept up to date room by room so its bounds and raster never need a rescan
+        self.game_map = None
+
+    def start_map(self, level, biome, room_list):
+        """Call with the rooms a map starts with, before any are placed"""
+        self.game_map = Map(level, biome, list(room_list))
+
+    def remove_room(self, room):
+        self.game_map.remove_room(room)
+
+    def add_room(self, level, room):
+        """Call after every placed room. Returns True if a snapshot was taken"""
+        self.game_map.add_room(room)
+        self.rooms_since_snapshot += 1
+
+        rooms_due = self.every_rooms and self.rooms_since_snapshot >= self.every_rooms
+        time_due = self.every_seconds and time.monotonic() - self.last_snapshot_time >= self.every_seconds
+        if not rooms_due and not time_due:
+            return False
+
+        self.rooms_since_snapshot = 0
+        self.last_snapshot_time = time.monotonic()
+
+        # render now, while the map still matches level, then hand the disk write to the writer thread
+        self.game_map.level = level
+        map_string = self.game_map.print_map()
+
+        if not self.writer:
+            self.writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.writer.submit(self.write_snapshot, f'{level}.txt', map_string)
+
+        return True
+
+    def write_snapshot(self, file_name, map_string):
+        os.makedirs(self.export_folder, exist_ok=True)
+
+        with open(f'{self.export_folder}/{file_name}', 'w') as file:
+            file.write(map_string)
+
+    def close(self):
+        """Waits for every snapshot to be written"""
+        if self.writer:
+            self.writer.shutdown(wait=True)
+            self.writer = None
+
+
+class MapProcessPool:
+    """Process pool owned by the bot that maps are built in, so the event loop stays free while they generate"""
+
+    def __init__(self, max_workers=None):
+        if not max_workers:
+            max_workers = os.cpu_count() or 1
+
+        self.max_workers = max_workers
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+        # queues made by the manager can be sent to the worker processes to report progress
+        self.manager = multiprocessing.Manager()
+
+    def get_chunk_size(self, room_count, chunks_per_worker=4):
+        """Rooms per population chunk, small enough that every worker gets a few chunks to balance the load"""
+        return max(1, -(-room_count // (self.max_workers * chunks_per_worker)))
+
+    def shutdown(self):
+        self.executor.shutdown()
+        self.manager.shutdown()
+
+
+class MapPool:
+    """
+    Keeps maps generated ahead of time, with their images already rendered, so the map command can answer at once.
+    Maps are kept in buckets of size ranges, each holding up to maps_per_bucket maps of a random size in its range.
+    Taken maps are replaced in the background, but only while no map is being generated for a user
+    """
+
+    def __init__(self, size_buckets=((5, 30),), maps_per_bucket=2, refill_concurrency=1, generation_kwargs=None):
+        """
+        :param size_buckets: (smallest, largest) map sizes of each bucket
+        :param maps_per_bucket: how many ready maps each bucket keeps
+        :param refill_concurrency: how many maps are generated at once while refilling
+        :param generation_kwargs: extra arguments for Map.generate_map, like process_pool or placement_strategy
+        """
+        self.size_buckets = [tuple(size_bucket) for size_bucket in size_buckets]
+        self.maps_per_bucket = maps_per_bucket
+        self.refill_concurrency = refill_concurrency
+        self.generation_kwargs = generation_kwargs or {}
+
+        # (map size, map, png bytes) of the ready maps and how many are being generated for each bucket
+        self.ready_maps = {size_bucket: collections.deque() for size_bucket in self.size_buckets}
+        self.pending_maps = {size_bucket: 0 for size_bucket in self.size_buckets}
+
+        self.foreground_generations = 0
+        self.refill_needed = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.refill_tasks = []
+
+    def get_size_bucket(self, map_size):
+        for size_bucket in self.size_buckets:
+            if size_bucket[0] <= map_size <= size_bucket[1]:
+                return size_bucket
+        return None
+
+    def get_bucket_to_refill(self):
+        """Returns the bucket missing the most maps, or None if every bucket is full"""
+        missing_maps = {size_bucket: self.maps_per_bucket - len(self.ready_maps[size_bucket]) -
+                        self.pending_maps[size_bucket] for size_bucket in self.size_buckets}
+        size_bucket = max(self.size_buckets, key=lambda size_bucket: missing_maps[size_bucket], default=None)
+
+        if size_bucket is None or missing_maps[size_bucket] <= 0:
+            return None
+        return size_bucket
+
+    def take_map(self, map_size=None):
+        """
+        Returns (map, png bytes) of a ready map from the bucket whose range holds map_size,
+        or from any bucket if map_size is None, and starts refilling the pool.
+        The buckets keep maps of random sizes, so a map of exactly map_size is taken if there is one,
+        otherwise the one closest in size. Returns None if the bucket has no maps ready
+        """
+        if map_size is None:
+            buckets = [size_bucket for size_bucket in self.size_buckets if self.ready_maps[size_bucket]]
+            if not buckets:
+                return None
+            ready_maps = self.ready_maps[random.choice(buckets)]
+            map_entry = ready_maps.popleft()
+
+        else:
+            size_bucket = self.get_size_bucket(map_size)
+            if size_bucket is None or not self.ready_maps[size_bucket]:
+                return None
+
+            ready_maps = self.ready_maps[size_bucket]
+            map_entry = min(ready_maps, key=lambda ready_map: abs(ready_map[0] - map_size))
+            ready_maps.remove(map_entry)
+
+        self.refill_needed.set()
+        return map_entry[1], map_entry[2]
+
+    async def generate_map(self, map_size=None, **kwargs):
+        """Map.generate_map for a user, refills wait until it is done so they do not slow it down"""
+        self.foreground_generations += 1
+        self.idle.clear()
+        try:
+            return await Map.generate_map(map_size, **dict(self.generation_kwargs, **kwargs))
+        finally:
+            self.foreground_generations -= 1
+            if self.foreground_generations == 0:
+                self.idle.set()
+
+    async def refill_one(self):
+        """Generates one map for the bucket missing the most maps. Returns False if the pool is already full"""
+        await self.idle.wait()
+
+        size_bucket = self.get_bucket_to_refill()
+        if size_bucket is None:
+            return False
 
-        return cls(level, biome, room_list)
+        map_size = random.randint(size_bucket[0], size_bucket[1])
+        self.pending_maps[size_bucket] += 1
+        try:
+            game_map = await Map.generate_map(map_size, **self.generation_kwargs)
+            # rendering a big map takes long enough to hold up the bot, so it happens in a thread
+            map_image = await asyncio.get_running_loop().run_in_executor(None, game_map.render_map_image)
+        finally:
+            self.pending_maps[size_bucket] -= 1
+
+        self.ready_maps[size_bucket].append((map_size, game_map, map_image))
+        logger.debug(f'Map pool refilled a map of size {map_size}')
+        return True
+
+    async def fill(self):
+        """Generates maps until every bucket is full"""
+        while await self.refill_one():
+            pass
+
+    async def refill_forever(self):
+        while True:
+            self.refill_needed.clear()
+            try:
+                await self.fill()
+            except Exception as exception:
+                # try again on the next take instead of stopping the pool for good
+                logger.warning(f'Map pool could not generate a map: {exception}')
+            await self.refill_needed.wait()
+
+    async def run(self):
+        """Keeps the pool full until stop is called, refill_concurrency maps at a time"""
+        self.refill_tasks = [asyncio.ensure_future(self.refill_forever()) for _ in range(self.refill_concurrency)]
+        try:
+            await asyncio.gather(*self.refill_tasks)
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        for refill_task in self.refill_tasks:
+            refill_task.cancel()
+
+
+def build_layout(generator_kwargs, progress_queue=None):
+    """Lays out a map synchronously and returns the MapGenerator, ready to be populated. Runs inside a MapProcessPool worker"""
+    map_generator = MapGenerator(**generator_kwargs)
+
+    last_progress = None
+    while not map_generator.finished:
+        map_generator.place_next_room()
+
+        # only send progress back to the bot when the percentage changes
+        progress = round(map_generator.progress, 2)
+        if progress_queue is not None and progress != last_progress:
+            progress_queue.put(progress)
+            last_progress = progress
+
+    map_generator.finish_layout()
+    return map_generator
+
+
+def populate_rooms(room_list):
+    """
+    Populates every room in room_list from its seed and returns them in the same order.
+    Can run inside a MapProcessPool worker, the rooms come back populated
+    """
+    for room in room_list:
+        if not room.populated:
+            room.populate()
+
+    return room_list
 
 
 if __name__ == '__main__':
     for i in range(1, 2):
-        map = Map.generate_map(level=1, map_size=30, connectivity=1)
+        map = asyncio.run(Map.generate_map(level=1, map_size=30, connectivity=1))
         map.export_map_image(f'map_test_{i}.png', resolution=10)
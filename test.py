@@ -1,4 +1,14 @@
+import asyncio
 import logging
+import os
+import random
+import tempfile
+import threading
+import numpy as np
+from balance import BalanceReport
+from balance import QuantileSketch
+from balance import RunningStats
+from balance import analyze_balance
 from items import Item
 from items import Weapon
 from items import Armour
@@ -6,6 +16,14 @@ from creatures import Player
 from creatures import EnemyHumanoid
 from rooms import Room
 from rooms import Map
+from rooms import MapGenerator
+from rooms import MapImageCache
+from rooms import MapPool
+from rooms import MapProcessPool
+from rooms import MapSnapshotSink
+from rooms import RoomTable
+from game import GenerationContext
+from game import ProgressReporter
 from game import Vector2
 
 logger = logging.getLogger(__name__)
@@ -26,6 +44,18 @@ logger.addHandler(stream_handler)
 logger.addHandler(file_handler)
 
 
+def run_async(coroutine):
+    """
+    Runs a coroutine on a loop of its own. asyncio.run would leave the thread without a current event loop,
+    and main.py still needs one after running the tests
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
 def item_rarity_test():
     Item.get_level()
 
@@ -52,6 +82,40 @@ def item_balance_test_test():
     Item.test_item_balance('armour')
 
 
+def balance_stats_test():
+    values = np.random.default_rng(1).normal(50, 20, 2000)
+    running_stats = RunningStats()
+    other_stats = RunningStats()
+    running_stats.add(values[:700])
+    other_stats.add(values[700:])
+    running_stats.merge(other_stats)
+    if abs(running_stats.mean - values.mean()) > 10 ** -9 or abs(running_stats.std - values.std(ddof=1)) > 10 ** -9:
+        logger.warning('Merged running stats differ from the stats of every value')
+
+    quantile_sketch = QuantileSketch(0.01)
+    other_sketch = QuantileSketch(0.01)
+    quantile_sketch.add(values[:700])
+    other_sketch.add(values[700:])
+    quantile_sketch.merge(other_sketch)
+    for quantile in (0.05, 0.5, 0.95):
+        exact_value = np.quantile(values, quantile)
+        if abs(quantile_sketch.get_quantile(quantile) - exact_value) > abs(exact_value) * 0.03:
+            logger.warning(f'Quantile sketch {quantile} is too far from the real value')
+
+
+def balance_report_test():
+    balance_report = analyze_balance('weapon', 2000, seed=1, shard_count=2, max_workers=1)
+    if balance_report.sample_count != 2000:
+        logger.warning('Balance report has the wrong number of samples')
+    if balance_report.json_readable() != analyze_balance('weapon', 2000, seed=1, shard_count=2, max_workers=1).json_readable():
+        logger.warning('Balance report is not the same for the same seed')
+
+    armour_report = BalanceReport('armour')
+    armour_report.add_armour_batch(Armour.generate_batch(500, armour_materials='iron', rng=random.Random(1)))
+    if list(armour_report.item_types) != ['iron'] or armour_report.get_stat_summary('iron', 'total_value')['count'] != 500:
+        logger.warning('Armour balance report has the wrong item types')
+
+
 def weapon_generation_test():
     Weapon.get_random_weapon()
     Weapon.get_random_weapon(0)
@@ -61,6 +125,65 @@ def weapon_generation_test():
         Weapon.get_random_weapon(None, weapon_type)
 
 
+def weapon_values_test():
+    # values from before the weapon stats were a table, the same rng draws have to give the same weapon
+    expected_values = {
+        'glaive': {'ap': 62.875, 'range': 2.62, 'weight': 4.9, 'ammo_type': None, 'one_handed': False,
+                   'throw_dmg_multiplier': 0.9, 'blunt_dmg': 175, 'slash_dmg': 1156, 'puncture_dmg': 288,
+                   'electric_dmg': 627, 'fire_dmg': 0, 'magic_dmg': 0, 'true_dmg': 0, 'rarity': 7.5,
+                   'item_type': 'glaive'},
+        'wand': {'ap': 23.5, 'range': 21.87, 'weight': 1.0, 'ammo_type': 'mana', 'one_handed': True,
+                 'throw_dmg_multiplier': 0.1, 'blunt_dmg': 0, 'slash_dmg': 0, 'puncture_dmg': 0,
+                 'electric_dmg': 552, 'fire_dmg': 0, 'magic_dmg': 266, 'true_dmg': 0, 'rarity': 7.5,
+                 'item_type': 'wand'}
+    }
+    for weapon_type in expected_values:
+        if Weapon.get_weapon_values(7.5, weapon_type, random.Random(1234)) != expected_values[weapon_type]:
+            logger.warning(f'{weapon_type} values changed')
+
+
+def weapon_batch_test():
+    weapon_batch = Weapon.generate_batch(50, 7.5, 'glaive', random.Random(1))
+    if len(weapon_batch) != 50 or set(weapon_batch.weapon_types) != {'glaive'}:
+        logger.warning('Weapon batch has the wrong weapons')
+    if weapon_batch.ap[0] != Weapon.get_weapon_values(7.5, 'glaive')['ap']:
+        logger.warning('Weapon batch ap differs from get_weapon_values')
+    if (weapon_batch.dmg < 0).any():
+        logger.warning('Weapon batch has negative dmg')
+
+    weapons = weapon_batch.to_weapons(random.Random(1))
+    if [weapon.total_value for weapon in weapons] != weapon_batch.total_value.tolist():
+        logger.warning('Weapon batch total value differs from its weapons')
+
+    other_batch = Weapon.generate_batch(50, rng=random.Random(1))
+    if not (Weapon.generate_batch(50, rng=random.Random(1)).dmg == other_batch.dmg).all():
+        logger.warning('Weapon batch is not the same for the same seed')
+    if other_batch.rarities.min() < 0.1:
+        logger.warning('Weapon batch rarity is less than 0.1')
+
+
+def item_value_cache_test():
+    weapon = Weapon.get_random_weapon(5, 'sword', random.Random(1))
+    if weapon.total_value != weapon.item_stats['total_value'] or weapon.total_value != weapon.get_value():
+        logger.warning('Cached weapon value differs from its stats')
+
+    weapon.set_stat('slash_dmg', weapon.item_stats['slash_dmg'] + 1000)
+    if weapon.item_stats['total_value'] != weapon.get_value() or weapon.total_value != weapon.item_stats['total_value']:
+        logger.warning('Weapon value was not updated after set_stat')
+    weapon.set_stat('fire_dmg', 4321)
+    if 'fire_dmg -- 4321' not in str(weapon):
+        logger.warning('Weapon description was not updated after set_stat')
+
+    armour = Armour.get_random_armour(5, 'helmet', 'iron', random.Random(1))
+    armour.item_stats['slash_dmg_resistance'] += 1000
+    if armour.total_value == armour.clear_cached_value() or armour.total_value != armour.item_stats['total_value']:
+        logger.warning('Armour value was not updated after clear_cached_value')
+    armour.set_stat('magic_dmg_resistance', 4321)
+    armour.set_stat('fire_dmg_multiplier', 3.5)
+    if 'magic_dmg_resistance -- 4321' not in str(armour) or 'fire_dmg_multiplier -- 3.5' not in str(armour):
+        logger.warning('Armour description was not updated after set_stat')
+
+
 def armour_generation_test():
     Armour.get_random_armour()
     Armour.get_random_armour(0)
@@ -73,6 +196,32 @@ def armour_generation_test():
         Armour.get_random_armour(None, None, armour_material)
 
 
+def armour_batch_test():
+    armour_batch = Armour.generate_batch(50, 5, 'leggings', 'steel', random.Random(1))
+    if set(armour_batch.armour_materials) != {'steel'} or (armour_batch.multipliers < 1).any():
+        logger.warning('Armour batch has the wrong armour')
+
+    armour_list = armour_batch.to_armour(random.Random(1))
+    if [armour.total_value for armour in armour_list] != armour_batch.total_value.tolist():
+        logger.warning('Armour batch total value differs from its armour')
+
+    armour_sets = Armour.generate_armour_sets(20, 3, 'iron', ['leather'], 0.5, random.Random(1))
+    armour_set_list = armour_sets.to_armour_sets(random.Random(1))
+    if len(armour_set_list) != 20 or sum(len(armour_set) for armour_set in armour_set_list) != len(armour_sets):
+        logger.warning('Armour sets have the wrong number of pieces')
+    if not set(armour_sets.armour_materials) <= {'iron', 'leather'}:
+        logger.warning('Armour sets have a material that is not in the material list')
+    if set(Armour.generate_armour_sets(20, 3, 'iron', ['leather'], 1, random.Random(1)).armour_materials) != {'iron'}:
+        logger.warning('Consistent armour sets have more than one material')
+    if set(Armour.generate_armour_sets(20, 3, 'iron', ['leather'], 0, random.Random(1)).armour_materials) != {'iron'}:
+        logger.warning('Armour sets with a consistency of 0 are not made like get_armour_set')
+
+    armour_set = max(armour_set_list, key=len)
+    enemy = EnemyHumanoid.get_random_enemy(3, rng=random.Random(1), armour_list=armour_set)
+    if [armour for armour in enemy.armour_slots.values() if armour] != armour_set:
+        logger.warning('Enemy is not wearing the armour set it was given')
+
+
 def enemy_generation_test():
     EnemyHumanoid.get_random_enemy()
     EnemyHumanoid.get_random_enemy(0)
@@ -84,6 +233,75 @@ def enemy_generation_test():
         EnemyHumanoid.get_random_enemy(None, None, enemy_class)
 
 
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeClient:
+    """Stands in for the discord client, keeping the content of every edit"""
+
+    def __init__(self):
+        self.edits = []
+
+    async def edit_message(self, message, content):
+        self.edits.append(content)
+        return FakeMessage(content)
+
+
+def progress_reporter_test():
+    client = FakeClient()
+    progress_reporter = ProgressReporter(client, FakeMessage('Generating map'), interval=60)
+
+    async def report_progress():
+        for percent in (10, 20, 30):
+            await progress_reporter.update(percent)
+        if len(client.edits) != 1:
+            logger.warning('Progress reporter edited more than once inside the interval')
+
+        progress_reporter.interval = 0
+        await progress_reporter.update(50)
+        await progress_reporter.update(50)
+        if len(client.edits) != 2:
+            logger.warning('Progress reporter edited for a percentage that was already shown')
+
+        progress_reporter.interval = 60
+        await progress_reporter.update(70)
+        await progress_reporter.finish()
+        if len(client.edits) != 3 or client.edits[-1] != 'Generating map\nProgress: [■■■■■■■■■■]':
+            logger.warning('Progress reporter did not show 100% when finished')
+
+    run_async(report_progress())
+
+
+def seeded_generation_test():
+    context = GenerationContext(1234)
+    weapons = [Weapon.get_random_weapon(5, rng=context.derive('weapon').rng) for _ in range(2)]
+    enemies = [EnemyHumanoid.get_random_enemy(5, rng=context.derive('enemy').rng) for _ in range(2)]
+    if str(weapons[0]) != str(weapons[1]) or str(enemies[0]) != str(enemies[1]):
+        logger.warning('Same seed gave different results')
+
+    if context.derive('room', 0).seed == context.derive('room', 1).seed:
+        logger.warning('Derived streams are not independent')
+
+
+def map_process_pool_test():
+    def get_map_signature(game_map):
+        return [(room.position.x, room.position.y, room.level, room.seed,
+                 [(item.name, item.item_stats['total_value']) for item in room.items], [enemy.name for enemy in room.enemies])
+                for room in game_map.room_list]
+
+    process_pool = MapProcessPool(2)
+    try:
+        pooled_map = run_async(Map.generate_map(10, seed=1234, process_pool=process_pool))
+    finally:
+        process_pool.shutdown()
+    inline_map = run_async(Map.generate_map(10, seed=1234))
+
+    if get_map_signature(pooled_map) != get_map_signature(inline_map):
+        logger.warning('Map generated in the process pool is different from the same seed generated inline')
+
+
 def room_colision_test():
     room_1 = Room.empty(Vector2(15, 5), Vector2(-10, 10))
     room_2 = Room.empty(Vector2(15, 5), Vector2(-11, 14))
@@ -94,6 +312,252 @@ def room_colision_test():
         logger.warning('Room collision expected!')
 
 
+def collider_grid_test():
+    room_list = [Room.empty(Vector2(15, 5), Vector2(15, -5)),
+                 Room.empty(Vector2(15, 5), Vector2(-10, 12)),
+                 Room.empty(Vector2(15, 5), Vector2(-11, 1)),
+                 Room.empty(Vector2(40, 3), Vector2(-30, 30))]
+    collider_grid = Map.generate_collider_grid(room_list, 8)
+
+    test_rooms = [Room.empty(Vector2(5, 5), Vector2(x, y)) for x in range(-40, 40, 7) for y in range(-10, 40, 7)]
+    for test_room in test_rooms:
+        if test_room.check_all_collision(room_list, collider_grid) != test_room.check_all_collision(room_list):
+            logger.warning(f'Collider grid disagrees with room list at {test_room.position}')
+
+    collider_grid.remove(room_list[-1])
+    if Room.empty(Vector2(2, 2), Vector2(0, 30)).check_all_collision(room_list, collider_grid):
+        logger.warning('Removed room still in collider grid')
+
+
+def map_snapshot_sink_test():
+    def get_room(i):
+        return Room(1, Vector2(2, 2), None, None, None, None, Vector2(i * 3, 0))
+
+    with tempfile.TemporaryDirectory() as export_folder:
+        threads_before = set(threading.enumerate())
+        snapshot_sink = MapSnapshotSink(every_rooms=3, export_folder=export_folder)
+        snapshot_sink.start_map(1, 'dungeon', [get_room(0)])
+
+        snapshots = [snapshot_sink.add_room(level, get_room(level)) for level in range(2, 9)]
+        if snapshots != [False, False, True, False, False, True, False]:
+            logger.warning('Snapshot sink did not take a snapshot every 3 rooms')
+
+        snapshot_sink.close()
+        if snapshot_sink.writer or set(threading.enumerate()) - threads_before:
+            logger.warning('Snapshot sink writer thread is still running after close')
+        if sorted(os.listdir(export_folder)) != ['4.txt', '7.txt']:
+            logger.warning('Snapshot sink did not write every snapshot before close returned')
+
+        timed_sink = MapSnapshotSink(every_seconds=3600, export_folder=export_folder)
+        timed_sink.start_map(1, 'dungeon', [get_room(0)])
+        if timed_sink.add_room(2, get_room(2)):
+            logger.warning('Snapshot sink took a snapshot before every_seconds had passed')
+        timed_sink.last_snapshot_time -= 3600
+        if not timed_sink.add_room(3, get_room(3)):
+            logger.warning('Snapshot sink did not take a snapshot after every_seconds had passed')
+        timed_sink.close()
+
+
+def interval_placement_test():
+    map_generator = MapGenerator(40, 0, 'dungeon', 1, seed=1234, placement_strategy='interval')
+    while not map_generator.finished:
+        if not map_generator.place_next_room():
+            logger.warning('Interval placement failed to place a room')
+            break
+
+    room_list = map_generator.room_list
+    for i, room in enumerate(room_list):
+        if room.check_all_collision(room_list[:i]):
+            logger.warning('Interval placement made overlapping rooms')
+            break
+
+
+def boxed_in_placement_test():
+    # the only exits of the two rooms face each other, so there is nowhere to attach a room
+    room = Room(1, Vector2(2, 2), None, None, None, None, Vector2(0, 0))
+    other_room = Room(1, Vector2(2, 2), None, None, None, None, Vector2(0, -2))
+    room.exit_directions = ['north']
+    other_room.exit_directions = ['south']
+
+    map_generator = MapGenerator(5, 0, 'dungeon', 1, current_map=[room, other_room], seed=1, placement_strategy='interval')
+    map_generator.finish_layout()
+    if not map_generator.finished or len(map_generator.room_list) != 2 or map_generator.level != 1:
+        logger.warning('Boxed in interval placement did not stop')
+
+
+def hallway_test():
+    all_doors = {'north': True, 'south': True, 'east': True, 'west': True}
+    room_list = [Room(1, Vector2(6, 4), all_doors, 'dungeon', None, None, Vector2(0, 0)),
+                 Room(1, Vector2(6, 4), all_doors, 'dungeon', None, None, Vector2(2, 8)),
+                 Room(1, Vector2(4, 4), all_doors, 'dungeon', None, None, Vector2(30, 0))]
+    map_generator = MapGenerator(3, 1, 'dungeon', 1, current_map=room_list, seed=1234)
+    map_generator.add_hallways()
+
+    hallways = map_generator.room_list[3:]
+    if len(hallways) != 1:
+        logger.warning(f'Expected 1 hallway, got {len(hallways)}')
+    elif list(hallways[0].position) != [3, 4] or list(hallways[0].size_vector) != [2, 4]:
+        logger.warning('Hallway in the wrong place')
+
+    for i, room in enumerate(map_generator.room_list):
+        if room.check_all_collision(map_generator.room_list[:i]):
+            logger.warning('Hallway overlaps a room')
+            break
+
+
+def room_graph_test():
+    map_generator = MapGenerator(40, 0.5, 'dungeon', 1, seed=1234, placement_strategy='interval')
+    map_generator.finish_layout()
+    game_map = map_generator.finish_map([map_generator.room_list])
+    room_graph = game_map.get_room_graph()
+
+    if -1 in room_graph.entrance_distances:
+        logger.warning('Room graph has rooms that can not be reached from the entrance')
+
+    route = game_map.get_route(game_map.room_list[-1], game_map.room_list[0])
+    if not route or len(route) - 1 != game_map.get_room_distance(game_map.room_list[-1]):
+        logger.warning('Room graph route is not the shortest')
+
+    start_index = len(game_map.room_list) - 1
+    if room_graph.find_route(start_index, 0) is not room_graph.find_route(start_index, 0):
+        logger.warning('Room graph route was not cached')
+
+
+def stream_map_test():
+    async def collect_rooms(placement_strategy, process_pool=None):
+        room_list = []
+        async for room_batch in Map.stream_map(20, seed=1234, lazy_population=True, placement_strategy=placement_strategy,
+                                               batch_size=8, process_pool=process_pool):
+            room_list.extend(room_batch)
+        return room_list
+
+    async def count_turns_while_streaming():
+        # the random layout should give other tasks a turn before its first rooms are ready
+        turns = 0
+        stream = Map.stream_map(200, seed=1234, lazy_population=True, batch_size=8)
+        first_batch = asyncio.ensure_future(stream.__anext__())
+        while not first_batch.done():
+            turns += 1
+            await asyncio.sleep(0)
+        await stream.aclose()
+        return turns
+
+    def get_room_keys(room_list):
+        return sorted((room.position.x, room.position.y, room.seed) for room in room_list)
+
+    process_pool = MapProcessPool(1)
+    try:
+        for placement_strategy in ('interval', 'random'):
+            game_map = run_async(Map.generate_map(20, seed=1234, lazy_population=True,
+                                                  placement_strategy=placement_strategy))
+            if get_room_keys(run_async(collect_rooms(placement_strategy))) != get_room_keys(game_map.room_list):
+                logger.warning(f'Streamed {placement_strategy} map is different from the generated map')
+            if get_room_keys(run_async(collect_rooms(placement_strategy, process_pool))) != \
+                    get_room_keys(game_map.room_list):
+                logger.warning(f'Streamed {placement_strategy} map from the process pool is different from the generated map')
+    finally:
+        process_pool.shutdown()
+
+    if run_async(count_turns_while_streaming()) < 2:
+        logger.warning('Streaming a random map blocked the event loop until its layout was done')
+
+
+def room_table_test():
+    map_generator = MapGenerator(40, 0.5, 'dungeon', 1, seed=1234, placement_strategy='interval')
+    map_generator.finish_layout()
+    game_map = map_generator.finish_map([map_generator.room_list])
+    room_table = RoomTable.from_map(game_map)
+
+    generated_table = RoomTable.generate(40, 0.5, 'dungeon', 1, seed=1234)
+    for column_name in RoomTable.column_names + ('seeds',):
+        if getattr(generated_table, column_name).tolist() != getattr(room_table, column_name).tolist():
+            logger.warning(f'Room table laid out straight into rows has different {column_name} from the map')
+
+    if str(room_table.get_map_bounds()) != str(game_map.get_map_bounds()):
+        logger.warning('Room table bounds are different from the map bounds')
+    if room_table.get_level_raster().tolist() != game_map.get_level_raster().tolist():
+        logger.warning('Room table level raster is different from the map raster')
+
+    # the rooms drawn one at a time, like the table draws them all at once
+    map_bounds = room_table.get_map_bounds()
+    image_array = np.zeros((map_bounds['dimensions'].y * 2, map_bounds['dimensions'].x * 2, 4), dtype=np.uint8)
+    for room, colour in zip(game_map.room_list, room_table.get_room_colours()):
+        x = (room.position.x - map_bounds['position'].x) * 2
+        y = (room.position.y - map_bounds['position'].y) * 2
+        image_array[y:y + room.size_vector.y * 2, x:x + room.size_vector.x * 2] = colour
+    if room_table.render_map_array(2).tolist() != image_array[::-1].tolist():
+        logger.warning('Room table renders differently from drawing each room')
+
+    if room_table[5].check_all_collision() or not room_table.check_collision(Vector2(0, 0), Vector2(1, 1)):
+        logger.warning('Room table collision is wrong')
+    room = room_table[5].to_room()
+    if room.doors != game_map.room_list[5].doors or room.exit_directions != game_map.room_list[5].exit_directions:
+        logger.warning('Room table lost the doors of a room')
+
+    overlapping_table = RoomTable.empty(capacity=1)
+    overlapping_table.append_room(Room(1, Vector2(3, 3), None, None, None, None, Vector2(0, 0)))
+    overlapping_table.append_room(Room(2, Vector2(2, 2), None, None, None, None, Vector2(1, 1)))
+    if len(overlapping_table) != 2 or overlapping_table.get_level_raster().tolist() != [[1, 1, 1], [1, 2, 2], [1, 2, 2]]:
+        logger.warning('Room table did not draw the later of two overlapping rooms on top')
+
+
+def map_pool_test():
+    map_pool = MapPool([(5, 5), (7, 8)], 1, generation_kwargs={'lazy_population': True})
+    run_async(map_pool.fill())
+
+    # the map of the 7 to 8 bucket is either size, but any size in the range is served from it
+    if not map_pool.take_map(7) or map_pool.take_map(8) or map_pool.take_map(6):
+        logger.warning('Map pool gave the wrong maps')
+
+    pooled_map = map_pool.take_map()
+    if not pooled_map or len(pooled_map[0].room_list) < 5 or not pooled_map[1].startswith(b'\x89PNG'):
+        logger.warning('Map pool did not keep a rendered map')
+
+
+def map_image_cache_test():
+    game_map = Map(1, 'dungeon', [Room(1, Vector2(3, 2), None, None, None, None, Vector2(0, 0))], seed=1)
+    other_map = Map(1, 'dungeon', [Room(1, Vector2(2, 2), None, None, None, None, Vector2(0, 0))], seed=1)
+
+    map_image_cache = MapImageCache()
+    map_image = map_image_cache.get_map_image(game_map)
+    if map_image_cache.get_map_image(game_map) is not map_image:
+        logger.warning('Map image was not cached')
+    if run_async(map_image_cache.get_map_image_async(game_map)) is not map_image:
+        logger.warning('Map image was rendered again instead of coming from the cache in the event loop')
+    if run_async(MapImageCache().get_map_image_async(game_map)) != map_image:
+        logger.warning('Map image rendered in a thread is different from the one rendered in the event loop')
+
+    map_image_cache.max_bytes = len(map_image) + 1
+    map_image_cache.get_map_image(other_map)
+    if map_image_cache.cached_bytes > map_image_cache.max_bytes or len(map_image_cache.images) != 1:
+        logger.warning('Map image cache went over its byte budget')
+
+
+def room_totals_test():
+    room = Room.generate_room(level=20, rng=GenerationContext(1).rng)
+    if room.total_enemy_power != sum(enemy.power_level for enemy in room.enemies):
+        logger.warning('Cached room enemy power is wrong')
+
+    room.total_loot
+    room.add_enemy(room.enemies[0])
+    room.remove_item(room.items[0])
+    enemy_power, loot = room.total_enemy_power, room.total_loot
+    room.clear_cached_totals()
+    if (enemy_power, loot) != (room.total_enemy_power, room.total_loot):
+        logger.warning('Cached room totals were not updated')
+
+
+def lazy_room_test():
+    room = Room(3, Vector2(4, 4), {'north': True, 'south': False, 'east': False, 'west': False},
+                'dungeon', None, None, Vector2(0, 0), seed=1234)
+    saved_room = Room.load_from_save(room.json_readable())
+    if room.populated or saved_room.populated:
+        logger.warning('Lazy room populated before it was used')
+
+    if [item.name for item in room.items] != [item.name for item in saved_room.items]:
+        logger.warning('Lazy room populated differently after being saved')
+
+
 def map_bounds_test():
     room_list = [Room.empty(Vector2(15, 5), Vector2(15, -5)),
                  Room.empty(Vector2(15, 5), Vector2(-10, 12)),
@@ -107,14 +571,98 @@ def map_bounds_test():
         logger.warning('map dimentions wrong')
 
 
+def map_bounds_update_test():
+    room_list = [Room(1, Vector2(15, 5), None, None, None, None, Vector2(15, -5)),
+                 Room(2, Vector2(15, 5), None, None, None, None, Vector2(-10, 12)),
+                 Room(3, Vector2(3, 3), None, None, None, None, Vector2(0, 0))]
+    game_map = Map(None, None, [])
+    for room in room_list:
+        game_map.get_level_raster()
+        game_map.add_room(room)
+    game_map.remove_room(room_list[1])
+    game_map.remove_room(room_list[2])
+
+    rescanned_map = Map(None, None, [room_list[0]])
+    if str(game_map.get_map_bounds()) != str(rescanned_map.get_map_bounds()):
+        logger.warning('map bounds wrong after removing rooms')
+    if game_map.get_level_raster().tolist() != rescanned_map.get_level_raster().tolist():
+        logger.warning('map raster wrong after removing rooms')
+
+
+def map_query_test():
+    room_list = [Room(1, Vector2(4, 4), None, None, [], [], Vector2(0, 0)),
+                 Room(2, Vector2(4, 4), None, None, [], [], Vector2(10, 0)),
+                 Room(3, Vector2(4, 4), None, None, [], [], Vector2(40, 40))]
+    enemy = EnemyHumanoid.get_random_enemy(1, rng=GenerationContext(1234).rng)
+    enemy.position = Vector2(1, 2)
+    room_list[1].add_enemy(enemy)
+    game_map = Map(None, None, room_list)
+
+    if game_map.get_rooms_in_rectangle(Vector2(3, 3), Vector2(8, 2)) != room_list[:2]:
+        logger.warning('Map rectangle query found the wrong rooms')
+    if game_map.get_rooms_in_radius(Vector2(7, 2), 3) != room_list[:2]:
+        logger.warning('Map radius query found the wrong rooms')
+
+    found_enemies = game_map.get_contents_in_radius('enemies', Vector2(11, 2), 1)
+    if len(found_enemies) != 1 or found_enemies[0][0] is not enemy or list(found_enemies[0][1]) != [11, 2]:
+        logger.warning('Map radius query found the wrong enemies')
+
+
+def map_raster_test():
+    room_list = [Room(1, Vector2(3, 2), None, None, None, None, Vector2(0, 0)),
+                 Room(12, Vector2(2, 2), None, None, None, None, Vector2(3, 4))]
+    game_map = Map(None, None, room_list)
+
+    level_raster = game_map.get_level_raster()
+    if level_raster.shape != (6, 5) or level_raster[0][0] != 1 or level_raster[5][4] != 12 or level_raster[3][3] != -1:
+        logger.warning('Map level raster wrong')
+
+    map_rows = game_map.print_map().split('\n')[-6:]
+    if map_rows != ['111  ', '111  ', '     ', '     ', '   ##', '   ##']:
+        logger.warning('Map ascii render wrong')
+
+
 def run_tests():
     item_rarity_test()
     item_name_test()
     item_skew_multiplier_test()
     item_get_attr_detr_value_test()
-    item_balance_test_test()
+    balance_stats_test()
     weapon_generation_test()
+    weapon_values_test()
+    weapon_batch_test()
+    item_value_cache_test()
     armour_generation_test()
+    armour_batch_test()
     enemy_generation_test()
+    seeded_generation_test()
+    progress_reporter_test()
     room_colision_test()
+    collider_grid_test()
+    interval_placement_test()
+    map_snapshot_sink_test()
+    boxed_in_placement_test()
+    hallway_test()
+    room_graph_test()
+    map_image_cache_test()
+    room_totals_test()
+    lazy_room_test()
     map_bounds_test()
+    map_bounds_update_test()
+    map_raster_test()
+    map_query_test()
+
+
+def run_slow_tests():
+    """Tests that sample many items or make process pools and maps, too slow to run every time the bot starts"""
+    item_balance_test_test()
+    balance_report_test()
+    map_process_pool_test()
+    stream_map_test()
+    room_table_test()
+    map_pool_test()
+
+
+if __name__ == '__main__':
+    run_tests()
+    run_slow_tests()